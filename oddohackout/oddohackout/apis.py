@@ -1,5 +1,7 @@
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from utils.export import ExportView
+from utils.views import MetricsView
 
 app_name = "apis"
 
@@ -7,5 +9,7 @@ urlpatterns = [
     path("", include("user_management.urls", namespace="user_management")),
     path("", include("skills.urls", namespace="skills")),
     path("ratings/", include("ratings.urls", namespace="ratings")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("export/<str:dataset>/", ExportView.as_view(), name="export"),
     # path("", include("request.urls", namespace="user-request")),
 ]
\ No newline at end of file
@@ -0,0 +1,98 @@
+import copy
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from utils.lru import LRUCache
+from utils.metrics import metrics
+from utils.versioning import bump_version, get_version
+
+
+class AuthUserCache:
+    """
+    Per-worker LRU of authenticated user rows, keyed by user id.
+
+    Each user has a version stamp in the cache backend; entries are stored
+    with the version they were loaded at, so a user write in any worker
+    retires them everywhere. The TTL bounds how long writes that skip model
+    signals (queryset.update) can go unnoticed.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(
+            getattr(settings, 'AUTH_USER_CACHE_ENTRIES', 10000),
+            ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+        )
+
+    @staticmethod
+    def version_key(user_id):
+        return f"auth:user:version:{user_id}"
+
+    def version(self, user_id):
+        return get_version(self.version_key(user_id))
+
+    def get(self, user_id, version):
+        entry = self.local.get(user_id)
+        if entry is None or entry[0] != version:
+            return None
+        # Views may modify request.user, so every request gets its own copy
+        return copy.copy(entry[1])
+
+    def set(self, user_id, version, user):
+        self.local.set(user_id, (version, copy.copy(user)))
+
+    def invalidate(self, user_id):
+        """
+        Retire the cached row of a user in every worker once the transaction commits
+        """
+        def on_commit():
+            metrics.incr('auth_user_cache.invalidations')
+            bump_version(self.version_key(user_id))
+            self.local.delete(user_id)
+
+        transaction.on_commit(on_commit)
+
+
+auth_user_cache = AuthUserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the token's user from auth_user_cache and
+    only reads the users table on a miss. Hits repeat the active and
+    revoked-token checks against the cached row.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        started = time.perf_counter()
+        version = auth_user_cache.version(user_id)
+        user = auth_user_cache.get(user_id, version)
+        if user is not None:
+            self.check_user(validated_token, user)
+            metrics.incr('auth_user_cache.hits')
+            metrics.incr('auth_user_cache.hit_seconds', time.perf_counter() - started)
+            return user
+
+        user = super().get_user(validated_token)
+        auth_user_cache.set(user_id, version, user)
+        metrics.incr('auth_user_cache.misses')
+        metrics.incr('auth_user_cache.miss_seconds', time.perf_counter() - started)
+        return user
+
+    def check_user(self, validated_token, user):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
@@ -1,5 +1,6 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 
 User = get_user_model()
 
@@ -7,18 +8,26 @@ class EmailOrUsernameModelBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None or password is None:
             return None
-        user = None
-        # Try email first
-        try:
-            user = User.objects.get(email__iexact=username)
-        except User.DoesNotExist:
-            # Try username second
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
+        # One indexed lookup matches either the email (case-insensitively) or the username.
+        # Three rows are enough to see two email matches next to a username match.
+        candidates = list(User.objects.filter(Q(email_ci=username.lower()) | Q(username=username))[:3])
+        email_matches = [candidate for candidate in candidates if candidate.email_ci == username.lower()]
+        if len(email_matches) > 1:
+            # Accounts whose emails differ only in case; refuse rather than pick one of them
+            user = None
+        elif email_matches:
+            # An email match wins over another account whose username looks like that email
+            user = email_matches[0]
+        else:
+            user = candidates[0] if candidates else None
 
-        if user and user.check_password(password):
+        if user is None:
+            # Hash anyway so a miss takes as long as a wrong password
+            User().set_password(password)
+            return None
+
+        # check_password rehashes the stored password when the preferred hasher or its work factor changed
+        if user.check_password(password):
             return user
 
-        return None
\ No newline at end of file
+        return None
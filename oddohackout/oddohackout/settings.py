@@ -108,15 +108,44 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oddohackout",
+    }
+}
+
+# Rendered profile documents: seconds kept in the cache backend and entries kept per process
+PROFILE_CACHE_TIMEOUT = 300
+PROFILE_CACHE_LOCAL_ENTRIES = 1024
+COUNT_CACHE_TIMEOUT = 60
+COUNT_ESTIMATE_THRESHOLD = 100000
+# Authenticated users cached per worker for JWT requests: entries and seconds each is trusted
+AUTH_USER_CACHE_ENTRIES = 10000
+AUTH_USER_CACHE_TTL = 60
+# Ratings leaderboard: scores are smoothed as if WEIGHT extra ratings of MEAN had been received
+RATING_LEADERBOARD_PRIOR_MEAN = 3.0
+RATING_LEADERBOARD_PRIOR_WEIGHT = 5
+
 AUTHENTICATION_BACKENDS = [
     'oddohackout.backends.EmailOrUsernameModelBackend',
 ]
+# The first hasher hashes new passwords; the others still verify older hashes,
+# which are transparently rehashed with the first one on the next login
+PASSWORD_HASHERS = [
+    'oddohackout.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = 1000000
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "oddohackout.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
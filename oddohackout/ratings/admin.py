@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Rating
+from .models import Rating, UserRatingStats
 
 @admin.register(Rating)
 class RatingAdmin(admin.ModelAdmin):
@@ -21,3 +21,10 @@ class RatingAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('sender', 'receiver')
+
+
+@admin.register(UserRatingStats)
+class UserRatingStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'average_rating', 'total_ratings', 'updated_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = [field.name for field in UserRatingStats._meta.fields]
@@ -5,3 +5,6 @@ class RatingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ratings'
     verbose_name = 'Ratings'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from .models import Rating
+from .signals import ratings_bulk_created, ratings_upserted
+from .stats import rebuild_rating_stats
+
+UPSERT_ATTEMPTS = 3
+
+
+def upsert_rating(sender, receiver, rating_count, feedback=None):
+    """
+    Create or overwrite the sender's rating of the receiver and update the
+    receiver's rating summary in the same transaction. The values must
+    already be validated. Returns (rating, created).
+    """
+    with transaction.atomic():
+        for _ in range(UPSERT_ATTEMPTS):
+            row = Rating.objects.upsert(sender.pk, receiver.pk, rating_count, feedback)
+            if row is not None:
+                break
+        else:
+            raise DatabaseError("Rating kept changing concurrently")
+        rating_id, created, previous_value, created_at, updated_at = row
+        ratings_upserted.send(sender=Rating, rows=[(receiver.pk, None if created else previous_value, rating_count)])
+
+    rating = Rating(
+        id=rating_id, sender=sender, receiver=receiver, rating_count=rating_count,
+        feedback=feedback, created_at=created_at, updated_at=updated_at
+    )
+    return rating, created
+
+
+def parse_rating_row(row):
+    """
+    Turn a {sender, receiver, rating_count, feedback} mapping into a row
+    tuple, raising ValueError when the ids or rating are not integers
+    """
+    try:
+        return int(row['sender']), int(row['receiver']), int(row['rating_count']), row.get('feedback') or None
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError("sender, receiver and rating_count must be integers")
+
+
+def validate_ratings(rows):
+    """
+    Check (sender_id, receiver_id, rating_count, feedback) rows set-wise:
+    one query each for the senders, the receivers and the pairs already rated.
+    Call inside a transaction: the senders are locked FOR UPDATE, which holds
+    back any other rating by them (inserting one takes a key-share lock on the
+    sender) until the caller commits, so the pairs read here stay complete.
+    Returns (valid rows, [(position, reason)] for the rejected ones).
+    """
+    sender_ids = sorted({row[0] for row in rows})
+    # Locked in id order so concurrent ingests of overlapping senders cannot deadlock
+    known = set(get_user_model().objects.select_for_update().filter(id__in=sender_ids).order_by('id').values_list(
+        'id', flat=True
+    ))
+    known.update(get_user_model().objects.filter(id__in={row[1] for row in rows}).values_list('id', flat=True))
+    rated = set(Rating.objects.filter(sender_id__in=sender_ids).values_list('sender_id', 'receiver_id'))
+
+    valid = []
+    rejected = []
+    for position, (sender_id, receiver_id, rating_count, feedback) in enumerate(rows):
+        if sender_id == receiver_id:
+            rejected.append((position, "Users cannot rate themselves"))
+        elif not isinstance(rating_count, int) or isinstance(rating_count, bool) or not 1 <= rating_count <= 5:
+            rejected.append((position, "Rating must be between 1 and 5"))
+        elif sender_id not in known or receiver_id not in known:
+            rejected.append((position, "Unknown sender or receiver"))
+        elif (sender_id, receiver_id) in rated:
+            rejected.append((position, "Sender has already rated this receiver"))
+        else:
+            rated.add((sender_id, receiver_id))
+            valid.append((sender_id, receiver_id, rating_count, feedback))
+    return valid, rejected
+
+
+def ingest_ratings(rows, batch_size=1000):
+    """
+    Validate and insert many ratings without the per-row full_clean of
+    Rating.save. Rows are (sender_id, receiver_id, rating_count, feedback).
+    Validation, the bulk_create of the valid rows and the recomputed
+    summaries of every affected receiver share one transaction.
+    Returns (created ratings, [(position, reason)] for rejected rows).
+    """
+    with transaction.atomic():
+        valid, rejected = validate_ratings(rows)
+        if not valid:
+            return [], rejected
+        ratings = Rating.objects.bulk_create(
+            [
+                Rating(sender_id=sender_id, receiver_id=receiver_id, rating_count=rating_count, feedback=feedback)
+                for sender_id, receiver_id, rating_count, feedback in valid
+            ],
+            batch_size=batch_size
+        )
+        rebuild_rating_stats({rating.receiver_id for rating in ratings})
+        ratings_bulk_created.send(sender=Rating, ratings=ratings)
+    return ratings, rejected
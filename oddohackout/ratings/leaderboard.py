@@ -0,0 +1,125 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+from utils.constatnt import CacheKeyConstants
+from utils.metrics import metrics
+from utils.versioning import bump_version, get_version
+from .models import UserRatingStats
+
+
+def get_prior():
+    """
+    Return the (mean, weight) prior every user's ratings are smoothed towards
+    """
+    return (
+        float(getattr(settings, 'RATING_LEADERBOARD_PRIOR_MEAN', 3.0)),
+        float(getattr(settings, 'RATING_LEADERBOARD_PRIOR_WEIGHT', 5)),
+    )
+
+
+def bayesian_score(rating_sum, total_ratings, prior):
+    """
+    Average rating pulled towards the prior mean as if `weight` extra ratings
+    of that mean had been received, so a single 5-star rating ranks below a
+    long record of 4.8s
+    """
+    mean, weight = prior
+    return (mean * weight + rating_sum) / (weight + total_ratings)
+
+
+class RatingLeaderboard:
+    """
+    Per-process ranking of rated users by Bayesian score.
+
+    Keys are kept in one sorted list, so the top N is a slice. The list is
+    built from UserRatingStats on first use and patched in place by the Rating
+    signals. Writes also bump a shared version stamp so other worker
+    processes notice the change and rebuild on their next read.
+    """
+
+    VERSION_KEY = CacheKeyConstants.RATING_LEADERBOARD_VERSION
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranking = None
+        self._stats = None
+        self._prior = None
+        self._version = None
+
+    def sort_key(self, user_id, rating_sum, total_ratings):
+        return -bayesian_score(rating_sum, total_ratings, self._prior), -total_ratings, user_id
+
+    def load(self, rows, version=None):
+        """
+        Build the ranking from (user_id, rating_sum, total_ratings) rows
+        """
+        with self._lock:
+            metrics.incr('rating_leaderboard.reloads')
+            self._prior = get_prior()
+            self._stats = {user_id: (rating_sum, total) for user_id, rating_sum, total in rows if total}
+            self._ranking = sorted(self.sort_key(user_id, *stats) for user_id, stats in self._stats.items())
+            self._version = version
+
+    def get_ranking(self):
+        version = get_version(self.VERSION_KEY)
+        if self._ranking is None or self._version != version or self._prior != get_prior():
+            rows = UserRatingStats.objects.values_list('user_id', 'rating_sum', 'total_ratings').iterator(
+                chunk_size=10000
+            )
+            self.load(rows, version)
+        return self._ranking, self._stats
+
+    def _apply(self, changes):
+        with self._lock:
+            version = bump_version(self.VERSION_KEY)
+            if self._ranking is None or self._version is None or version != self._version + 1:
+                # Another write happened since our last load; rebuild on the next read
+                self._version = None
+                return
+            for user_id, sum_delta, count_delta in changes:
+                old = self._stats.pop(user_id, (0, 0))
+                if old[1]:
+                    key = self.sort_key(user_id, *old)
+                    position = bisect_left(self._ranking, key)
+                    if position < len(self._ranking) and self._ranking[position] == key:
+                        del self._ranking[position]
+                new = (old[0] + sum_delta, old[1] + count_delta)
+                if new[1] > 0:
+                    self._stats[user_id] = new
+                    insort(self._ranking, self.sort_key(user_id, *new))
+            self._version = version
+
+    def change(self, user_id, old_value=None, new_value=None):
+        """
+        Move a user from `old_value` to `new_value` once the transaction commits,
+        with the same arguments as ratings.stats.apply_rating_change
+        """
+        if old_value == new_value:
+            return
+        change = (user_id, (new_value or 0) - (old_value or 0), (1 if new_value else 0) - (1 if old_value else 0))
+        transaction.on_commit(lambda: self._apply([change]))
+
+    def invalidate(self):
+        transaction.on_commit(lambda: bump_version(self.VERSION_KEY))
+
+    def top(self, limit, offset=0, user_ids=None):
+        """
+        Return [(user_id, score, rating_sum, total_ratings)] for ranks
+        offset..offset+limit, optionally only among `user_ids`
+        """
+        ranking, stats = self.get_ranking()
+        if user_ids is None:
+            keys = ranking[offset:offset + limit]
+        else:
+            # Rank only the candidates instead of scanning the whole list
+            keys = heapq.nsmallest(
+                offset + limit,
+                (self.sort_key(user_id, *stats[user_id]) for user_id in user_ids if user_id in stats)
+            )[offset:]
+        return [(user_id, -score, *stats[user_id]) for score, _, user_id in keys]
+
+
+rating_leaderboard = RatingLeaderboard()
@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from ratings.bulk import ingest_ratings
+from ratings.models import Rating
+
+
+class Command(BaseCommand):
+    help = "Compare per-row Rating.save with bulk rating ingestion; all writes are rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500)
+        parser.add_argument('--receivers', type=int, default=50)
+
+    def measure(self, label, write):
+        reset_queries()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                write()
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"{label}: time={elapsed * 1000:.1f} ms rate={self.rows / elapsed:.0f} rows/sec "
+            f"queries={len(context.captured_queries)}"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        receivers = options['receivers']
+        senders = -(-self.rows // receivers)
+        with transaction.atomic():
+            users = get_user_model().objects.bulk_create([
+                get_user_model()(email=f'bench-rating-{index}@example.com', username=f'bench-rating-{index}')
+                for index in range(receivers + senders)
+            ])
+            receiver_ids = [user.id for user in users[:receivers]]
+            sender_ids = [user.id for user in users[receivers:]]
+            rows = [
+                (sender_ids[index // receivers], receiver_ids[index % receivers], index % 5 + 1, None)
+                for index in range(self.rows)
+            ]
+
+            per_row = self.measure('per-row save', lambda: [
+                Rating.objects.create(sender_id=sender_id, receiver_id=receiver_id, rating_count=rating_count)
+                for sender_id, receiver_id, rating_count, _ in rows
+            ])
+            bulk = self.measure('bulk ingest', lambda: ingest_ratings(rows))
+            self.stdout.write(self.style.SUCCESS(f"speedup={per_row / bulk:.1f}x"))
+            transaction.set_rollback(True)
@@ -0,0 +1,71 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from ratings.bulk import ingest_ratings, parse_rating_row
+
+
+def read_ratings(path, file_format=None):
+    """
+    Yield rating rows as dicts from a CSV or NDJSON file
+    """
+    file_format = file_format or ('csv' if path.endswith('.csv') else 'ndjson')
+    with open(path, newline='') as source:
+        if file_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = "Validate and bulk-insert ratings from a CSV or NDJSON file (sender, receiver, rating_count, feedback)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'ndjson'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows validated and written per transaction")
+        parser.add_argument('--rejects', help="NDJSON file that receives rejected rows with the reason")
+
+    def handle(self, *args, **options):
+        source = read_ratings(options['path'], options['file_format'])
+        rejects = open(options['rejects'], 'a') if options['rejects'] else None
+        created_total = rejected_total = read = 0
+        started = time.perf_counter()
+        try:
+            while batch := list(islice(source, options['batch_size'])):
+                read += len(batch)
+                rows, items, rejected = [], [], []
+                for item in batch:
+                    try:
+                        rows.append(parse_rating_row(item))
+                        items.append(item)
+                    except ValueError as error:
+                        rejected.append((item, str(error)))
+                try:
+                    created, invalid = ingest_ratings(rows)
+                    rejected.extend((items[position], reason) for position, reason in invalid)
+                except DatabaseError as error:
+                    # e.g. a pair rated concurrently; keep the whole batch for a re-run
+                    created = []
+                    rejected.extend((item, f"batch failed: {error}") for item in items)
+
+                created_total += len(created)
+                rejected_total += len(rejected)
+                if rejects:
+                    for item, reason in rejected:
+                        rejects.write(json.dumps({**item, 'error': reason}) + '\n')
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"row {read}: created={created_total} rejected={rejected_total} "
+                    f"rate={created_total / elapsed if elapsed else 0:.0f} rows/sec"
+                )
+        finally:
+            if rejects:
+                rejects.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created_total} ratings, rejected {rejected_total}"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ratings.stats import rebuild_rating_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user rating summaries from the ratings table"
+
+    def handle(self, *args, **options):
+        total = rebuild_rating_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating stats for {total} users"))
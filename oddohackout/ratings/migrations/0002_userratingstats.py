@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+HISTOGRAM_FIELDS = {
+    1: 'one_star_count',
+    2: 'two_star_count',
+    3: 'three_star_count',
+    4: 'four_star_count',
+    5: 'five_star_count',
+}
+
+
+def populate_rating_stats(apps, schema_editor):
+    Rating = apps.get_model('ratings', 'Rating')
+    UserRatingStats = apps.get_model('ratings', 'UserRatingStats')
+    aggregates = {
+        field: Count('id', filter=Q(rating_count=value))
+        for value, field in HISTOGRAM_FIELDS.items()
+    }
+    rows = Rating.objects.order_by().values('receiver_id').annotate(
+        rating_sum=Sum('rating_count'),
+        total_ratings=Count('id'),
+        **aggregates
+    )
+    stats = []
+    for row in rows:
+        user_id = row.pop('receiver_id')
+        stats.append(UserRatingStats(
+            user_id=user_id,
+            average_rating=row['rating_sum'] / row['total_ratings'],
+            **row
+        ))
+    UserRatingStats.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0001_initial'),
+        ('user_management', '0003_users_availability_users_is_banned_users_is_privete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRatingStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='User the ratings were received by', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_sum', models.PositiveIntegerField(default=0, help_text='Sum of all received ratings')),
+                ('total_ratings', models.PositiveIntegerField(default=0, help_text='Number of received ratings')),
+                ('average_rating', models.FloatField(default=0, help_text='Average of all received ratings')),
+                ('one_star_count', models.PositiveIntegerField(default=0)),
+                ('two_star_count', models.PositiveIntegerField(default=0)),
+                ('three_star_count', models.PositiveIntegerField(default=0)),
+                ('four_star_count', models.PositiveIntegerField(default=0)),
+                ('five_star_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User rating stats',
+                'verbose_name_plural': 'User rating stats',
+                'db_table': 'user_rating_stats',
+            },
+        ),
+        migrations.RunPython(populate_rating_stats, migrations.RunPython.noop),
+    ]
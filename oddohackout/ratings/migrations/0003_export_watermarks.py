@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0002_userratingstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['updated_at'], name='ratings_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0003_export_watermarks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['receiver', 'created_at'], name='ratings_receiver_idx'),
+        ),
+    ]
@@ -1,9 +1,48 @@
-from django.db import models
+from django.db import connections, models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 User = get_user_model()
 
+
+class RatingQuerySet(models.QuerySet):
+    def upsert(self, sender_id, receiver_id, rating_count, feedback=None):
+        """
+        Insert the sender's rating of the receiver or overwrite the existing
+        one with a single INSERT ... ON CONFLICT DO UPDATE. Returns
+        (id, created, previous rating_count, created_at, updated_at), or None
+        when another write to the same pair committed after this statement's
+        snapshot, in which case the previous value is unknown and the caller
+        should retry. Sends no signals and skips model validation.
+        """
+        meta = self.model._meta
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(meta.db_table)
+
+        def column(name):
+            return quote(meta.get_field(name).column)
+
+        sender, receiver, value = column('sender'), column('receiver'), column('rating_count')
+        # The previous value is read from the statement's snapshot; the DO UPDATE
+        # only applies if the row still holds it, so a concurrent change is never
+        # counted twice. xmax is 0 only on rows this statement inserted.
+        sql = (
+            f"WITH previous AS (SELECT {value} FROM {table} WHERE {sender} = %s AND {receiver} = %s) "
+            f"INSERT INTO {table} ({sender}, {receiver}, {value}, {column('feedback')}, "
+            f"{column('created_at')}, {column('updated_at')}) VALUES (%s, %s, %s, %s, %s, %s) "
+            f"ON CONFLICT ({sender}, {receiver}) DO UPDATE SET {value} = EXCLUDED.{value}, "
+            f"{column('feedback')} = EXCLUDED.{column('feedback')}, {column('updated_at')} = EXCLUDED.{column('updated_at')} "
+            f"WHERE {table}.{value} IS NOT DISTINCT FROM (SELECT {value} FROM previous) "
+            f"RETURNING {column('id')}, xmax = 0, (SELECT {value} FROM previous), {column('created_at')}, {column('updated_at')}"
+        )
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [sender_id, receiver_id, sender_id, receiver_id, rating_count, feedback, now, now])
+            return cursor.fetchone()
+
+
 class Rating(models.Model):
     """
     Rating model for users to rate each other
@@ -28,12 +67,20 @@ class Rating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RatingQuerySet.as_manager()
+
     class Meta:
         db_table = 'ratings'
         unique_together = ['sender', 'receiver']  # Prevent duplicate ratings from same sender to same receiver
         ordering = ['-created_at']
         verbose_name = 'Rating'
         verbose_name_plural = 'Ratings'
+        indexes = [
+            # Serves the ratings-received feed: a receiver's ratings, newest first
+            models.Index(fields=['receiver', 'created_at'], name='ratings_receiver_idx'),
+            # Incremental exports read ratings changed since a watermark
+            models.Index(fields=['updated_at'], name='ratings_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username} rated {self.receiver.username}: {self.rating_count}/5"
@@ -46,4 +93,36 @@ class Rating(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        # The rating summary is updated by signals inside the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class UserRatingStats(models.Model):
+    """
+    Per-user rating summary kept in step with Rating writes
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_stats',
+        help_text="User the ratings were received by"
+    )
+    rating_sum = models.PositiveIntegerField(default=0, help_text="Sum of all received ratings")
+    total_ratings = models.PositiveIntegerField(default=0, help_text="Number of received ratings")
+    average_rating = models.FloatField(default=0, help_text="Average of all received ratings")
+    one_star_count = models.PositiveIntegerField(default=0)
+    two_star_count = models.PositiveIntegerField(default=0)
+    three_star_count = models.PositiveIntegerField(default=0)
+    four_star_count = models.PositiveIntegerField(default=0)
+    five_star_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_rating_stats'
+        verbose_name = 'User rating stats'
+        verbose_name_plural = 'User rating stats'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.average_rating:.2f} ({self.total_ratings})"
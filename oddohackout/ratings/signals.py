@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from .models import Rating
+from utils.counting import count_cache
+from .leaderboard import rating_leaderboard
+from .stats import apply_rating_change
+
+
+count_cache.track(Rating)
+
+# Raw upserts send no post_save; writers send this instead.
+# rows=[(receiver_id, previous rating_count or None if created, new rating_count)]
+ratings_upserted = Signal()
+# bulk_create sends no post_save; the summaries are rebuilt by the writer. ratings=[Rating]
+ratings_bulk_created = Signal()
+
+
+@receiver(pre_save, sender=Rating)
+def remember_previous_rating(sender, instance, **kwargs):
+    """Keep the stored receiver and value so post_save can apply the difference"""
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = Rating.objects.filter(pk=instance.pk).values_list(
+            'receiver_id', 'rating_count'
+        ).first()
+
+
+def record_rating_change(user_id, old_value=None, new_value=None):
+    apply_rating_change(user_id, old_value, new_value)
+    rating_leaderboard.change(user_id, old_value, new_value)
+
+
+@receiver(post_save, sender=Rating)
+def update_stats_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        record_rating_change(instance.receiver_id, new_value=instance.rating_count)
+        return
+
+    previous_receiver_id, previous_value = previous
+    if previous_receiver_id != instance.receiver_id:
+        record_rating_change(previous_receiver_id, old_value=previous_value)
+        record_rating_change(instance.receiver_id, new_value=instance.rating_count)
+    else:
+        record_rating_change(instance.receiver_id, previous_value, instance.rating_count)
+
+
+@receiver(post_delete, sender=Rating)
+def update_stats_on_delete(sender, instance, **kwargs):
+    record_rating_change(instance.receiver_id, old_value=instance.rating_count)
+
+
+@receiver(ratings_upserted, sender=Rating)
+def update_stats_on_upsert(sender, rows, **kwargs):
+    for receiver_id, previous_value, value in rows:
+        record_rating_change(receiver_id, previous_value, value)
+    if any(previous_value is None for _, previous_value, _ in rows):
+        count_cache.invalidate(Rating)
+
+
+@receiver(ratings_bulk_created, sender=Rating)
+def ratings_created_in_bulk(sender, ratings, **kwargs):
+    count_cache.invalidate(Rating)
@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from .leaderboard import rating_leaderboard
+from .models import Rating, UserRatingStats
+
+HISTOGRAM_FIELDS = {
+    1: 'one_star_count',
+    2: 'two_star_count',
+    3: 'three_star_count',
+    4: 'four_star_count',
+    5: 'five_star_count',
+}
+
+
+def apply_rating_change(user_id, old_value=None, new_value=None):
+    """
+    Move a user's rating summary from `old_value` to `new_value`.
+    Pass only `new_value` for a new rating and only `old_value` for a removed one.
+    """
+    if old_value == new_value:
+        return
+
+    sum_delta = (new_value or 0) - (old_value or 0)
+    count_delta = (1 if new_value else 0) - (1 if old_value else 0)
+
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('total_ratings') + count_delta
+    updates = {
+        'rating_sum': new_sum,
+        'total_ratings': new_count,
+        'average_rating': Case(
+            When(Q(total_ratings__gt=-count_delta), then=Cast(new_sum, FloatField()) / new_count),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+    if old_value:
+        field = HISTOGRAM_FIELDS[old_value]
+        updates[field] = F(field) - 1
+    if new_value:
+        field = HISTOGRAM_FIELDS[new_value]
+        updates[field] = F(field) + 1
+
+    if new_value:
+        # Only additions create the row; removals may run while the user is being deleted
+        UserRatingStats.objects.get_or_create(user_id=user_id)
+    UserRatingStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def get_rating_summary(user):
+    """
+    Return the rounded average and total rating count for a user
+    """
+    try:
+        stats = user.rating_stats
+    except UserRatingStats.DoesNotExist:
+        stats = None
+
+    if stats is None or not stats.total_ratings:
+        return {'average_rating': 0, 'total_ratings': 0}
+    return {
+        'average_rating': round(stats.average_rating, 2),
+        'total_ratings': stats.total_ratings,
+    }
+
+
+def rebuild_rating_stats(user_ids=None):
+    """
+    Recompute the rating summaries of `user_ids` (default: every user) from
+    the ratings table. Returns the number of summaries written.
+    """
+    aggregates = {
+        field: Count('id', filter=Q(rating_count=value))
+        for value, field in HISTOGRAM_FIELDS.items()
+    }
+    ratings = Rating.objects.order_by()
+    summaries = UserRatingStats.objects.all()
+    if user_ids is not None:
+        ratings = ratings.filter(receiver_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+    rows = ratings.values('receiver_id').annotate(
+        rating_sum=Sum('rating_count'),
+        total_ratings=Count('id'),
+        **aggregates
+    )
+
+    stats = []
+    for row in rows.iterator():
+        user_id = row.pop('receiver_id')
+        stats.append(UserRatingStats(
+            user_id=user_id,
+            average_rating=row['rating_sum'] / row['total_ratings'],
+            **row
+        ))
+
+    with transaction.atomic():
+        summaries.delete()
+        UserRatingStats.objects.bulk_create(stats, batch_size=1000)
+        rating_leaderboard.invalidate()
+    return len(stats)
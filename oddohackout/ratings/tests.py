@@ -1,10 +1,19 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import StringIO
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from .models import Rating
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from skills.models import Skills, UserSkills
+from .models import Rating, UserRatingStats
 
 User = get_user_model()
 
@@ -71,6 +80,64 @@ class RatingModelTest(TestCase):
             )
 
 
+class UserRatingStatsTest(TestCase):
+    def setUp(self):
+        self.receiver = User.objects.create_user(
+            email='receiver@test.com',
+            username='receiver',
+            password='testpass123'
+        )
+        self.senders = [
+            User.objects.create_user(
+                email=f'sender{index}@test.com',
+                username=f'sender{index}',
+                password='testpass123'
+            )
+            for index in range(3)
+        ]
+
+    def get_stats(self):
+        return UserRatingStats.objects.get(user=self.receiver)
+
+    def test_stats_follow_rating_writes(self):
+        """Test create, update and delete keep the summary in step"""
+        first = Rating.objects.create(sender=self.senders[0], receiver=self.receiver, rating_count=5)
+        Rating.objects.create(sender=self.senders[1], receiver=self.receiver, rating_count=2)
+        stats = self.get_stats()
+        self.assertEqual((stats.rating_sum, stats.total_ratings), (7, 2))
+        self.assertEqual(stats.average_rating, 3.5)
+        self.assertEqual((stats.two_star_count, stats.five_star_count), (1, 1))
+
+        first.rating_count = 3
+        first.save()
+        stats = self.get_stats()
+        self.assertEqual((stats.rating_sum, stats.total_ratings), (5, 2))
+        self.assertEqual((stats.three_star_count, stats.five_star_count), (1, 0))
+
+        first.delete()
+        Rating.objects.filter(sender=self.senders[1]).delete()
+        stats = self.get_stats()
+        self.assertEqual((stats.rating_sum, stats.total_ratings, stats.average_rating), (0, 0, 0))
+
+    def test_rebuild_command(self):
+        """Test the rebuild command reconciles drifted summaries"""
+        for sender, value in zip(self.senders, [1, 4, 4]):
+            Rating.objects.create(sender=sender, receiver=self.receiver, rating_count=value)
+        UserRatingStats.objects.filter(user=self.receiver).update(rating_sum=0, total_ratings=0)
+
+        call_command('rebuild_rating_stats', stdout=StringIO())
+        stats = self.get_stats()
+        self.assertEqual((stats.rating_sum, stats.total_ratings), (9, 3))
+        self.assertEqual(stats.average_rating, 3)
+        self.assertEqual((stats.one_star_count, stats.four_star_count), (1, 2))
+
+    def test_deleting_receiver(self):
+        """Test deleting a rated user removes the summary with it"""
+        Rating.objects.create(sender=self.senders[0], receiver=self.receiver, rating_count=4)
+        self.receiver.delete()
+        self.assertFalse(UserRatingStats.objects.exists())
+
+
 class RatingAPITest(APITestCase):
     def setUp(self):
         self.user1 = User.objects.create_user(
@@ -156,3 +223,203 @@ class RatingAPITest(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Rating.objects.count(), 0)
+
+
+class RatingLeaderboardTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(email='viewer@test.com', username='viewer', password='testpass123')
+        self.raters = [
+            User.objects.create_user(email=f'rater{index}@test.com', username=f'rater{index}', password='testpass123')
+            for index in range(4)
+        ]
+        self.lucky = User.objects.create_user(email='lucky@test.com', username='lucky', password='testpass123')
+        self.steady = User.objects.create_user(email='steady@test.com', username='steady', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(sender=self.raters[0], receiver=self.lucky, rating_count=5)
+            for rater in self.raters:
+                Rating.objects.create(sender=rater, receiver=self.steady, rating_count=5 if rater.id % 2 else 4)
+        self.client.force_authenticate(user=self.viewer)
+        self.url = reverse('apis:ratings:rating-leaderboard')
+
+    def usernames(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [entry['username'] for entry in response.json()['data']['leaderboard']]
+
+    def test_smoothed_ranking(self):
+        """Test a long record outranks a single 5-star rating and the ranking follows rating changes"""
+        self.assertEqual(self.usernames(), ['steady', 'lucky'])
+        entry = self.client.get(self.url).json()['data']['leaderboard'][1]
+        self.assertEqual((entry['rank'], entry['average_rating'], entry['total_ratings']), (2, 5.0, 1))
+        self.assertAlmostEqual(entry['score'], (3.0 * 5 + 5) / 6, places=4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for rater in self.raters[1:]:
+                Rating.objects.create(sender=rater, receiver=self.lucky, rating_count=5)
+            Rating.objects.filter(receiver=self.steady).first().delete()
+        self.assertEqual(self.usernames(), ['lucky', 'steady'])
+        self.assertEqual(self.usernames(limit=1, offset=1), ['steady'])
+
+        with override_settings(RATING_LEADERBOARD_PRIOR_WEIGHT=0):
+            self.assertEqual(self.client.get(self.url).json()['data']['prior'], {'mean': 3.0, 'weight': 0.0})
+
+    def test_hidden_users_and_skill_filter(self):
+        """Test hidden users are skipped and ?skill= keeps only users offering that skill"""
+        python = Skills.objects.create(name='Python')
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkills.objects.create(user=self.lucky, skill=python, type='offer')
+        self.assertEqual(self.usernames(skill='python'), ['lucky'])
+        self.assertEqual(self.client.get(self.url, {'skill': 'Cobol'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        User.objects.filter(pk=self.steady.pk).update(is_privete=True)
+        self.assertEqual(self.usernames(), ['lucky'])
+
+
+class RatingFeedTest(APITestCase):
+    def setUp(self):
+        self.receiver = User.objects.create_user(email='receiver@test.com', username='receiver', password='testpass123')
+        self.senders = [
+            User.objects.create_user(email=f'sender{index}@test.com', username=f'sender{index}', password='testpass123')
+            for index in range(6)
+        ]
+        for index, sender in enumerate(self.senders):
+            Rating.objects.create(sender=sender, receiver=self.receiver, rating_count=index % 5 + 1)
+        self.client.force_authenticate(user=self.senders[0])
+        self.url = reverse('apis:ratings:rating-create')
+
+    def test_pages_newest_first(self):
+        """Test the feed walks every received rating newest first with cursors"""
+        seen = []
+        cursor = None
+        while True:
+            params = {'receiver': self.receiver.id, 'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(self.url, params).json()['data']
+            seen.extend(rating['sender_username'] for rating in data['ratings'])
+            cursor = data['pagination']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, [sender.username for sender in reversed(self.senders)])
+
+    def test_fixed_query_count(self):
+        """Test the page size does not change the number of queries"""
+        def count_queries(limit):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url, {'receiver': self.receiver.id, 'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(1), count_queries(6))
+
+    def test_receiver_required_and_visible(self):
+        """Test a missing receiver is rejected and hidden users' ratings are not listed"""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        User.objects.filter(pk=self.receiver.pk).update(is_privete=True)
+        response = self.client.get(self.url, {'receiver': self.receiver.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RatingUpsertTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user(email='sender@test.com', username='sender', password='testpass123')
+        self.receiver = User.objects.create_user(email='receiver@test.com', username='receiver', password='testpass123')
+        self.client.force_authenticate(user=self.sender)
+        self.url = reverse('apis:ratings:rating-create')
+
+    def test_creates_then_overwrites(self):
+        """Test the first PUT creates the rating, the next one replaces it and the summary follows"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(self.url, {'receiver': self.receiver.id, 'rating_count': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['data']['receiver_username'], 'receiver')
+
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                self.url, {'receiver': self.receiver.id, 'rating_count': 5, 'feedback': 'Better'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum('INSERT INTO "ratings"' in query['sql'] for query in context.captured_queries), 1)
+
+        rating = Rating.objects.get()
+        self.assertEqual((rating.id, rating.rating_count, rating.feedback), (response.json()['data']['id'], 5, 'Better'))
+        stats = UserRatingStats.objects.get(user=self.receiver)
+        self.assertEqual((stats.total_ratings, stats.rating_sum, stats.two_star_count, stats.five_star_count), (1, 5, 0, 1))
+        leaderboard = self.client.get(reverse('apis:ratings:rating-leaderboard')).json()['data']['leaderboard']
+        self.assertEqual(leaderboard[0]['total_ratings'], 1)
+
+    def test_validation(self):
+        """Test self-ratings and out-of-range values are rejected before writing"""
+        response = self.client.put(self.url, {'receiver': self.sender.id, 'rating_count': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.put(self.url, {'receiver': self.receiver.id, 'rating_count': 6}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Rating.objects.exists())
+
+
+class RatingBulkIngestTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(email='admin@test.com', username='admin', password='testpass123')
+        self.users = [
+            User.objects.create_user(email=f'user{index}@test.com', username=f'user{index}', password='testpass123')
+            for index in range(3)
+        ]
+        Rating.objects.create(sender=self.users[0], receiver=self.users[1], rating_count=1)
+        self.url = reverse('apis:ratings:rating-bulk-ingest')
+
+    def test_validates_set_wise_and_rebuilds_summaries(self):
+        """Test valid rows are inserted, each invalid row is reported and the summaries include the new ratings"""
+        first, second, third = [user.id for user in self.users]
+        ratings = [
+            {'sender': second, 'receiver': first, 'rating_count': 5},
+            {'sender': third, 'receiver': first, 'rating_count': 4, 'feedback': 'Good'},
+            {'sender': first, 'receiver': first, 'rating_count': 5},
+            {'sender': third, 'receiver': second, 'rating_count': 9},
+            {'sender': first, 'receiver': second, 'rating_count': 5},
+            {'sender': second, 'receiver': first, 'rating_count': 3},
+            {'sender': 0, 'receiver': first, 'rating_count': 3},
+            {'sender': 'x', 'receiver': first, 'rating_count': 3},
+            {'sender': third, 'receiver': second, 'rating_count': 2},
+        ]
+        self.client.force_authenticate(user=self.admin)
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'ratings': ratings}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()['data']
+        self.assertEqual(data['created'], 3)
+        self.assertEqual([item['index'] for item in data['rejected']], [2, 3, 4, 5, 6, 7])
+        self.assertLess(len(context.captured_queries), 20)
+        # Senders stay locked from validation to insert, so no pair can be rated in between
+        self.assertTrue(any('FOR UPDATE' in query['sql'] for query in context.captured_queries))
+
+        summary = UserRatingStats.objects.get(user_id=first)
+        self.assertEqual((summary.total_ratings, summary.rating_sum), (2, 9))
+        summary = UserRatingStats.objects.get(user_id=second)
+        self.assertEqual((summary.total_ratings, summary.rating_sum, summary.one_star_count), (2, 3, 1))
+
+        call_command('rebuild_rating_stats', stdout=StringIO())
+        self.assertEqual(UserRatingStats.objects.get(user_id=first).rating_sum, 9)
+
+    def test_admin_only(self):
+        """Test regular users cannot ingest ratings"""
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.post(self.url, {'ratings': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        """Test the command ingests a CSV file and writes rejected rows with the reason"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = f"{directory}/ratings.csv"
+        with open(path, 'w') as target:
+            target.write("sender,receiver,rating_count,feedback\n")
+            target.write(f"{self.users[2].id},{self.users[0].id},4,Helpful\n")
+            target.write(f"{self.users[0].id},{self.users[1].id},5,\n")
+        call_command('import_ratings', path, '--rejects', f"{directory}/rejects.ndjson", stdout=StringIO())
+
+        self.assertTrue(Rating.objects.filter(sender=self.users[2], receiver=self.users[0], feedback='Helpful').exists())
+        with open(f"{directory}/rejects.ndjson") as source:
+            self.assertEqual(json.loads(source.read())['error'], 'Sender has already rated this receiver')
@@ -6,5 +6,7 @@ app_name = 'ratings'
 urlpatterns = [
     # Rating CRUD operations
     path('', views.RatingCreateView.as_view(), name='rating-create'),
+    path('bulk/', views.RatingBulkIngestView.as_view(), name='rating-bulk-ingest'),
+    path('leaderboard/', views.RatingLeaderboardView.as_view(), name='rating-leaderboard'),
     path('<int:pk>/', views.RatingUpdateDeleteView.as_view(), name='rating-update-delete'),
 ]
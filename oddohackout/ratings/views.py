@@ -1,21 +1,72 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from skills.matching import skill_index
+from skills.resolver import skill_resolver
+from utils.constatnt import SkillTypeConstants
+from utils.paginator import CustomPagination, KeysetPagination
+from .bulk import ingest_ratings, parse_rating_row, upsert_rating
+from .leaderboard import get_prior, rating_leaderboard
 from .models import Rating
 from .serializers import RatingSerializer
 from utils.renderers import CustomJSONRenderer
 
 User = get_user_model()
 
-class RatingCreateView(generics.CreateAPIView):
-    """Create a new rating"""
+class RatingCreateView(generics.ListCreateAPIView):
+    """List the ratings a user has received, or create a new rating"""
     queryset = Rating.objects.all()
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticated]
     renderer_classes = [CustomJSONRenderer]
+    # Newest first; id breaks ties between ratings created in the same instant
+    feed_ordering = [('created_at', True), ('id', True)]
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
 
+    def put(self, request, *args, **kwargs):
+        """
+        Create or replace your rating of `receiver` in one statement
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rating, created = upsert_rating(
+            request.user,
+            serializer.validated_data['receiver'],
+            serializer.validated_data['rating_count'],
+            serializer.validated_data.get('feedback')
+        )
+        return Response(
+            self.get_serializer(rating).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        Ratings received by a user, newest first, one joined query per page
+        Expected format: ?receiver=<user id>&limit=20&cursor=<next_cursor>
+        """
+        try:
+            receiver_id = int(request.query_params['receiver'])
+        except (KeyError, ValueError):
+            return Response({'error': 'receiver must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+        if receiver_id != request.user.id and not User.objects.filter(
+            id=receiver_id, is_banned=False, is_privete=False, is_active=True
+        ).exists():
+            return Response({'error': 'User not found or is inactive'}, status=status.HTTP_404_NOT_FOUND)
+
+        queryset = Rating.objects.filter(receiver_id=receiver_id).select_related('sender', 'receiver')
+        paginator = KeysetPagination(
+            self.feed_ordering, int(request.query_params.get('limit', CustomPagination.default_limit))
+        )
+        page = paginator.paginate(queryset, request.query_params.get('cursor', None))
+        return Response({
+            'ratings': self.get_serializer(page['results'], many=True).data,
+            'pagination': paginator.page_info(page)
+        }, status=status.HTTP_200_OK)
+
 
 class RatingUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a rating"""
@@ -27,3 +78,91 @@ class RatingUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         # Users can only modify their own ratings
         return Rating.objects.filter(sender=self.request.user)
+
+
+class RatingLeaderboardView(APIView):
+    """Top rated users by Bayesian-smoothed score, optionally only those offering a skill"""
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [CustomJSONRenderer]
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_ids = None
+        skill = request.query_params.get('skill')
+        if skill:
+            skill_id = skill_resolver.resolve(skill)
+            if skill_id is None:
+                return Response({'error': f"Unknown skill '{skill}'"}, status=status.HTTP_400_BAD_REQUEST)
+            user_ids = skill_index.users_with(skill_id, SkillTypeConstants.OFFER)
+
+        # Hidden users keep their place in the ranking, so read past them until the page is full
+        entries = []
+        scanned = 0
+        while len(entries) < offset + limit:
+            batch = rating_leaderboard.top(offset + limit, scanned, user_ids)
+            if not batch:
+                break
+            scanned += len(batch)
+            visible = User.objects.filter(
+                id__in=[user_id for user_id, *_ in batch], is_banned=False, is_privete=False, is_active=True
+            ).in_bulk()
+            entries.extend((visible[entry[0]], *entry[1:]) for entry in batch if entry[0] in visible)
+
+        mean, weight = get_prior()
+        return Response({
+            'prior': {'mean': mean, 'weight': weight},
+            'leaderboard': [
+                {
+                    'rank': rank,
+                    'user_id': user.id,
+                    'username': user.username,
+                    'name': f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username,
+                    'score': round(score, 4),
+                    'average_rating': round(rating_sum / total_ratings, 2),
+                    'total_ratings': total_ratings,
+                }
+                for rank, (user, score, rating_sum, total_ratings) in enumerate(
+                    entries[offset:offset + limit], start=offset + 1
+                )
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class RatingBulkIngestView(APIView):
+    """Validate and insert many ratings at once (admins only)"""
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [CustomJSONRenderer]
+    max_ratings = 5000
+
+    def post(self, request, *args, **kwargs):
+        """
+        Expected format: {"ratings": [{"sender": 1, "receiver": 2, "rating_count": 5, "feedback": "..."}]}
+        """
+        items = request.data.get('ratings')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'ratings must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_ratings:
+            return Response(
+                {'error': f'At most {self.max_ratings} ratings per request'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows, positions, rejected = [], [], []
+        for position, item in enumerate(items):
+            try:
+                rows.append(parse_rating_row(item))
+                positions.append(position)
+            except ValueError as error:
+                rejected.append((position, str(error)))
+        created, invalid = ingest_ratings(rows)
+        rejected.extend((positions[position], reason) for position, reason in invalid)
+
+        return Response({
+            'created': len(created),
+            'rejected': [{'index': index, 'error': reason} for index, reason in sorted(rejected)],
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
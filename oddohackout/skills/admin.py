@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import SkillStats
 
 # Register your models here.
+
+
+@admin.register(SkillStats)
+class SkillStatsAdmin(admin.ModelAdmin):
+    list_display = ['skill', 'want_count', 'offer_count', 'pending_request_count', 'approved_request_count', 'updated_at']
+    search_fields = ['skill__name']
+    readonly_fields = [field.name for field in SkillStats._meta.fields]
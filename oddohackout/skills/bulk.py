@@ -0,0 +1,121 @@
+from django.db import transaction
+from skills.models import SkillRequest, Skills, UserSkills, normalize_skill_name
+from skills.resolver import skill_resolver
+from skills.signals import skill_requests_transitioned, skills_bulk_created, user_skills_bulk_created
+from utils.constatnt import StatusConstants
+
+
+def skills_by_key(keys):
+    """
+    Return {normalized name: (id, name)} for the skills matching `keys`
+    """
+    return {
+        key: (skill_id, name)
+        for skill_id, name, key in Skills.objects.filter(normalized_name__in=keys).values_list(
+            'id', 'name', 'normalized_name'
+        )
+    }
+
+
+def ensure_skills(names):
+    """
+    Resolve `names` to skills, inserting the missing ones.
+    `names` maps normalized name -> display name. Returns
+    ({normalized name: (id, name)}, [normalized names that were created])
+    and sends skills_bulk_created for the new skills. Call inside a transaction.
+    """
+    keys = list(names)
+    skills = {
+        normalize_skill_name(name): skill for name, skill in skill_resolver.resolve_many(keys).items()
+    }
+    missing = [key for key in keys if key not in skills]
+    if missing:
+        Skills.objects.bulk_create(
+            [Skills(name=names[key]) for key in missing], ignore_conflicts=True
+        )
+        # Ids are not returned for ignored conflicts, so read the new rows back
+        skills.update(skills_by_key(missing))
+        skills_bulk_created.send(
+            sender=Skills, skills=[Skills(id=skills[key][0], name=skills[key][1]) for key in missing]
+        )
+    return skills, missing
+
+
+def add_user_skills(user, skill_type, skill_names):
+    """
+    Attach `skill_names` to `user` as `skill_type` skills with set-based queries.
+
+    Known skills come from the in-memory resolver. Missing skills and user
+    skills are inserted with ON CONFLICT DO NOTHING,
+    so concurrent submissions of the same names cannot fail or duplicate
+    rows, and the query count does not depend on how many names are given.
+    Returns (created_user_skills, created_skills, existing_skills, already_exists)
+    where the first item holds UserSkills and the others hold skill names,
+    each in the order of `skill_names`.
+    """
+    names = {}
+    for skill_name in skill_names:
+        names.setdefault(normalize_skill_name(skill_name), skill_name)
+    keys = list(names)
+
+    with transaction.atomic():
+        skills, missing = ensure_skills(names)
+        skill_ids = [skills[key][0] for key in keys]
+        owned = set(UserSkills.objects.filter(
+            user=user, type=skill_type, skill_id__in=skill_ids
+        ).values_list('skill_id', flat=True))
+        new_skill_ids = [skill_id for skill_id in skill_ids if skill_id not in owned]
+        if new_skill_ids:
+            UserSkills.objects.bulk_create(
+                [UserSkills(user=user, skill_id=skill_id, type=skill_type) for skill_id in new_skill_ids],
+                ignore_conflicts=True
+            )
+            created = {
+                user_skill.skill_id: user_skill
+                for user_skill in UserSkills.objects.filter(
+                    user=user, type=skill_type, skill_id__in=new_skill_ids
+                ).select_related('skill')
+            }
+        else:
+            created = {}
+
+        created_user_skills = [created[skill_id] for skill_id in new_skill_ids if skill_id in created]
+        if created_user_skills:
+            user_skills_bulk_created.send(sender=UserSkills, user_skills=created_user_skills)
+
+    missing = set(missing)
+    return (
+        created_user_skills,
+        [skills[key][1] for key in keys if key in missing],
+        [skills[key][1] for key in keys if key not in missing],
+        [skills[key][1] for key in keys if skills[key][0] in owned],
+    )
+
+
+def transition_skill_requests(receiver, ids, to_status):
+    """
+    Move the receiver's pending requests in `ids` to `to_status`.
+    Returns {id: (outcome, status)} where outcome is 'updated', 'not_pending'
+    (status is what the request already had) or 'not_found' (status is None).
+    """
+    ids = list(dict.fromkeys(ids))
+    with transaction.atomic():
+        rows = SkillRequest.objects.transition(receiver, ids, to_status)
+        if rows:
+            skill_requests_transitioned.send(
+                sender=SkillRequest, rows=rows, from_status=StatusConstants.PENDING, to_status=to_status
+            )
+    updated = {row[0] for row in rows}
+    current = dict(SkillRequest.objects.filter(
+        receiver=receiver, id__in=[request_id for request_id in ids if request_id not in updated]
+    ).values_list('id', 'satatus'))
+
+    outcomes = {}
+    for request_id in ids:
+        if request_id in updated:
+            outcomes[request_id] = ('updated', to_status)
+        elif request_id in current:
+            outcomes[request_id] = ('not_pending', current[request_id])
+        else:
+            outcomes[request_id] = ('not_found', None)
+    return outcomes
@@ -0,0 +1,79 @@
+import gzip
+import threading
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+from skills.models import Skills
+from skills.serializers import SkillsSerializer
+from utils.constatnt import CacheKeyConstants
+from utils.metrics import metrics
+from utils.renderers import CustomJSONRenderer
+from utils.versioning import get_version
+
+
+class CatalogSnapshot:
+    """
+    The full skill catalog response, rendered once per catalog version and
+    kept gzip-compressed both in the cache backend and in each process.
+
+    The catalog version only moves when a skill is added, renamed or
+    deleted, so between those writes every full-catalog request is a
+    memory copy instead of a table scan and serialization.
+    """
+
+    VERSION_KEY = CacheKeyConstants.SKILL_CATALOG_VERSION
+    TIMEOUT = 60 * 60 * 24
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._compressed = None
+        self._body = None
+
+    @staticmethod
+    def cache_key(version):
+        return f"skills:catalog:snapshot:{version}"
+
+    def render(self):
+        """
+        Render the catalog exactly as SkillsViewSet.list would and compress it
+        """
+        skills = Skills.objects.order_by('id').iterator(chunk_size=2000)
+        body = CustomJSONRenderer().render(
+            SkillsSerializer(skills, many=True).data,
+            renderer_context={'response': Response(status=status.HTTP_200_OK)}
+        )
+        return gzip.compress(body, compresslevel=6)
+
+    def get(self):
+        """
+        Return (compressed, uncompressed) bodies for the current catalog version
+        """
+        version = get_version(self.VERSION_KEY)
+        with self._lock:
+            if self._version != version:
+                compressed = cache.get(self.cache_key(version))
+                if compressed is None:
+                    metrics.incr('catalog_snapshot.builds')
+                    compressed = self.render()
+                    cache.set(self.cache_key(version), compressed, self.TIMEOUT)
+                self._version, self._compressed, self._body = version, compressed, None
+            if self._body is None:
+                self._body = gzip.decompress(self._compressed)
+            return self._compressed, self._body
+
+    def response(self, request):
+        compressed, body = self.get()
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(compressed, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+catalog_snapshot = CatalogSnapshot()
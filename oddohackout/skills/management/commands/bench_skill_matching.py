@@ -0,0 +1,55 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from skills.matching import SkillIndex
+from utils.constatnt import SkillTypeConstants
+from utils.versioning import get_version
+
+
+class Command(BaseCommand):
+    help = "Benchmark reciprocal skill matching on a synthetic in-memory index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--skills', type=int, default=2000)
+        parser.add_argument('--per-user', type=int, default=3, help="Want and offer skills per user")
+        parser.add_argument('--lookups', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        skill_ids = range(1, options['skills'] + 1)
+        per_user = options['per_user']
+
+        rows = []
+        profiles = {}
+        for user_id in range(1, options['users'] + 1):
+            wants = rng.sample(skill_ids, per_user)
+            offers = rng.sample(skill_ids, per_user)
+            profiles[user_id] = (wants, offers)
+            rows.extend((user_id, skill_id, SkillTypeConstants.WANT) for skill_id in wants)
+            rows.extend((user_id, skill_id, SkillTypeConstants.OFFER) for skill_id in offers)
+
+        index = SkillIndex()
+        started = time.perf_counter()
+        index.load(rows, get_version(SkillIndex.VERSION_KEY))
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        total_matches = 0
+        for user_id in rng.sample(list(profiles), options['lookups']):
+            wants, offers = profiles[user_id]
+            started = time.perf_counter()
+            total_matches += len(index.find_matches(user_id, wants, offers))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(f"users={options['users']} skills={options['skills']} user_skills={len(rows)}")
+        self.stdout.write(f"index build: {build_ms:.1f} ms")
+        self.stdout.write(
+            f"match: mean {sum(timings) / len(timings):.3f} ms, "
+            f"p50 {timings[len(timings) // 2]:.3f} ms, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms, "
+            f"avg matches {total_matches / len(timings):.1f}"
+        )
@@ -0,0 +1,103 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from skills.models import Skills
+from skills.suggest import SkillSuggester
+
+SYLLABLES = [
+    'py', 'thon', 'ja', 'va', 'script', 're', 'act', 'do', 'cker', 'kube', 'data', 'base',
+    'ma', 'chine', 'learn', 'ing', 'de', 'sign', 'pho', 'to', 'shop', 'ex', 'cel', 'go',
+    'rust', 'swift', 'ko', 'tlin', 'gra', 'phql', 'no', 'de', 'ang', 'ular', 'vue', 'sql',
+]
+
+
+def synthetic_names(count, rng):
+    names = set()
+    while len(names) < count:
+        words = [
+            ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+            for _ in range(rng.randint(1, 3))
+        ]
+        names.add(' '.join(words)[:100])
+    return sorted(names)
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return (
+        f"mean {sum(timings) / len(timings):.3f} ms, "
+        f"p50 {timings[len(timings) // 2]:.3f} ms, "
+        f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms"
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark skill suggestions against an icontains query on a synthetic catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skills', type=int, default=100000)
+        parser.add_argument('--lookups', type=int, default=500)
+        parser.add_argument('--db-lookups', type=int, default=50)
+        parser.add_argument('--skip-db', action='store_true', help="Only benchmark the in-memory index")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = synthetic_names(options['skills'], rng)
+        rows = [(index, name, rng.randint(0, 500)) for index, name in enumerate(names, start=1)]
+
+        queries = []
+        for _ in range(options['lookups']):
+            name = rng.choice(names).lower()
+            query = name[:rng.randint(1, min(len(name), 8))]
+            if rng.random() < 0.2 and len(query) > 4:
+                # Drop a character to exercise the typo-tolerant path
+                position = rng.randrange(len(query))
+                query = query[:position] + query[position + 1:]
+            queries.append(query)
+
+        suggester = SkillSuggester()
+        started = time.perf_counter()
+        suggester.load(rows)
+        build_ms = (time.perf_counter() - started) * 1000
+        # Keep the benchmark on the in-memory path
+        suggester.ensure_loaded = lambda: None
+
+        prefix_timings = []
+        fuzzy_timings = []
+        for query in queries:
+            started = time.perf_counter()
+            results = suggester.suggest(query, 10)
+            elapsed = (time.perf_counter() - started) * 1000
+            if any(result['match'] == 'fuzzy' for result in results) or not results:
+                fuzzy_timings.append(elapsed)
+            else:
+                prefix_timings.append(elapsed)
+
+        self.stdout.write(f"skills={len(names)} lookups={len(queries)}")
+        self.stdout.write(f"index build: {build_ms:.1f} ms")
+        if prefix_timings:
+            self.stdout.write(f"suggest, prefix top-k ({len(prefix_timings)}): {summary(prefix_timings)}")
+        if fuzzy_timings:
+            self.stdout.write(f"suggest, with typo fallback ({len(fuzzy_timings)}): {summary(fuzzy_timings)}")
+
+        if options['skip_db']:
+            return
+
+        with transaction.atomic():
+            Skills.objects.bulk_create([Skills(name=name) for name in names], batch_size=5000)
+            timings = []
+            for query in queries[:options['db_lookups']]:
+                started = time.perf_counter()
+                list(
+                    Skills.objects.filter(name__icontains=query)
+                    .annotate(popularity=Count('user_skills'))
+                    .order_by('-popularity', 'name')[:10]
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"icontains: {summary(timings)}")
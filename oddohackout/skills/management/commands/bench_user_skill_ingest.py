@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from skills.bulk import add_user_skills
+from skills.models import Skills
+from utils.constatnt import SkillTypeConstants
+
+
+class Command(BaseCommand):
+    help = "Measure queries and time of bulk user-skill ingestion; all writes are rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+        parser.add_argument('--existing', type=float, default=0.5, help="Share of names already in the catalog")
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    email=f'bench-ingest-{size}@example.com',
+                    username=f'bench-ingest-{size}',
+                    password='bench'
+                )
+                names = [f'Bench Skill {size} {index}' for index in range(size)]
+                existing = int(size * options['existing'])
+                Skills.objects.bulk_create([Skills(name=name) for name in names[:existing]])
+
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    created = add_user_skills(user, SkillTypeConstants.WANT, names)[0]
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+
+                self.stdout.write(
+                    f"skills={size} created={len(created)} "
+                    f"queries={len(context.captured_queries)} time={elapsed_ms:.1f} ms"
+                )
+                transaction.set_rollback(True)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from skills.stats import TRENDING_WINDOWS, rebuild_skill_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-skill supply/demand totals and daily trending buckets from user skills and requests"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=max(TRENDING_WINDOWS), help="Daily buckets to rebuild")
+
+    def handle(self, *args, **options):
+        total = rebuild_skill_stats(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt skill stats for {total} skills"))
@@ -0,0 +1,164 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from skills.models import UserSkills
+from utils.constatnt import CacheKeyConstants, SkillTypeConstants
+from utils.metrics import metrics
+from utils.versioning import bump_version, get_version
+
+
+class SkillIndex:
+    """
+    Inverted index of skill id -> sorted user ids, kept separately for
+    want and offer skills.
+
+    The index is built from UserSkills on first use. Every write bumps a
+    shared version stamp and logs the ids of the users it changed under the
+    new version, so a worker that falls behind re-reads just those users'
+    skills and patches their postings. Only a gap in the log (an evicted
+    entry or a worker far behind) makes it rescan the whole table.
+    """
+
+    VERSION_KEY = CacheKeyConstants.USER_SKILL_INDEX_VERSION
+    # Versions further behind than this are cheaper to reload than to replay
+    MAX_REPLAY = 500
+    CHANGES_TIMEOUT = 60 * 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._user_skills = None
+        self._version = None
+
+    @staticmethod
+    def empty_postings():
+        return {SkillTypeConstants.WANT: {}, SkillTypeConstants.OFFER: {}}
+
+    @staticmethod
+    def changes_key(version):
+        return f"skills:user-skill-index:changes:{version}"
+
+    def load(self, rows, version=None):
+        """
+        Build the index from (user_id, skill_id, type) rows
+        """
+        postings = self.empty_postings()
+        user_skills = {}
+        for user_id, skill_id, skill_type in rows:
+            postings.setdefault(skill_type, {}).setdefault(skill_id, []).append(user_id)
+            user_skills.setdefault(user_id, set()).add((skill_id, skill_type))
+        for skills in postings.values():
+            for user_ids in skills.values():
+                user_ids.sort()
+        with self._lock:
+            metrics.incr('skill_index.reloads')
+            self._postings = postings
+            self._user_skills = user_skills
+            self._version = version
+
+    def get_postings(self):
+        version = get_version(self.VERSION_KEY)
+        if self._postings is None or (self._version != version and not self.replay(version)):
+            rows = UserSkills.objects.values_list('user_id', 'skill_id', 'type').iterator(chunk_size=10000)
+            self.load(rows, version)
+        return self._postings
+
+    def replay(self, version):
+        """
+        Re-read the users logged between the loaded version and `version`
+        and patch their postings. Returns False when the log has a gap.
+        """
+        start = self._version
+        if start is None or not 0 < version - start <= self.MAX_REPLAY:
+            return False
+        keys = [self.changes_key(number) for number in range(start + 1, version + 1)]
+        logged = cache.get_many(keys)
+        if len(logged) < len(keys):
+            return False
+        user_ids = set().union(*logged.values())
+        current = {}
+        for user_id, skill_id, skill_type in UserSkills.objects.filter(user_id__in=user_ids).values_list(
+            'user_id', 'skill_id', 'type'
+        ):
+            current.setdefault(user_id, set()).add((skill_id, skill_type))
+
+        with self._lock:
+            if self._version != start:
+                # Another request replayed or reloaded first
+                return True
+            metrics.incr('skill_index.replayed_users', len(user_ids))
+            for user_id in user_ids:
+                before = self._user_skills.pop(user_id, set())
+                after = current.get(user_id, set())
+                if after:
+                    self._user_skills[user_id] = after
+                for skill_id, skill_type in before - after:
+                    user_ids_with = self._postings.setdefault(skill_type, {}).get(skill_id, [])
+                    position = bisect_left(user_ids_with, user_id)
+                    if position < len(user_ids_with) and user_ids_with[position] == user_id:
+                        del user_ids_with[position]
+                for skill_id, skill_type in after - before:
+                    insort(self._postings.setdefault(skill_type, {}).setdefault(skill_id, []), user_id)
+            self._version = version
+        return True
+
+    def changed(self, user_ids):
+        """
+        Log that the skills of `user_ids` changed, once the transaction commits
+        """
+        user_ids = list(set(user_ids))
+
+        def on_commit():
+            version = bump_version(self.VERSION_KEY)
+            cache.set(self.changes_key(version), user_ids, self.CHANGES_TIMEOUT)
+
+        transaction.on_commit(on_commit)
+
+    def users_with(self, skill_id, skill_type):
+        """
+        Return the sorted ids of users who want or offer a skill
+        """
+        return self.get_postings().get(skill_type, {}).get(skill_id, [])
+
+    def find_matches(self, user_id, want_skill_ids, offer_skill_ids):
+        """
+        Return {user_id: (offers_you_want, wants_you_offer)} for every user who
+        offers at least one skill you want and wants at least one skill you offer.
+        """
+        postings = self.get_postings()
+        offered = postings.get(SkillTypeConstants.OFFER, {})
+        wanted = postings.get(SkillTypeConstants.WANT, {})
+
+        offers_you_want = Counter()
+        for skill_id in want_skill_ids:
+            offers_you_want.update(offered.get(skill_id, ()))
+        wants_you_offer = Counter()
+        for skill_id in offer_skill_ids:
+            wants_you_offer.update(wanted.get(skill_id, ()))
+
+        smaller, larger = sorted([offers_you_want, wants_you_offer], key=len)
+        return {
+            candidate: (offers_you_want[candidate], wants_you_offer[candidate])
+            for candidate in smaller
+            if candidate in larger and candidate != user_id
+        }
+
+    @staticmethod
+    def top_matches(matches, limit, tiebreak=None):
+        """
+        Return the ids of the best `limit` users in `matches` (as returned by
+        find_matches): most skills in common first, then the highest
+        `tiebreak(user_id)`, then the lowest id
+        """
+        def rank(candidate):
+            offers_you_want, wants_you_offer = matches[candidate]
+            return (-(offers_you_want + wants_you_offer), -(tiebreak(candidate) if tiebreak else 0), candidate)
+
+        return heapq.nsmallest(limit, matches, key=rank)
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+import skills.models
+
+BATCH_SIZE = 1000
+
+
+def repoint(queryset, field, mapping):
+    """
+    Move `field` from duplicate skill ids to their canonical ids in one UPDATE
+    """
+    queryset.filter(**{f'{field}__in': list(mapping)}).update(**{field: Case(
+        *[When(**{field: duplicate_id}, then=Value(canonical_id)) for duplicate_id, canonical_id in mapping.items()],
+        default=models.F(field),
+        output_field=models.BigIntegerField()
+    )})
+
+
+def merge_duplicate_skills(apps, schema_editor):
+    Skills = apps.get_model('skills', 'Skills')
+    UserSkills = apps.get_model('skills', 'UserSkills')
+    SkillRequest = apps.get_model('skills', 'SkillRequest')
+
+    # The oldest skill for each key is kept; later spellings merge into it
+    canonical = {}
+    duplicates = {}
+    batch = []
+    for skill in Skills.objects.only('id', 'name').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        key = skills.models.normalize_skill_name(skill.name)
+        if key in canonical:
+            duplicates[skill.id] = canonical[key]
+            continue
+        canonical[key] = skill.id
+        skill.normalized_name = key
+        batch.append(skill)
+        if len(batch) >= BATCH_SIZE:
+            Skills.objects.bulk_update(batch, ['normalized_name'])
+            batch = []
+    Skills.objects.bulk_update(batch, ['normalized_name'])
+
+    duplicate_ids = list(duplicates)
+    for start in range(0, len(duplicate_ids), BATCH_SIZE):
+        mapping = {duplicate_id: duplicates[duplicate_id] for duplicate_id in duplicate_ids[start:start + BATCH_SIZE]}
+
+        # A user may already hold the canonical skill (or two spellings of it); keep one row per (user, skill, type)
+        moving = list(UserSkills.objects.filter(skill_id__in=list(mapping)).values_list('id', 'user_id', 'skill_id', 'type'))
+        held = set(UserSkills.objects.filter(
+            user_id__in={user_id for _, user_id, _, _ in moving},
+            skill_id__in=set(mapping.values())
+        ).values_list('user_id', 'skill_id', 'type'))
+        redundant = []
+        for user_skill_id, user_id, skill_id, skill_type in moving:
+            target = (user_id, mapping[skill_id], skill_type)
+            if target in held:
+                redundant.append(user_skill_id)
+            else:
+                held.add(target)
+        UserSkills.objects.filter(id__in=redundant).delete()
+
+        repoint(UserSkills.objects.all(), 'skill_id', mapping)
+        repoint(SkillRequest.objects.all(), 'wanted_skill_id', mapping)
+        repoint(SkillRequest.objects.all(), 'offered_skill_id', mapping)
+        Skills.objects.filter(id__in=list(mapping)).delete()
+
+
+class Migration(migrations.Migration):
+    # Merging deletes referenced rows, and Postgres will not alter a table with
+    # pending deferred constraint checks, so the data step commits on its own
+    atomic = False
+
+    dependencies = [
+        ('skills', '0002_skillrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skills',
+            name='normalized_name',
+            field=models.CharField(editable=False, help_text='Canonical lookup key derived from the name', max_length=100, null=True),
+        ),
+        migrations.RunPython(merge_duplicate_skills, migrations.RunPython.noop, atomic=True),
+        migrations.AlterField(
+            model_name='skills',
+            name='normalized_name',
+            field=models.CharField(editable=False, help_text='Canonical lookup key derived from the name', max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0004_skillrequest_inbox_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skillrequest',
+            index=models.Index(fields=['sender', 'created_at'], name='skillrequest_sent_idx'),
+        ),
+    ]
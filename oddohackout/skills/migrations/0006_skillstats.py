@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:36
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+TYPE_FIELDS = {'want': 'want_count', 'offer': 'offer_count'}
+STATUS_FIELDS = {'pending': 'pending_request_count', 'approved': 'approved_request_count'}
+
+
+def populate_skill_stats(apps, schema_editor):
+    """Seed the running totals; `rebuild_skill_stats` back-fills the daily buckets"""
+    UserSkills = apps.get_model('skills', 'UserSkills')
+    SkillRequest = apps.get_model('skills', 'SkillRequest')
+    SkillStats = apps.get_model('skills', 'SkillStats')
+    totals = defaultdict(Counter)
+    for skill_id, skill_type, total in UserSkills.objects.order_by().values_list('skill_id', 'type').annotate(
+        total=Count('id')
+    ):
+        if skill_type in TYPE_FIELDS:
+            totals[skill_id][TYPE_FIELDS[skill_type]] = total
+    for skill_id, request_status, total in SkillRequest.objects.order_by().filter(
+        satatus__in=list(STATUS_FIELDS)
+    ).values_list('wanted_skill_id', 'satatus').annotate(total=Count('id')):
+        totals[skill_id][STATUS_FIELDS[request_status]] = total
+    SkillStats.objects.bulk_create(
+        [SkillStats(skill_id=skill_id, **fields) for skill_id, fields in totals.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0005_skillrequest_sent_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillStats',
+            fields=[
+                ('skill', models.OneToOneField(help_text='Skill the totals belong to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='skills.skills')),
+                ('want_count', models.IntegerField(default=0, help_text='Users who want the skill')),
+                ('offer_count', models.IntegerField(default=0, help_text='Users who offer the skill')),
+                ('pending_request_count', models.IntegerField(default=0, help_text='Pending requests asking for the skill')),
+                ('approved_request_count', models.IntegerField(default=0, help_text='Approved requests asking for the skill')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Skill stats',
+                'verbose_name_plural': 'Skill stats',
+                'db_table': 'skill_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillStatsDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Local date the activity happened on')),
+                ('wants_added', models.IntegerField(default=0)),
+                ('offers_added', models.IntegerField(default=0)),
+                ('requests_created', models.IntegerField(default=0, help_text='Requests created asking for the skill')),
+                ('requests_approved', models.IntegerField(default=0, help_text='Requests asking for the skill that were approved')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='skills.skills')),
+            ],
+            options={
+                'verbose_name': 'Daily skill stats',
+                'verbose_name_plural': 'Daily skill stats',
+                'db_table': 'skill_stats_daily',
+                'indexes': [models.Index(fields=['day'], name='skill_stats_daily_day_idx')],
+                'unique_together': {('skill', 'day')},
+            },
+        ),
+        migrations.RunPython(populate_skill_stats, migrations.RunPython.noop),
+    ]
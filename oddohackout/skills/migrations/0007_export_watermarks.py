@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0006_skillstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skills',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the skill was last updated'),
+        ),
+        migrations.AddIndex(
+            model_name='skillrequest',
+            index=models.Index(fields=['updated_at'], name='skillrequest_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userskills',
+            index=models.Index(fields=['created_at'], name='userskills_created_idx'),
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import re
+import unicodedata
+
+from django.db import connections, models
+from django.utils import timezone
 from user_management.models import Users
 from utils.constatnt import SkillTypeConstants,StatusConstants
 
@@ -6,13 +10,45 @@ TYPE_CHOICES = [
         (SkillTypeConstants.WANT, 'Want'),
         (SkillTypeConstants.OFFER, 'Offer'),
     ]
+# Anything but letters, digits, "+" and "#" separates words, so "C++" and "C#" stay distinct
+SEPARATORS = re.compile(r"[^\w+#]+|_+")
+
+
+def normalize_skill_name(name):
+    """
+    Canonical lookup key for a skill name: casefolded, with punctuation
+    and runs of whitespace collapsed to single spaces ("Node.js " -> "node js")
+    """
+    key = " ".join(SEPARATORS.sub(" ", unicodedata.normalize("NFKC", name).casefold()).split())
+    return key or " ".join(name.casefold().split())
+
+
+class SkillsQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create bypasses save(), so fill in the lookup key here
+        for skill in objs:
+            skill.normalized_name = normalize_skill_name(skill.name)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 # Create your models here.
 class Skills(models.Model):
     """
     Model representing a skill
     """
     name = models.CharField(max_length=100, unique=True, help_text="Name of the skill")
+    normalized_name = models.CharField(max_length=100, unique=True, editable=False, help_text="Canonical lookup key derived from the name")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the skill was created")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text="Timestamp when the skill was last updated")
+
+    objects = SkillsQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_skill_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -33,6 +69,10 @@ class UserSkills(models.Model):
     
     class Meta:
         unique_together = ['user', 'skill', 'type']
+        indexes = [
+            # Incremental exports read rows added since a watermark
+            models.Index(fields=['created_at'], name='userskills_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.skill.name} ({self.get_type_display()})"
@@ -43,6 +83,35 @@ status_choices = [
     (StatusConstants.REJECTED, 'Rejected'),
     
     ]
+
+
+class SkillRequestQuerySet(models.QuerySet):
+    def transition(self, receiver, ids, to_status, from_status=StatusConstants.PENDING):
+        """
+        Move the receiver's `ids` from `from_status` to `to_status` in one
+        UPDATE and return (id, wanted_skill_id, offered_skill_id) for the rows
+        it changed. The status check in the WHERE clause is the compare-and-set:
+        of two concurrent transitions only the first to commit matches a row.
+        """
+        if not ids:
+            return []
+        meta = self.model._meta
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+
+        def column(name):
+            return quote(meta.get_field(name).column)
+
+        sql = (
+            f"UPDATE {quote(meta.db_table)} SET {column('satatus')} = %s, {column('updated_at')} = %s "
+            f"WHERE {column('id')} = ANY(%s) AND {column('receiver')} = %s AND {column('satatus')} = %s "
+            f"RETURNING {column('id')}, {column('wanted_skill')}, {column('offered_skill')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [to_status, timezone.now(), list(ids), receiver.pk, from_status])
+            return cursor.fetchall()
+
+
 class SkillRequest(models.Model):
 
     sender = models.ForeignKey(Users, on_delete=models.CASCADE, related_name='skill_requests_sent', help_text="User who sent the request")
@@ -57,3 +126,66 @@ class SkillRequest(models.Model):
     )   
     created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the skill request was created")
     updated_at = models.DateTimeField(auto_now=True, help_text="Timestamp when the skill request was last updated")
+
+    objects = SkillRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the inbox: a receiver's requests, optionally by status, newest first
+            models.Index(fields=['receiver', 'satatus', 'created_at'], name='skillrequest_inbox_idx'),
+            # The sent half of the request feed
+            models.Index(fields=['sender', 'created_at'], name='skillrequest_sent_idx'),
+            # Incremental exports read requests changed since a watermark
+            models.Index(fields=['updated_at'], name='skillrequest_updated_idx'),
+        ]
+
+
+class SkillStats(models.Model):
+    """
+    Running supply and demand totals per skill, kept in step with
+    UserSkills and SkillRequest writes
+    """
+    skill = models.OneToOneField(
+        Skills,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        help_text="Skill the totals belong to"
+    )
+    want_count = models.IntegerField(default=0, help_text="Users who want the skill")
+    offer_count = models.IntegerField(default=0, help_text="Users who offer the skill")
+    pending_request_count = models.IntegerField(default=0, help_text="Pending requests asking for the skill")
+    approved_request_count = models.IntegerField(default=0, help_text="Approved requests asking for the skill")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'skill_stats'
+        verbose_name = 'Skill stats'
+        verbose_name_plural = 'Skill stats'
+
+    def __str__(self):
+        return f"{self.skill_id}: {self.want_count} want / {self.offer_count} offer"
+
+
+class SkillStatsDaily(models.Model):
+    """
+    Per-day activity counts for a skill, used for trending windows
+    """
+    skill = models.ForeignKey(Skills, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField(help_text="Local date the activity happened on")
+    wants_added = models.IntegerField(default=0)
+    offers_added = models.IntegerField(default=0)
+    requests_created = models.IntegerField(default=0, help_text="Requests created asking for the skill")
+    requests_approved = models.IntegerField(default=0, help_text="Requests asking for the skill that were approved")
+
+    class Meta:
+        db_table = 'skill_stats_daily'
+        unique_together = ['skill', 'day']
+        indexes = [
+            models.Index(fields=['day'], name='skill_stats_daily_day_idx'),
+        ]
+        verbose_name = 'Daily skill stats'
+        verbose_name_plural = 'Daily skill stats'
+
+    def __str__(self):
+        return f"{self.skill_id} on {self.day}"
@@ -0,0 +1,64 @@
+import threading
+
+from skills.models import Skills, normalize_skill_name
+from utils.constatnt import CacheKeyConstants
+from utils.metrics import metrics
+from utils.versioning import get_version
+
+
+class SkillResolver:
+    """
+    Per-process map of normalized skill name -> (id, name).
+
+    Every Skills write bumps the shared catalog version once its transaction
+    commits; the map is only re-read when that version moves. Skills created
+    inside the caller's own uncommitted transaction are not visible yet, so
+    callers must treat unresolved names as possibly existing.
+    """
+
+    VERSION_KEY = CacheKeyConstants.SKILL_CATALOG_VERSION
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._skills = None
+        self._version = None
+
+    def get_skills(self):
+        version = get_version(self.VERSION_KEY)
+        if self._skills is None or self._version != version:
+            with self._lock:
+                if self._skills is None or self._version != version:
+                    metrics.incr('skill_resolver.reloads')
+                    self._skills = {
+                        key: (skill_id, name)
+                        for skill_id, name, key in Skills.objects.values_list(
+                            'id', 'name', 'normalized_name'
+                        ).iterator(chunk_size=10000)
+                    }
+                    self._version = version
+        return self._skills
+
+    def resolve_many(self, names):
+        """
+        Return {name: (id, canonical name)} for every name in `names` that
+        matches a skill; unknown names are left out
+        """
+        skills = self.get_skills()
+        resolved = {}
+        for name in names:
+            skill = skills.get(normalize_skill_name(name))
+            if skill is not None:
+                resolved[name] = skill
+        metrics.incr('skill_resolver.hits', len(resolved))
+        metrics.incr('skill_resolver.misses', len(names) - len(resolved))
+        return resolved
+
+    def resolve(self, name):
+        """
+        Return the id of the skill matching `name`, or None
+        """
+        skill = self.resolve_many([name]).get(name)
+        return skill[0] if skill else None
+
+
+skill_resolver = SkillResolver()
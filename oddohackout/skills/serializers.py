@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Skills, UserSkills, SkillRequest
+from .models import Skills, UserSkills, SkillRequest, normalize_skill_name
 from user_management.models import Users
+from skills.resolver import skill_resolver
 from utils.constatnt import SkillTypeConstants,StatusConstants
 
 class SkillsSerializer(serializers.ModelSerializer):
@@ -12,6 +13,23 @@ class SkillsSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'created_at']
         read_only_fields = ['created_at']
 
+    def validate_name(self, value):
+        skills = Skills.objects.filter(normalized_name=normalize_skill_name(value))
+        if self.instance is not None:
+            skills = skills.exclude(pk=self.instance.pk)
+        if skills.exists():
+            raise serializers.ValidationError("A skill with this name already exists.")
+        return value
+
+class PopularSkillsSerializer(SkillsSerializer):
+    """
+    Skills annotated with the number of users who list them
+    """
+    popularity = serializers.IntegerField(read_only=True)
+
+    class Meta(SkillsSerializer.Meta):
+        fields = SkillsSerializer.Meta.fields + ['popularity']
+
 class UserSkillsSerializer(serializers.ModelSerializer):        
     """
     Serializer for UserSkills model
@@ -61,20 +79,59 @@ class SkillRequestSerializer(serializers.ModelSerializer):
         wanted_skill_name = validated_data.pop('wanted_skill')
         offered_skill_name = validated_data.pop('offered_skill')
         
-        # Get skill objects
-        wanted_skill = Skills.objects.get(name=wanted_skill_name)
-        offered_skill = Skills.objects.get(name=offered_skill_name)
+        # Resolve both skill names in one lookup
+        resolved = skill_resolver.resolve_many([wanted_skill_name, offered_skill_name])
+        errors = {
+            field: f"Skill '{name}' does not exist"
+            for field, name in [('wanted_skill', wanted_skill_name), ('offered_skill', offered_skill_name)]
+            if name not in resolved
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
         
+        # Built from the resolver so the response needs no skill queries
+        wanted_id, wanted_name = resolved[wanted_skill_name]
+        offered_id, offered_name = resolved[offered_skill_name]
+
         # Create the skill request
         skill_request = SkillRequest.objects.create(
             sender=sender,
             receiver=validated_data['receiver'],
-            wanted_skill=wanted_skill,
-            offered_skill=offered_skill,
+            wanted_skill=Skills(id=wanted_id, name=wanted_name),
+            offered_skill=Skills(id=offered_id, name=offered_name),
             satatus=StatusConstants.PENDING
         )
         
         return skill_request
     def update(self, instance, validated_data):
         instance.satatus = validated_data.get('status', instance.satatus)
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class SkillRequestFeedSerializer(serializers.ModelSerializer):
+    """
+    A sent or received request as seen by the requesting user.
+    Expects sender, receiver and both skills to be select_related.
+    """
+    direction = serializers.SerializerMethodField()
+    counterpart = serializers.SerializerMethodField()
+    wanted_skill = serializers.CharField(source='wanted_skill.name', read_only=True)
+    offered_skill = serializers.CharField(source='offered_skill.name', read_only=True)
+    status = serializers.CharField(source='get_satatus_display', read_only=True)
+
+    class Meta:
+        model = SkillRequest
+        fields = [
+            'id', 'direction', 'counterpart', 'wanted_skill', 'offered_skill',
+            'status', 'created_at', 'updated_at'
+        ]
+
+    def is_sent(self, instance):
+        return instance.sender_id == self.context['request'].user.id
+
+    def get_direction(self, instance):
+        return 'sent' if self.is_sent(instance) else 'received'
+
+    def get_counterpart(self, instance):
+        user = instance.receiver if self.is_sent(instance) else instance.sender
+        return {'id': user.id, 'username': user.username, 'email': user.email}
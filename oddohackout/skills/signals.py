@@ -0,0 +1,144 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from skills.matching import skill_index
+from skills.models import SkillRequest, Skills, UserSkills
+from skills.stats import record_skill_requests, record_user_skills
+from skills.suggest import skill_suggester
+from utils.constatnt import CacheKeyConstants
+from utils.counting import count_cache
+from utils.versioning import bump_version
+
+
+count_cache.track(Skills, UserSkills, SkillRequest)
+
+# bulk_create sends no post_save; bulk writers send these with the created rows instead
+skills_bulk_created = Signal()  # skills=[Skills]
+user_skills_bulk_created = Signal()  # user_skills=[UserSkills]
+# rows=[(id, wanted_skill_id, offered_skill_id)], from_status, to_status
+skill_requests_transitioned = Signal()
+
+
+def catalog_changed(skill_ids, created=()):
+    """
+    Once the transaction commits, bump the catalog version, log the skills
+    it covers so in-memory copies of the catalog can patch just those, and
+    hand new skills to this process's suggester.
+    """
+    skill_ids = list(skill_ids)
+
+    def on_commit():
+        version = bump_version(CacheKeyConstants.SKILL_CATALOG_VERSION)
+        skill_suggester.log_changes(version, skill_ids)
+        for skill in created:
+            skill_suggester.add(skill.id, skill.name)
+
+    transaction.on_commit(on_commit)
+
+
+def adjust_popularity(skill_ids, delta):
+    def on_commit():
+        for skill_id in skill_ids:
+            skill_suggester.adjust_popularity(skill_id, delta)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_save, sender=Skills)
+def skill_saved(sender, instance, created, **kwargs):
+    catalog_changed([instance.pk], created=[instance] if created else ())
+
+
+@receiver(post_delete, sender=Skills)
+def skill_deleted(sender, instance, **kwargs):
+    catalog_changed([instance.pk])
+
+
+@receiver(skills_bulk_created, sender=Skills)
+def skills_created_in_bulk(sender, skills, **kwargs):
+    catalog_changed([skill.id for skill in skills], created=skills)
+    count_cache.invalidate(Skills)
+
+
+@receiver(pre_save, sender=UserSkills)
+def remember_previous_user_skill(sender, instance, **kwargs):
+    """Keep the stored skill and type so post_save can move the stats"""
+    instance._previous_user_skill = None
+    if instance.pk:
+        instance._previous_user_skill = UserSkills.objects.filter(pk=instance.pk).values_list(
+            'skill_id', 'type'
+        ).first()
+
+
+@receiver(post_save, sender=UserSkills)
+def count_user_skill(sender, instance, created, **kwargs):
+    current = (instance.skill_id, instance.type)
+    previous = getattr(instance, '_previous_user_skill', None)
+    if created or previous is None:
+        record_user_skills([current], 1)
+    elif previous != current:
+        record_user_skills([previous], -1)
+        record_user_skills([current], 1)
+
+
+@receiver(post_delete, sender=UserSkills)
+def uncount_user_skill(sender, instance, **kwargs):
+    record_user_skills([(instance.skill_id, instance.type)], -1)
+
+
+@receiver(pre_save, sender=SkillRequest)
+def remember_previous_request(sender, instance, **kwargs):
+    """Keep the stored wanted skill and status so post_save can move the stats"""
+    instance._previous_request = None
+    if instance.pk:
+        instance._previous_request = SkillRequest.objects.filter(pk=instance.pk).values_list(
+            'wanted_skill_id', 'satatus'
+        ).first()
+
+
+@receiver(post_save, sender=SkillRequest)
+def count_skill_request(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_request', None)
+    if created or previous is None:
+        record_skill_requests([(instance.wanted_skill_id, None, instance.satatus)], created=True)
+        return
+    previous_skill_id, previous_status = previous
+    if previous_skill_id != instance.wanted_skill_id:
+        record_skill_requests([
+            (previous_skill_id, previous_status, None),
+            (instance.wanted_skill_id, None, instance.satatus),
+        ])
+    else:
+        record_skill_requests([(instance.wanted_skill_id, previous_status, instance.satatus)])
+
+
+@receiver(post_delete, sender=SkillRequest)
+def uncount_skill_request(sender, instance, **kwargs):
+    record_skill_requests([(instance.wanted_skill_id, instance.satatus, None)])
+
+
+@receiver(post_save, sender=UserSkills)
+def index_user_skill(sender, instance, created, **kwargs):
+    skill_index.changed([instance.user_id])
+    if created:
+        adjust_popularity([instance.skill_id], 1)
+
+
+@receiver(post_delete, sender=UserSkills)
+def unindex_user_skill(sender, instance, **kwargs):
+    skill_index.changed([instance.user_id])
+    adjust_popularity([instance.skill_id], -1)
+
+
+@receiver(user_skills_bulk_created, sender=UserSkills)
+def index_user_skills_in_bulk(sender, user_skills, **kwargs):
+    skill_index.changed(user_skill.user_id for user_skill in user_skills)
+    adjust_popularity([user_skill.skill_id for user_skill in user_skills], 1)
+    record_user_skills([(user_skill.skill_id, user_skill.type) for user_skill in user_skills], 1)
+    count_cache.invalidate(UserSkills)
+
+
+@receiver(skill_requests_transitioned, sender=SkillRequest)
+def skill_requests_changed_in_bulk(sender, rows, from_status, to_status, **kwargs):
+    record_skill_requests([(wanted_skill_id, from_status, to_status) for _, wanted_skill_id, _ in rows])
+    count_cache.invalidate(SkillRequest)
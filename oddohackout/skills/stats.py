@@ -0,0 +1,174 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from skills.models import SkillRequest, SkillStats, SkillStatsDaily, Skills, UserSkills
+from utils.constatnt import SkillTypeConstants, StatusConstants
+
+TYPE_FIELDS = {
+    SkillTypeConstants.WANT: 'want_count',
+    SkillTypeConstants.OFFER: 'offer_count',
+}
+DAILY_TYPE_FIELDS = {
+    SkillTypeConstants.WANT: 'wants_added',
+    SkillTypeConstants.OFFER: 'offers_added',
+}
+STATUS_FIELDS = {
+    StatusConstants.PENDING: 'pending_request_count',
+    StatusConstants.APPROVED: 'approved_request_count',
+}
+DAILY_FIELDS = ['wants_added', 'offers_added', 'requests_created', 'requests_approved']
+TRENDING_WINDOWS = (7, 30)
+
+
+def apply_deltas(model, deltas, updates=None, **keys):
+    """
+    Add {skill_id: {field: delta}} to `model` rows with F() increments.
+    Missing rows are created only for skills with an increase; decreases just
+    update existing rows, since they may run while the skill is being deleted.
+    Skills with identical deltas share one UPDATE, so a bulk write costs the
+    same few queries as a single one.
+    """
+    deltas = {
+        skill_id: tuple(sorted((field, delta) for field, delta in fields.items() if delta))
+        for skill_id, fields in deltas.items()
+    }
+    deltas = {skill_id: fields for skill_id, fields in deltas.items() if fields}
+    if not deltas:
+        return
+
+    growing = [skill_id for skill_id, fields in deltas.items() if any(delta > 0 for _, delta in fields)]
+    if growing:
+        model.objects.bulk_create([model(skill_id=skill_id, **keys) for skill_id in growing], ignore_conflicts=True)
+    groups = defaultdict(list)
+    for skill_id, fields in deltas.items():
+        groups[fields].append(skill_id)
+    for fields, skill_ids in groups.items():
+        model.objects.filter(skill_id__in=skill_ids, **keys).update(
+            **{field: F(field) + delta for field, delta in fields},
+            **(updates or {})
+        )
+
+
+def record_user_skills(rows, sign):
+    """
+    Count (skill_id, type) rows as added (sign=1) or removed (sign=-1)
+    """
+    totals = defaultdict(Counter)
+    daily = defaultdict(Counter)
+    for skill_id, skill_type in rows:
+        totals[skill_id][TYPE_FIELDS[skill_type]] += sign
+        if sign > 0:
+            daily[skill_id][DAILY_TYPE_FIELDS[skill_type]] += 1
+    apply_deltas(SkillStats, totals, updates={'updated_at': timezone.now()})
+    apply_deltas(SkillStatsDaily, daily, day=timezone.localdate())
+
+
+def record_skill_requests(rows, created=False):
+    """
+    Count (wanted_skill_id, old_status, new_status) rows. old_status is None
+    for new requests (pass created=True) and new_status is None for removed ones.
+    """
+    totals = defaultdict(Counter)
+    daily = defaultdict(Counter)
+    for skill_id, old_status, new_status in rows:
+        if old_status == new_status:
+            continue
+        if old_status in STATUS_FIELDS:
+            totals[skill_id][STATUS_FIELDS[old_status]] -= 1
+        if new_status in STATUS_FIELDS:
+            totals[skill_id][STATUS_FIELDS[new_status]] += 1
+        if created:
+            daily[skill_id]['requests_created'] += 1
+        if new_status == StatusConstants.APPROVED:
+            daily[skill_id]['requests_approved'] += 1
+    apply_deltas(SkillStats, totals, updates={'updated_at': timezone.now()})
+    apply_deltas(SkillStatsDaily, daily, day=timezone.localdate())
+
+
+def trending_skills(window=7, limit=20):
+    """
+    Return the skills with the most activity over the last `window` days,
+    with their running totals and counts for every trending window
+    """
+    today = timezone.localdate()
+    since = {days: today - timedelta(days=days - 1) for days in TRENDING_WINDOWS}
+    counts = defaultdict(lambda: {f'last_{days}_days': dict.fromkeys(DAILY_FIELDS, 0) for days in TRENDING_WINDOWS})
+    rows = SkillStatsDaily.objects.filter(day__gte=min(since.values())).values_list('skill_id', 'day', *DAILY_FIELDS)
+    for skill_id, day, *values in rows:
+        for days, first_day in since.items():
+            if day >= first_day:
+                bucket = counts[skill_id][f'last_{days}_days']
+                for field, value in zip(DAILY_FIELDS, values):
+                    bucket[field] += value
+
+    key = f'last_{window}_days'
+    ranked = sorted(
+        (skill_id for skill_id in counts if any(counts[skill_id][key].values())),
+        key=lambda skill_id: (-sum(counts[skill_id][key].values()), skill_id)
+    )[:limit]
+    skills = Skills.objects.select_related('stats').in_bulk(ranked)
+
+    results = []
+    for skill_id in ranked:
+        skill = skills.get(skill_id)
+        if skill is None:
+            continue
+        stats = getattr(skill, 'stats', None)
+        results.append({
+            'id': skill.id,
+            'name': skill.name,
+            'totals': {field: getattr(stats, field, 0) for field in [*TYPE_FIELDS.values(), *STATUS_FIELDS.values()]},
+            **counts[skill_id],
+        })
+    return results
+
+
+def rebuild_skill_stats(days=max(TRENDING_WINDOWS)):
+    """
+    Recompute the running totals and the last `days` daily buckets from
+    UserSkills and SkillRequest. Approvals are dated by the request's
+    last update. Returns the number of skills with totals.
+    """
+    totals = defaultdict(Counter)
+    for skill_id, skill_type, total in UserSkills.objects.order_by().values_list('skill_id', 'type').annotate(
+        total=Count('id')
+    ):
+        totals[skill_id][TYPE_FIELDS[skill_type]] = total
+    for skill_id, request_status, total in SkillRequest.objects.order_by().filter(
+        satatus__in=list(STATUS_FIELDS)
+    ).values_list('wanted_skill_id', 'satatus').annotate(total=Count('id')):
+        totals[skill_id][STATUS_FIELDS[request_status]] = total
+
+    first_day = timezone.localdate() - timedelta(days=days - 1)
+    daily = defaultdict(Counter)
+    user_skills = UserSkills.objects.order_by().filter(created_at__date__gte=first_day).annotate(
+        day=TruncDate('created_at')
+    ).values_list('skill_id', 'day', 'type').annotate(total=Count('id'))
+    for skill_id, day, skill_type, total in user_skills:
+        daily[(skill_id, day)][DAILY_TYPE_FIELDS[skill_type]] += total
+    created = SkillRequest.objects.order_by().filter(created_at__date__gte=first_day).annotate(
+        day=TruncDate('created_at')
+    ).values_list('wanted_skill_id', 'day').annotate(total=Count('id'))
+    for skill_id, day, total in created:
+        daily[(skill_id, day)]['requests_created'] += total
+    approved = SkillRequest.objects.order_by().filter(
+        satatus=StatusConstants.APPROVED, updated_at__date__gte=first_day
+    ).annotate(day=TruncDate('updated_at')).values_list('wanted_skill_id', 'day').annotate(total=Count('id'))
+    for skill_id, day, total in approved:
+        daily[(skill_id, day)]['requests_approved'] += total
+
+    with transaction.atomic():
+        SkillStats.objects.all().delete()
+        SkillStatsDaily.objects.all().delete()
+        SkillStats.objects.bulk_create(
+            [SkillStats(skill_id=skill_id, **fields) for skill_id, fields in totals.items()], batch_size=1000
+        )
+        SkillStatsDaily.objects.bulk_create(
+            [SkillStatsDaily(skill_id=skill_id, day=day, **fields) for (skill_id, day), fields in daily.items()],
+            batch_size=1000
+        )
+    return len(totals)
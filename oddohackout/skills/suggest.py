@@ -0,0 +1,417 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from skills.models import Skills
+from utils.constatnt import CacheKeyConstants
+from utils.metrics import metrics
+from utils.versioning import get_version
+
+
+def normalize_query(text):
+    """Casefold and collapse whitespace so lookups ignore case and spacing"""
+    return " ".join(text.casefold().split())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class SkillSuggester:
+    """
+    In-memory autocomplete index over the Skills catalog.
+
+    Prefix lookups use a sorted array of search terms (the skill key and
+    every word-start suffix of it, so "learn" finds "Machine Learning"),
+    which behaves like a flattened trie without one object per character.
+    The best skills for every prefix of up to SHORT_PREFIX characters are
+    precomputed because those ranges are too wide to scan per keystroke.
+    When prefixes run out, term prefixes one edit away are tried next and
+    a trigram index supplies whatever typo-tolerant matches remain.
+
+    Every catalog write logs the skill ids it touched under the catalog
+    version it produced, so when the version moves the index re-reads just
+    those skills and adds, renames or drops them in place. Only the first
+    load runs inside a request; when the change log has gaps, and every
+    REFRESH_SECONDS to resync popularity, a fresh index is built in a
+    background thread and swapped in while the old one keeps serving.
+    """
+
+    VERSION_KEY = CacheKeyConstants.SKILL_CATALOG_VERSION
+    SHORT_PREFIX = 5
+    TOP_K = 20
+    MIN_SIMILARITY = 0.3
+    # Typo lookups count at most this many postings and score this many candidates
+    FUZZY_POSTINGS = 2000
+    FUZZY_CANDIDATES = 50
+    REFRESH_SECONDS = 600
+    # Versions further behind than this are cheaper to reload than to replay
+    MAX_REPLAY = 500
+    CHANGES_TIMEOUT = 60 * 60
+    INDEX_ATTRIBUTES = ('_skills', '_terms', '_short', '_trigrams', '_max_id', '_version', '_loaded_at', '_loaded')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reloading = False
+        self.clear()
+
+    def clear(self):
+        """
+        Forget the index so the next lookup loads it again
+        """
+        with self._lock:
+            self._loaded = False
+            self._version = None
+            self._loaded_at = 0
+            self._reset()
+
+    def _reset(self):
+        self._skills = {}
+        self._terms = []
+        self._short = {}
+        self._trigrams = {}
+        self._max_id = 0
+
+    @staticmethod
+    def changes_key(version):
+        return f"skills:catalog:changes:{version}"
+
+    @classmethod
+    def log_changes(cls, version, skill_ids):
+        """
+        Record which skills the catalog write that produced `version` touched
+        """
+        cache.set(cls.changes_key(version), list(skill_ids), cls.CHANGES_TIMEOUT)
+
+    def rank(self, skill_id):
+        _, key, popularity, _ = self._skills[skill_id]
+        return (-popularity, key)
+
+    @staticmethod
+    def search_terms(key):
+        words = key.split(" ")
+        return {" ".join(words[index:]) for index in range(len(words))}
+
+    def short_prefixes(self, key):
+        return {
+            term[:length]
+            for term in self.search_terms(key)
+            for length in range(1, min(len(term), self.SHORT_PREFIX) + 1)
+        }
+
+    def _index(self, skill_id, name, popularity):
+        key = normalize_query(name)
+        key_trigrams = trigrams(key)
+        self._skills[skill_id] = [name, key, popularity, len(key_trigrams)]
+        for trigram in key_trigrams:
+            self._trigrams.setdefault(trigram, set()).add(skill_id)
+        self._max_id = max(self._max_id, skill_id)
+        return key
+
+    def load(self, rows, version=None):
+        """
+        Replace the index with (id, name, popularity) rows
+        """
+        with self._lock:
+            self._reset()
+            for skill_id, name, popularity in rows:
+                key = self._index(skill_id, name, popularity)
+                for term in self.search_terms(key):
+                    self._terms.append((term, skill_id))
+            self._terms.sort()
+
+            prefixes = {}
+            for term, skill_id in self._terms:
+                for length in range(1, min(len(term), self.SHORT_PREFIX) + 1):
+                    prefixes.setdefault(term[:length], set()).add(skill_id)
+            self._short = {
+                prefix: heapq.nsmallest(self.TOP_K, skill_ids, key=self.rank)
+                for prefix, skill_ids in prefixes.items()
+            }
+            self._version = version
+            self._loaded_at = time.monotonic()
+            self._loaded = True
+
+    @staticmethod
+    def read_catalog():
+        return Skills.objects.annotate(popularity=Count('user_skills')).values_list(
+            'id', 'name', 'popularity'
+        ).iterator(chunk_size=10000)
+
+    def ensure_loaded(self):
+        version = get_version(self.VERSION_KEY)
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    metrics.incr('skill_suggester.loads')
+                    self.load(self.read_catalog(), version)
+            return
+        if time.monotonic() - self._loaded_at > self.REFRESH_SECONDS:
+            self.reload_in_background()
+        if self._version != version:
+            self.replay(version)
+
+    def replay(self, version):
+        """
+        Apply the logged catalog changes between the loaded version and `version`
+        """
+        start = self._version
+        if start is None or not 0 < version - start <= self.MAX_REPLAY:
+            self.reload_in_background()
+            return
+        keys = [self.changes_key(number) for number in range(start + 1, version + 1)]
+        logged = cache.get_many(keys)
+        if len(logged) < len(keys):
+            # An entry expired or its write has not landed yet
+            self.reload_in_background()
+            return
+        skill_ids = set().union(*logged.values())
+        names = dict(Skills.objects.filter(id__in=skill_ids).values_list('id', 'name'))
+        with self._lock:
+            if self._version != start:
+                return
+            for skill_id in skill_ids:
+                name = names.get(skill_id)
+                indexed = self._skills.get(skill_id)
+                if indexed is not None and indexed[0] == name:
+                    continue
+                popularity = self._remove(skill_id) if indexed is not None else 0
+                if name is not None:
+                    self._add(skill_id, name, popularity)
+            self._version = version
+
+    def reload_in_background(self):
+        """
+        Build a fresh index in another thread and swap it in when done
+        """
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, daemon=True).start()
+
+    def _reload(self):
+        try:
+            metrics.incr('skill_suggester.background_loads')
+            # Read the version first so changes made during the build are replayed after the swap
+            version = get_version(self.VERSION_KEY)
+            fresh = SkillSuggester()
+            fresh.load(self.read_catalog(), version)
+            with self._lock:
+                for attribute in self.INDEX_ATTRIBUTES:
+                    setattr(self, attribute, getattr(fresh, attribute))
+        finally:
+            self._reloading = False
+            connection.close()
+
+    def _matching(self, prefix):
+        low, high = self._range(prefix)
+        return {skill_id for _, skill_id in self._terms[low:high]}
+
+    def _refill(self, prefix):
+        top = heapq.nsmallest(self.TOP_K, self._matching(prefix), key=self.rank)
+        if top:
+            self._short[prefix] = top
+        else:
+            self._short.pop(prefix, None)
+
+    def _rerank_prefixes(self, skill_id, demoted=False):
+        """
+        Move `skill_id` within the precomputed top-K of each of its short
+        prefixes. A demoted skill may now rank below a skill left out of a
+        full list, so those lists are rebuilt from every matching term.
+        """
+        for prefix in self.short_prefixes(self._skills[skill_id][1]):
+            top = self._short.setdefault(prefix, [])
+            if demoted and skill_id in top and len(top) >= self.TOP_K:
+                self._refill(prefix)
+                continue
+            if skill_id not in top:
+                top.append(skill_id)
+            top.sort(key=self.rank)
+            del top[self.TOP_K:]
+
+    def _add(self, skill_id, name, popularity):
+        key = self._index(skill_id, name, popularity)
+        for term in self.search_terms(key):
+            insort(self._terms, (term, skill_id))
+        self._rerank_prefixes(skill_id)
+
+    def _remove(self, skill_id):
+        """
+        Drop a skill from every structure and return its popularity
+        """
+        _, key, popularity, _ = self._skills.pop(skill_id)
+        for trigram in trigrams(key):
+            posting = self._trigrams.get(trigram)
+            if posting is not None:
+                posting.discard(skill_id)
+                if not posting:
+                    del self._trigrams[trigram]
+        for term in self.search_terms(key):
+            position = bisect_left(self._terms, (term, skill_id))
+            if position < len(self._terms) and self._terms[position] == (term, skill_id):
+                del self._terms[position]
+        for prefix in self.short_prefixes(key):
+            if skill_id in self._short.get(prefix, ()):
+                self._refill(prefix)
+        return popularity
+
+    def add(self, skill_id, name):
+        """
+        Index a newly committed skill
+        """
+        with self._lock:
+            if not self._loaded or skill_id in self._skills:
+                return
+            self._add(skill_id, name, 0)
+
+    def adjust_popularity(self, skill_id, delta):
+        with self._lock:
+            if skill_id in self._skills:
+                self._skills[skill_id][2] += delta
+                self._rerank_prefixes(skill_id, demoted=delta < 0)
+
+    def suggest(self, query, limit=10):
+        """
+        Return up to `limit` skills for `query`, prefix matches first and
+        typo-tolerant matches after them, each group ordered by popularity
+        """
+        key = normalize_query(query)
+        if not key:
+            return []
+        self.ensure_loaded()
+        limit = min(limit, self.TOP_K)
+
+        with self._lock:
+            if len(key) <= self.SHORT_PREFIX:
+                skill_ids = self._short.get(key, [])[:limit]
+            else:
+                skill_ids = heapq.nsmallest(limit, self._matching(key), key=self.rank)
+            results = [self.describe(skill_id, 'prefix') for skill_id in skill_ids]
+
+            if len(results) < limit:
+                seen = set(skill_ids)
+                for skill_id in self.similar(key, limit - len(results), seen):
+                    results.append(self.describe(skill_id, 'fuzzy'))
+        return results
+
+    def similar(self, key, limit, exclude):
+        """
+        Return typo-tolerant matches for `key`: skills under a term prefix one
+        edit away first, then the closest skills by trigram similarity
+        """
+        found = self.near_matches(key, limit, exclude)
+        if len(found) < limit:
+            found += self.trigram_matches(key, limit - len(found), exclude | set(found))
+        return found
+
+    def _range(self, prefix, low=0, high=None):
+        """
+        Return the [low, high) slice of terms starting with `prefix`, searching
+        only inside the given bounds
+        """
+        high = len(self._terms) if high is None else high
+        return (
+            bisect_left(self._terms, (prefix,), low, high),
+            bisect_left(self._terms, (prefix + "\uffff",), low, high),
+        )
+
+    def _has_prefix(self, prefix, low, high):
+        position = bisect_left(self._terms, (prefix,), low, high)
+        return position < high and self._terms[position][0].startswith(prefix)
+
+    def _next_chars(self, prefix, low, high):
+        """
+        Return the characters that follow `prefix` in the terms[low:high] it
+        spans, jumping over each run of terms that share one
+        """
+        chars = []
+        # Terms equal to the prefix sort first and are skipped
+        position = bisect_left(self._terms, (prefix + "\x00",), low, high)
+        while position < high:
+            char = self._terms[position][0][len(prefix)]
+            chars.append(char)
+            position = bisect_left(self._terms, (prefix + char + "\uffff",), position, high)
+        return chars
+
+    def near_prefixes(self, key):
+        """
+        Return the term prefixes one insertion, deletion, substitution or
+        transposition away from `key`. Edits are only tried after a head of
+        `key` that is itself a term prefix, like walking a trie, and every
+        lookup stays inside the terms under that head.
+        """
+        found = set()
+        low, high = 0, len(self._terms)
+        for index in range(len(key) + 1):
+            head, rest = key[:index], key[index:]
+            low, high = self._range(head, low, high)
+            if low == high:
+                break
+            variants = set()
+            for char in self._next_chars(head, low, high):
+                variants.add(head + char + rest)
+                if rest:
+                    variants.add(head + char + rest[1:])
+            if rest:
+                variants.add(head + rest[1:])
+            if len(rest) > 1:
+                variants.add(head + rest[1] + rest[0] + rest[2:])
+            variants.discard(key)
+            found.update(variant for variant in variants if variant and self._has_prefix(variant, low, high))
+        return found
+
+    def near_matches(self, key, limit, exclude):
+        found = set()
+        for variant in self.near_prefixes(key):
+            if len(variant) <= self.SHORT_PREFIX:
+                found.update(self._short.get(variant, ()))
+            else:
+                found.update(heapq.nsmallest(limit + len(exclude), self._matching(variant), key=self.rank))
+        return heapq.nsmallest(limit, found - exclude, key=self.rank)
+
+    def trigram_matches(self, key, limit, exclude):
+        """
+        Return skills whose trigram similarity to `key` clears MIN_SIMILARITY.
+
+        Shared trigrams are counted over the query's posting lists, rarest
+        first, until FUZZY_POSTINGS entries have been read, and only the
+        FUZZY_CANDIDATES skills sharing the most are scored exactly.
+        """
+        query_trigrams = sorted(trigrams(key), key=lambda trigram: len(self._trigrams.get(trigram, ())))
+        postings = [self._trigrams.get(trigram, ()) for trigram in query_trigrams]
+        shared = Counter()
+        counted = 0
+        for posting in postings:
+            if counted and counted + len(posting) > self.FUZZY_POSTINGS:
+                break
+            shared.update(posting)
+            counted += len(posting)
+        for skill_id in exclude:
+            shared.pop(skill_id, None)
+
+        max_size = len(query_trigrams) / self.MIN_SIMILARITY
+        scored = []
+        for skill_id, _ in shared.most_common(self.FUZZY_CANDIDATES):
+            candidate_size = self._skills[skill_id][3]
+            if candidate_size > max_size:
+                continue
+            common = sum(1 for posting in postings if skill_id in posting)
+            similarity = common / (len(query_trigrams) + candidate_size - common)
+            if similarity >= self.MIN_SIMILARITY:
+                scored.append((-similarity, self.rank(skill_id), skill_id))
+        return [skill_id for _, _, skill_id in heapq.nsmallest(limit, scored)]
+
+    def describe(self, skill_id, match):
+        name, _, popularity, _ = self._skills[skill_id]
+        return {'id': skill_id, 'name': name, 'popularity': popularity, 'match': match}
+
+
+skill_suggester = SkillSuggester()
@@ -1,3 +1,693 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ratings.models import Rating
+from skills.matching import SkillIndex, skill_index
+from skills.resolver import skill_resolver
+from skills.suggest import SkillSuggester, skill_suggester
+from utils.counting import count_cache
+from utils.metrics import metrics
+from skills.models import SkillRequest, SkillStats, SkillStatsDaily, Skills, UserSkills, normalize_skill_name
 
-# Create your tests here.
+User = get_user_model()
+
+
+class MatchListViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.design = Skills.objects.create(name='Design')
+        self.me = self.create_user('me', want=[self.python, self.django], offer=[self.design])
+
+    def create_user(self, username, want=(), offer=()):
+        user = User.objects.create_user(
+            email=f'{username}@test.com',
+            username=username,
+            password='testpass123'
+        )
+        for skill in want:
+            UserSkills.objects.create(user=user, skill=skill, type='want')
+        for skill in offer:
+            UserSkills.objects.create(user=user, skill=skill, type='offer')
+        return user
+
+    def get_matches(self, **params):
+        return self.get_page(**params)['matches']
+
+    def get_page(self, **params):
+        self.client.force_authenticate(user=self.me)
+        response = self.client.get(reverse('apis:skills:matches'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def test_reciprocal_matches_are_ranked(self):
+        """Test only two-way matches are returned, best overlap and rating first"""
+        strong = self.create_user('strong', want=[self.design], offer=[self.python, self.django])
+        weak = self.create_user('weak', want=[self.design], offer=[self.python])
+        rated = self.create_user('rated', want=[self.design], offer=[self.django])
+        self.create_user('one_way', offer=[self.python])
+        hidden = self.create_user('hidden', want=[self.design], offer=[self.python])
+        hidden.is_privete = True
+        hidden.save()
+        Rating.objects.create(sender=self.me, receiver=rated, rating_count=5)
+
+        matches = self.get_matches()
+        self.assertEqual([match['id'] for match in matches], [strong.id, rated.id, weak.id])
+        self.assertEqual(matches[0]['match']['score'], 3)
+        self.assertEqual(matches[0]['match']['offers_you_want'], ['Python', 'Django'])
+        self.assertEqual(matches[0]['match']['wants_you_offer'], ['Design'])
+
+    def test_index_follows_user_skill_writes(self):
+        """Test the index is patched when user skills are added or removed"""
+        self.assertEqual(self.get_matches(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_user('other', want=[self.design], offer=[self.python])
+        self.assertIn(other.id, skill_index.users_with(self.python.id, 'offer'))
+        self.assertEqual([match['id'] for match in self.get_matches()], [other.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkills.objects.get(user=other, type='offer').delete()
+        self.assertNotIn(other.id, skill_index.users_with(self.python.id, 'offer'))
+        self.assertEqual(self.get_matches(), [])
+
+    def test_workers_replay_only_changed_users(self):
+        """Test a worker behind on the index patches the changed users instead of reloading"""
+        worker = SkillIndex()
+        worker.get_postings()
+        metrics.reset()
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_user('other', want=[self.design], offer=[self.python])
+            UserSkills.objects.get(user=self.me, skill=self.django).delete()
+        self.assertEqual(worker.users_with(self.python.id, 'offer'), [other.id])
+        self.assertEqual(worker.users_with(self.django.id, 'want'), [])
+        self.assertEqual(metrics.get('skill_index.reloads'), 0)
+        self.assertEqual(metrics.get('skill_index.replayed_users'), 2)
+
+    def test_pages_read_past_hidden_users(self):
+        """Test a page is filled from the ranking after hidden users are dropped"""
+        first = self.create_user('first', want=[self.design], offer=[self.python, self.django])
+        second = self.create_user('second', want=[self.design], offer=[self.python])
+        third = self.create_user('third', want=[self.design], offer=[self.django])
+        Rating.objects.create(sender=self.me, receiver=second, rating_count=5)
+        first.is_banned = True
+        first.save()
+
+        page = self.get_page(limit=1)
+        self.assertEqual([match['id'] for match in page['matches']], [second.id])
+        self.assertTrue(page['pagination']['has_next'])
+        page = self.get_page(limit=1, offset=1)
+        self.assertEqual([match['id'] for match in page['matches']], [third.id])
+        self.assertFalse(page['pagination']['has_next'])
+        self.assertEqual(page['pagination']['total_matches'], 2)
+        self.assertTrue(page['pagination']['count_is_exact'])
+
+
+class SkillSuggestTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        skill_suggester.clear()
+        self.user = User.objects.create_user(
+            email='user@test.com',
+            username='user',
+            password='testpass123'
+        )
+        self.python = Skills.objects.create(name='Python')
+        self.pytorch = Skills.objects.create(name='PyTorch')
+        self.machine_learning = Skills.objects.create(name='Machine Learning')
+        for index in range(3):
+            other = User.objects.create_user(
+                email=f'other{index}@test.com',
+                username=f'other{index}',
+                password='testpass123'
+            )
+            UserSkills.objects.create(user=other, skill=self.pytorch, type='offer')
+        UserSkills.objects.create(user=self.user, skill=self.python, type='want')
+
+    def suggest(self, query):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('apis:skills:skills-suggest'), {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def test_prefix_suggestions_by_popularity(self):
+        """Test prefix matches are ordered by how many users have the skill"""
+        suggestions = self.suggest('py')
+        self.assertEqual([skill['name'] for skill in suggestions], ['PyTorch', 'Python'])
+        self.assertEqual(suggestions[0]['popularity'], 3)
+        self.assertEqual(suggestions[0]['match'], 'prefix')
+
+    def test_word_prefix_and_typo_suggestions(self):
+        """Test later words and misspelt names are found"""
+        self.assertEqual(self.suggest('learn')[0]['name'], 'Machine Learning')
+        suggestions = self.suggest('Machne Learning')
+        self.assertEqual(suggestions[0]['name'], 'Machine Learning')
+        self.assertEqual(suggestions[0]['match'], 'fuzzy')
+
+    def test_new_skills_are_suggested(self):
+        """Test a created skill is suggested once committed"""
+        self.assertEqual(self.suggest('rust'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Skills.objects.create(name='Rust')
+        self.assertEqual([skill['name'] for skill in self.suggest('rus')], ['Rust'])
+
+    def test_renames_and_deletes_are_patched_in(self):
+        """Test renamed and deleted skills are applied without reloading the index"""
+        self.assertEqual([skill['name'] for skill in self.suggest('py')], ['PyTorch', 'Python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pytorch.name = 'Torch'
+            self.pytorch.save()
+            self.python.delete()
+        self.assertEqual(self.suggest('py'), [])
+        self.assertEqual([skill['name'] for skill in self.suggest('tor')], ['Torch'])
+        self.assertEqual(self.suggest('tor')[0]['popularity'], 3)
+        self.assertEqual(metrics.get('skill_suggester.loads'), 1)
+        self.assertEqual(metrics.get('skill_suggester.background_loads'), 0)
+
+    def test_one_edit_prefix_suggestions(self):
+        """Test a transposed or dropped letter still finds the skill"""
+        self.assertEqual(self.suggest('pyhton')[0]['name'], 'Python')
+        self.assertEqual(self.suggest('machne l')[0]['name'], 'Machine Learning')
+        self.assertEqual(self.suggest('pyhton')[0]['match'], 'fuzzy')
+
+    def test_demoted_skill_is_replaced_in_prefix_top(self):
+        """Test a skill losing users is overtaken by one left out of a full prefix list"""
+        suggester = SkillSuggester()
+        suggester.TOP_K = 1
+        suggester.load([(1, 'Python', 2), (2, 'PyTorch', 1)])
+        self.assertEqual(suggester._short['py'], [1])
+        suggester.adjust_popularity(1, -2)
+        self.assertEqual(suggester._short['py'], [2])
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.sender = User.objects.create_user(email='sender@test.com', username='sender', password='testpass123')
+        self.receiver = User.objects.create_user(email='receiver@test.com', username='receiver', password='testpass123')
+        self.skill_request = SkillRequest.objects.create(
+            sender=self.sender,
+            receiver=self.receiver,
+            wanted_skill=self.python,
+            offered_skill=self.django
+        )
+
+    def get(self, url, user, etag=None):
+        self.client.force_authenticate(user=user)
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_unchanged_inbox_is_not_modified(self):
+        """Test a matching If-None-Match returns 304 without a body"""
+        url = reverse('apis:skills:skill-requests-list')
+        response = self.get(url, self.receiver)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.get(url, self.receiver, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_changes_move_the_etag(self):
+        """Test request updates and skill renames produce a new ETag"""
+        url = reverse('apis:skills:skill-sender')
+        etag = self.get(url, self.sender)['ETag']
+
+        self.skill_request.satatus = 'approved'
+        self.skill_request.save()
+        response = self.get(url, self.sender, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.name = 'Python 3'
+            self.python.save()
+        response = self.get(url, self.sender, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data'][0]['wanted_skill'], 'Python 3')
+
+    def test_counterpart_changes_move_the_etag(self):
+        """Test renaming the other party of a request produces a new ETag"""
+        url = reverse('apis:skills:skill-sender')
+        etag = self.get(url, self.sender)['ETag']
+
+        self.receiver.username = 'renamed'
+        self.receiver.save()
+        response = self.get(url, self.sender, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data'][0]['receiver_username'], 'renamed')
+
+        etag = self.get(reverse('apis:skills:skill-requests-list'), self.receiver)['ETag']
+        self.sender.first_name = 'Renamed'
+        self.sender.save()
+        response = self.get(reverse('apis:skills:skill-requests-list'), self.receiver, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_catalog_etag_follows_catalog_version(self):
+        """Test the skill catalog revalidates until a skill is added"""
+        url = reverse('apis:skills:skills-list')
+        etag = self.get(url, self.sender)['ETag']
+        self.assertEqual(self.get(url, self.sender, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skills.objects.create(name='Rust')
+        self.assertEqual(self.get(url, self.sender, etag).status_code, status.HTTP_200_OK)
+
+
+class BulkUserSkillsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='user@test.com', username='user', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.python = Skills.objects.create(name='Python')
+        UserSkills.objects.create(user=self.user, skill=self.python, type='want')
+
+    def submit(self, names):
+        url = reverse('apis:skills:user-skills-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, {'type': 'want', 'skills': names}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']['data'], len(context.captured_queries)
+
+    def test_payload_is_unchanged(self):
+        """Test created, existing and already owned skills are reported as before"""
+        Skills.objects.create(name='Django')
+        with self.captureOnCommitCallbacks(execute=True):
+            data, _ = self.submit(['python', ' django ', 'rust', 'Rust'])
+        self.assertEqual([item['skill_name'] for item in data['created_user_skills']], ['Django', 'Rust'])
+        self.assertEqual(data['created_skills'], ['Rust'])
+        self.assertEqual(data['existing_skills'], ['Python', 'Django'])
+        self.assertEqual(data['already_exists'], ['Python'])
+        self.assertEqual(data['total_processed'], 3)
+        self.assertEqual(skill_index.users_with(Skills.objects.get(name='Rust').id, 'want'), [self.user.id])
+
+    def test_query_count_is_constant(self):
+        """Test a 200-skill submission takes about as many queries as a 2-skill one"""
+        skill_resolver.get_skills()
+        _, small = self.submit(['Small 1', 'Small 2'])
+        _, large = self.submit([f'Large {index}' for index in range(200)])
+        # Backends with a low bind-parameter limit split each bulk INSERT into a few batches
+        self.assertGreaterEqual(large, small)
+        self.assertLessEqual(large, small + 6)
+
+
+class SkillNormalizationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='user@test.com', username='user', password='testpass123')
+        self.other = User.objects.create_user(email='other@test.com', username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.python = Skills.objects.create(name='Python')
+        self.node = Skills.objects.create(name='Node.js')
+
+    def test_normalized_keys(self):
+        """Test case, whitespace and punctuation collapse but + and # are kept"""
+        self.assertEqual(normalize_skill_name('  PYTHON '), 'python')
+        self.assertEqual(normalize_skill_name('node_js'), normalize_skill_name('Node.js'))
+        self.assertNotEqual(normalize_skill_name('C++'), normalize_skill_name('C#'))
+        self.assertEqual(self.python.normalized_name, 'python')
+
+    def test_duplicate_spelling_is_rejected(self):
+        """Test a skill cannot be created under another spelling of an existing name"""
+        response = self.client.post(reverse('apis:skills:skills-list'), {'name': 'python '}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lookups_use_the_key(self):
+        """Test bulk creation, skill requests and the directory resolve other spellings"""
+        response = self.client.post(
+            reverse('apis:skills:user-skills-list'), {'type': 'offer', 'skills': ['node js']}, format='json'
+        )
+        self.assertEqual(response.json()['data']['data']['existing_skills'], ['Node.js'])
+
+        response = self.client.post(reverse('apis:skills:skill-requests-list'), {
+            'receiver': self.other.id, 'wanted_skill': 'PYTHON', 'offered_skill': 'node-js'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        skill_request = SkillRequest.objects.get()
+        self.assertEqual((skill_request.wanted_skill, skill_request.offered_skill), (self.python, self.node))
+
+        response = self.client.get(reverse('apis:user_management:user_list'), {'skills': 'NODE.JS'})
+        self.assertEqual([user['id'] for user in response.json()['data']['users']], [self.user.id])
+
+
+class SkillResolverTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.python = Skills.objects.create(name='Python')
+        self.rust = Skills.objects.create(name='Rust')
+
+    def test_reloads_only_when_catalog_changes(self):
+        """Test names resolve from memory until a skill write bumps the catalog version"""
+        self.assertEqual(
+            skill_resolver.resolve_many(['python', 'RUST', 'Go']),
+            {'python': (self.python.id, 'Python'), 'RUST': (self.rust.id, 'Rust')}
+        )
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(skill_resolver.resolve('Python '), self.python.id)
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(metrics.get('skill_resolver.reloads'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            go = Skills.objects.create(name='Go')
+        self.assertEqual(skill_resolver.resolve('go'), go.id)
+        self.assertEqual(metrics.get('skill_resolver.reloads'), 2)
+
+    def test_unknown_skill_in_request(self):
+        """Test a skill request naming an unknown skill is rejected"""
+        sender = User.objects.create_user(email='sender@test.com', username='sender', password='testpass123')
+        receiver = User.objects.create_user(email='receiver@test.com', username='receiver', password='testpass123')
+        self.client.force_authenticate(user=sender)
+        response = self.client.post(reverse('apis:skills:skill-requests-list'), {
+            'receiver': receiver.id, 'wanted_skill': 'Python', 'offered_skill': 'Cobol'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('offered_skill', response.json()['error'])
+
+
+class SkillCatalogTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user(email='user@test.com', username='user', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.skills = [Skills.objects.create(name=f'Skill {index}') for index in range(5)]
+        self.url = reverse('apis:skills:skills-list')
+
+    def test_full_catalog_snapshot(self):
+        """Test the unparameterised catalog is rendered once and served gzip-compressed"""
+        response = self.client.get(self.url)
+        self.assertEqual([skill['name'] for skill in response.json()['data']], [skill.name for skill in self.skills])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['data']), 5)
+        self.assertEqual(metrics.get('catalog_snapshot.builds'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skills.objects.create(name='Skill 5')
+        self.assertEqual(len(self.client.get(self.url).json()['data']), 6)
+        self.assertEqual(metrics.get('catalog_snapshot.builds'), 2)
+
+    def test_limit_offset_and_search(self):
+        """Test limit/offset pages and the name filter"""
+        body = self.client.get(self.url, {'limit': 2, 'offset': 2}).json()
+        self.assertEqual([skill['id'] for skill in body['data']], [skill.id for skill in self.skills[2:4]])
+        self.assertEqual(body['count'], 5)
+        self.assertTrue(body['count_is_exact'])
+
+        body = self.client.get(self.url, {'q': 'SKILL 3'}).json()
+        self.assertEqual([skill['name'] for skill in body['data']], ['Skill 3'])
+
+    def test_count_follows_joined_models(self):
+        """Test a cached count changes with writes to the tables its query joins"""
+        queryset = Skills.objects.filter(user_skills__type='want')
+        self.assertEqual(count_cache.count(queryset), (0, True))
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkills.objects.create(user=self.user, skill=self.skills[0], type='want')
+        self.assertEqual(count_cache.count(queryset), (1, True))
+
+    def test_popular_cursor_pages(self):
+        """Test popular ordering pages through cursors by popularity, then id"""
+        other = User.objects.create_user(email='other@test.com', username='other', password='testpass123')
+        for user in (self.user, other):
+            UserSkills.objects.create(user=user, skill=self.skills[3], type='offer')
+        UserSkills.objects.create(user=other, skill=self.skills[1], type='want')
+
+        body = self.client.get(self.url, {'popular': 'true', 'pagination': 'cursor', 'limit': 3}).json()['data']
+        self.assertEqual(
+            [(skill['id'], skill['popularity']) for skill in body['skills']],
+            [(self.skills[3].id, 2), (self.skills[1].id, 1), (self.skills[0].id, 0)]
+        )
+        body = self.client.get(self.url, {'popular': 'true', 'cursor': body['pagination']['next_cursor'], 'limit': 3}).json()['data']
+        self.assertEqual([skill['id'] for skill in body['skills']], [self.skills[2].id, self.skills[4].id])
+        self.assertFalse(body['pagination']['has_next'])
+
+
+class SkillRequestInboxTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.receiver = User.objects.create_user(email='receiver@test.com', username='receiver', password='testpass123')
+        self.senders = [
+            User.objects.create_user(email=f'sender{index}@test.com', username=f'sender{index}', password='testpass123')
+            for index in range(3)
+        ]
+        self.client.force_authenticate(user=self.receiver)
+        self.url = reverse('apis:skills:skill-requests-list')
+
+    def send(self, count, sender_index=0, satatus='pending'):
+        return [
+            SkillRequest.objects.create(
+                sender=self.senders[sender_index],
+                receiver=self.receiver,
+                wanted_skill=self.python,
+                offered_skill=self.django,
+                satatus=satatus
+            )
+            for _ in range(count)
+        ]
+
+    def get_inbox(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data'], len(context.captured_queries)
+
+    def test_query_count_does_not_grow(self):
+        """Test the inbox loads in at most two queries however many requests it holds"""
+        self.send(2)
+        _, small = self.get_inbox(limit=50)
+        for index in range(3):
+            self.send(10, sender_index=index)
+        data, large = self.get_inbox(limit=50)
+        self.assertEqual(len(data['requests']), 32)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+    def test_cursor_pages_newest_first(self):
+        """Test cursors walk the inbox newest first without repeats"""
+        requests = self.send(5)
+        first, _ = self.get_inbox(limit=3)
+        second, _ = self.get_inbox(limit=3, cursor=first['pagination']['next_cursor'])
+        ids = [item['id'] for item in first['requests'] + second['requests']]
+        self.assertEqual(ids, [skill_request.id for skill_request in reversed(requests)])
+        self.assertEqual(first['requests'][0]['wanted_skill_name'], 'Python')
+        self.assertFalse(second['pagination']['has_next'])
+
+    def test_status_filter(self):
+        """Test ?status= narrows the inbox and unknown statuses are rejected"""
+        self.send(2)
+        approved = self.send(1, satatus='approved')
+        data, _ = self.get_inbox(status='approved')
+        self.assertEqual([item['id'] for item in data['requests']], [approved[0].id])
+        self.assertEqual(self.client.get(self.url, {'status': 'archived'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SkillRequestFeedTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.me = User.objects.create_user(email='me@test.com', username='me', password='testpass123')
+        self.others = [
+            User.objects.create_user(email=f'other{index}@test.com', username=f'other{index}', password='testpass123')
+            for index in range(4)
+        ]
+        self.client.force_authenticate(user=self.me)
+
+    def request(self, sender, receiver):
+        return SkillRequest.objects.create(
+            sender=sender, receiver=receiver, wanted_skill=self.python, offered_skill=self.django
+        )
+
+    def test_feed_interleaves_directions(self):
+        """Test sent and received requests come back newest first with direction flags"""
+        sent = self.request(self.me, self.others[0])
+        received = self.request(self.others[1], self.me)
+        self.request(self.others[2], self.others[3])
+
+        data = self.client.get(reverse('apis:skills:skill-requests-feed')).json()['data']
+        self.assertEqual(
+            [(item['id'], item['direction'], item['counterpart']['username']) for item in data['requests']],
+            [(received.id, 'received', 'other1'), (sent.id, 'sent', 'other0')]
+        )
+        self.assertEqual(data['requests'][0]['wanted_skill'], 'Python')
+
+    def test_feed_etag_follows_counterparts(self):
+        """Test renaming a counterpart invalidates the feed's ETag"""
+        self.request(self.me, self.others[0])
+        url = reverse('apis:skills:skill-requests-feed')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.others[0].username = 'renamed'
+        self.others[0].save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['requests'][0]['counterpart']['username'], 'renamed')
+
+    def test_feed_query_count_does_not_grow(self):
+        """Test each feed page is one joined query however many requests it holds"""
+        url = reverse('apis:skills:skill-requests-feed')
+        self.request(self.me, self.others[0])
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'limit': 50})
+        for other in self.others:
+            self.request(self.me, other)
+            self.request(other, self.me)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url, {'limit': 50})
+        self.assertEqual(len(response.json()['data']['requests']), 9)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_sender_view_has_no_n_plus_one(self):
+        """Test the sent list query count does not depend on its length"""
+        url = reverse('apis:skills:skill-sender')
+        self.request(self.me, self.others[0])
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for other in self.others:
+            self.request(self.me, other)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['data']), 5)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class SkillRequestTransitionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.me = User.objects.create_user(email='me@test.com', username='me', password='testpass123')
+        self.other = User.objects.create_user(email='other@test.com', username='other', password='testpass123')
+        self.client.force_authenticate(user=self.me)
+
+    def request(self, sender, receiver, satatus='pending'):
+        return SkillRequest.objects.create(
+            sender=sender, receiver=receiver, wanted_skill=self.python, offered_skill=self.django, satatus=satatus
+        )
+
+    def test_bulk_transition_reports_outcomes(self):
+        """Test only my pending requests change, in one UPDATE, with an outcome per id"""
+        pending = [self.request(self.other, self.me) for _ in range(3)]
+        rejected = self.request(self.other, self.me, satatus='rejected')
+        not_mine = self.request(self.me, self.other)
+        ids = [skill_request.id for skill_request in pending] + [rejected.id, not_mine.id, 0]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse('apis:skills:skill-requests-transition'), {'ids': ids, 'status': 'approved'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()['data']
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual(
+            [(result['outcome'], result['status']) for result in data['outcomes']],
+            [('updated', 'approved')] * 3 + [('not_pending', 'rejected'), ('not_found', None), ('not_found', None)]
+        )
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "skills_skillrequest"') for query in context.captured_queries), 1)
+        self.assertEqual(SkillRequest.objects.filter(satatus='approved').count(), 3)
+        self.assertEqual(SkillRequest.objects.get(id=not_mine.id).satatus, 'pending')
+
+    def test_transition_applies_once(self):
+        """Test a second transition of the same request is a conflict, not a double apply"""
+        skill_request = self.request(self.other, self.me)
+        url = reverse('apis:skills:skill-requests-detail', kwargs={'pk': skill_request.id})
+        self.assertEqual(self.client.put(url, {'status': 'approved'}, format='json').status_code, status.HTTP_200_OK)
+        response = self.client.put(url, {'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(SkillRequest.objects.get(id=skill_request.id).satatus, 'approved')
+
+    def test_only_receiver_can_transition(self):
+        """Test a sender cannot approve their own request"""
+        skill_request = self.request(self.me, self.other)
+        url = reverse('apis:skills:skill-requests-detail', kwargs={'pk': skill_request.id})
+        self.assertEqual(self.client.put(url, {'status': 'approved'}, format='json').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.post(reverse('apis:skills:skill-requests-transition'), {'ids': ['x'], 'status': 'approved'}, format='json').status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+
+class SkillStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.me = User.objects.create_user(email='me@test.com', username='me', password='testpass123')
+        self.other = User.objects.create_user(email='other@test.com', username='other', password='testpass123')
+        self.client.force_authenticate(user=self.me)
+
+    def totals(self, skill):
+        stats = SkillStats.objects.get(skill=skill)
+        return stats.want_count, stats.offer_count, stats.pending_request_count, stats.approved_request_count
+
+    def test_totals_follow_writes(self):
+        """Test user skill and request writes, including bulk ones, move the totals"""
+        UserSkills.objects.create(user=self.me, skill=self.python, type='want')
+        offer = UserSkills.objects.create(user=self.other, skill=self.python, type='offer')
+        self.client.post(reverse('apis:skills:user-skills-list'), {'type': 'want', 'skills': ['Python', 'Django']}, format='json')
+        skill_request = SkillRequest.objects.create(
+            sender=self.other, receiver=self.me, wanted_skill=self.python, offered_skill=self.django
+        )
+        self.assertEqual(self.totals(self.python), (1, 1, 1, 0))
+        self.assertEqual(self.totals(self.django), (1, 0, 0, 0))
+
+        self.client.post(
+            reverse('apis:skills:skill-requests-transition'), {'ids': [skill_request.id], 'status': 'approved'}, format='json'
+        )
+        offer.delete()
+        self.assertEqual(self.totals(self.python), (1, 0, 0, 1))
+
+        SkillStats.objects.filter(skill=self.python).update(want_count=40)
+        call_command('rebuild_skill_stats', stdout=StringIO())
+        self.assertEqual(self.totals(self.python), (1, 0, 0, 1))
+
+    def test_deleting_skill_in_use(self):
+        """Test deleting a skill that is listed and requested cascades without recreating its stats rows"""
+        UserSkills.objects.create(user=self.me, skill=self.python, type='want')
+        UserSkills.objects.create(user=self.other, skill=self.python, type='offer')
+        SkillRequest.objects.create(
+            sender=self.other, receiver=self.me, wanted_skill=self.python, offered_skill=self.django
+        )
+        skill_id = self.python.id
+
+        Skills.objects.get(pk=skill_id).delete()
+        self.assertFalse(SkillStats.objects.filter(skill_id=skill_id).exists())
+        self.assertFalse(SkillStatsDaily.objects.filter(skill_id=skill_id).exists())
+
+    def test_trending_windows(self):
+        """Test trending ranks by activity in the window and reports both windows"""
+        UserSkills.objects.create(user=self.me, skill=self.python, type='want')
+        UserSkills.objects.create(user=self.other, skill=self.python, type='want')
+        UserSkills.objects.create(user=self.me, skill=self.django, type='offer')
+        old_day = timezone.localdate() - timedelta(days=10)
+        SkillStatsDaily.objects.create(skill=self.django, day=old_day, offers_added=5)
+
+        url = reverse('apis:skills:skills-trending')
+        week = self.client.get(url).json()['data']['skills']
+        self.assertEqual([skill['name'] for skill in week], ['Python', 'Django'])
+        self.assertEqual(week[0]['last_7_days']['wants_added'], 2)
+        self.assertEqual(week[0]['totals']['want_count'], 2)
+
+        month = self.client.get(url, {'window': 30}).json()['data']['skills']
+        self.assertEqual([skill['name'] for skill in month], ['Django', 'Python'])
+        self.assertEqual(month[0]['last_30_days']['offers_added'], 6)
+        self.assertEqual(self.client.get(url, {'window': 14}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,6 +1,6 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from skills.views import SkillsViewSet, UserSkillsViewSet, SkillRequestViewSet,SkillSenderView
+from skills.views import SkillsViewSet, UserSkillsViewSet, SkillRequestViewSet,SkillSenderView,MatchListView
 
 app_name = "skills"
 router = DefaultRouter()
@@ -10,4 +10,5 @@ router.register(r'skill-requests', SkillRequestViewSet, basename='skill-requests
 urlpatterns  = [
     path('', include(router.urls)),
     path('skill-sender/', SkillSenderView.as_view(), name='skill-sender'),
+    path('matches/', MatchListView.as_view(), name='matches'),
 ]       
\ No newline at end of file
@@ -1,17 +1,52 @@
 from django.shortcuts import render
-from skills.models import Skills, UserSkills, SkillRequest
-from skills.serializers import SkillsSerializer, UserSkillsSerializer,SkillRequestSerializer
+from skills.models import Skills, UserSkills, SkillRequest, normalize_skill_name
+from skills.serializers import SkillsSerializer, PopularSkillsSerializer, UserSkillsSerializer,SkillRequestSerializer,SkillRequestFeedSerializer
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from user_management.models import Users
-from utils.constatnt import SkillTypeConstants,StatusConstants
-from utils.paginator import CustomPagination
-from django.db.models import Q
+from utils.constatnt import SkillTypeConstants,StatusConstants,CacheKeyConstants
+from utils.paginator import CustomPagination, KeysetPagination
+from django.db.models import Q, Max, Count
 from rest_framework.views import APIView
+from skills.bulk import add_user_skills, transition_skill_requests
+from skills.catalog import catalog_snapshot
+from ratings.leaderboard import rating_leaderboard
+from skills.matching import skill_index
+from skills.stats import TRENDING_WINDOWS, trending_skills
+from skills.suggest import skill_suggester
+from user_management.directory import with_profile_data, serialize_directory_user
+from utils.conditional import conditional_get
+from utils.counting import count_cache
+from utils.versioning import get_version
+
 # Create your views here.
 
+TRANSITION_STATUSES = [StatusConstants.APPROVED, StatusConstants.REJECTED]
+MAX_TRANSITION_IDS = 500
+
+
+def skill_request_stamp(queryset):
+    """
+    Version stamp for a list of skill requests: the newest change to a request
+    or to a sender or receiver (whose names are serialized), the row count
+    (which catches deletes) and the catalog version for skill names
+    """
+    stamp = queryset.order_by().aggregate(
+        latest=Max('updated_at'),
+        senders=Max('sender__updated_at'),
+        receivers=Max('receiver__updated_at'),
+        total=Count('id')
+    )
+    return (
+        stamp['latest'], stamp['senders'], stamp['receivers'], stamp['total'],
+        get_version(CacheKeyConstants.SKILL_CATALOG_VERSION)
+    )
+
+
 class SkillsViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing skills
@@ -20,11 +55,57 @@ class SkillsViewSet(viewsets.ModelViewSet):
     serializer_class = SkillsSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
-    
+
+    def catalog_stamp(self, request, *args, **kwargs):
+        stamp = [
+            get_version(CacheKeyConstants.SKILL_CATALOG_VERSION),
+            'gzip' in request.headers.get('Accept-Encoding', ''),
+        ]
+        if request.query_params.get('popular'):
+            # Popularity moves with every user skill write
+            stamp.append(get_version(count_cache.generation_key(UserSkills)))
+        return stamp
+
+    @conditional_get(catalog_stamp)
     def list(self, request, *args, **kwargs):
+        """
+        List skills
+        Without parameters the whole catalog is served from a compressed snapshot.
+        ?limit=&offset= or ?cursor= (or ?pagination=cursor) page through it,
+        ?q=pyth filters by name and ?popular=true orders by how many users list a skill.
+        """
+        params = request.query_params
+        query = params.get('q', '').strip()
+        popular = params.get('popular', 'false').lower() == 'true'
+        cursor = params.get('cursor', None)
+        cursor_mode = cursor is not None or params.get('pagination') == 'cursor'
+        if not (query or popular or cursor_mode or 'limit' in params or 'offset' in params):
+            return catalog_snapshot.response(request)
+
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        ordering = [('id', False)]
+        serializer_class = SkillsSerializer
+        if query:
+            queryset = queryset.filter(normalized_name__contains=normalize_skill_name(query))
+        if popular:
+            queryset = queryset.annotate(popularity=Count('user_skills'))
+            ordering = [('popularity', True), ('id', False)]
+            serializer_class = PopularSkillsSerializer
+
+        if cursor_mode:
+            limit = int(params.get('limit', CustomPagination.default_limit))
+            paginator = KeysetPagination(ordering, limit)
+            page = paginator.paginate(queryset, cursor)
+            return Response({
+                'skills': serializer_class(page['results'], many=True).data,
+                'pagination': paginator.page_info(page)
+            }, status=status.HTTP_200_OK)
+
+        queryset = KeysetPagination(ordering).order(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(serializer_class(queryset, many=True).data)
+        return self.get_paginated_response(serializer_class(page, many=True).data)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -33,6 +114,33 @@ class SkillsViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request, *args, **kwargs):
+        """
+        Suggest existing skills for a partial or misspelt name
+        Expected format: ?q=pyth&limit=10
+        """
+        query = request.GET.get('q', '')
+        limit = int(request.GET.get('limit', 10))
+        return Response(skill_suggester.suggest(query, limit), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='trending')
+    def trending(self, request, *args, **kwargs):
+        """
+        Skills with the most wants, offers and requests recently, with running totals
+        Expected format: ?window=7 (or 30)&limit=20
+        """
+        window = int(request.GET.get('window', 7))
+        if window not in TRENDING_WINDOWS:
+            return Response({
+                'error': f'Window must be one of: {list(TRENDING_WINDOWS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(int(request.GET.get('limit', 20)), 100)
+        return Response({
+            'window': window,
+            'skills': trending_skills(window, limit)
+        }, status=status.HTTP_200_OK)
+
 
 class UserSkillsViewSet(viewsets.ModelViewSet):
     """
@@ -124,43 +232,11 @@ class UserSkillsViewSet(viewsets.ModelViewSet):
                 'error': 'No valid skills provided'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Process skills
-        user = self.request.user
-        created_user_skills = []
-        created_skills = []
-        existing_skills = []
-        already_exists = []
-        
-        for skill_name in cleaned_skills:
-            # Get or create the skill
-            skill, created = Skills.objects.get_or_create(
-                name__iexact=skill_name,
-                defaults={'name': skill_name}
-            )
-            
-            if created:
-                created_skills.append(skill.name)
-            else:
-                existing_skills.append(skill.name)
-            
-            # Create user skill if it doesn't exist
-            user_skill, user_skill_created = UserSkills.objects.get_or_create(
-                user=user,
-                skill=skill,
-                type=skill_type,
-                defaults={
-                    'user': user,
-                    'skill': skill,
-                    'type': skill_type
-                }
-            )
-            
-            if user_skill_created:
-                # Use the serializer to format the response
-                serializer = self.get_serializer(user_skill)
-                created_user_skills.append(serializer.data)
-            else:
-                already_exists.append(skill.name)
+        # Process skills as a set: one lookup, bulk inserts and one re-read
+        created_user_skills, created_skills, existing_skills, already_exists = add_user_skills(
+            self.request.user, skill_type, cleaned_skills
+        )
+        created_user_skills = self.get_serializer(created_user_skills, many=True).data
         
         return Response({
             'message': 'User skills processed successfully',
@@ -181,21 +257,67 @@ class SkillRequestViewSet(viewsets.ModelViewSet):
     serializer_class = SkillRequestSerializer
     permission_classes = [IsAuthenticated]
 
+    # Newest first; id breaks ties between requests created in the same instant
+    inbox_ordering = [('created_at', True), ('id', True)]
+
     def get_queryset(self):
         """
-        Filter skill requests by current user
+        Filter skill requests by current user, optionally by ?status=
         """
         user = self.request.user
-        return SkillRequest.objects.filter(receiver=user
-        ).order_by('-created_at')
-    
+        queryset = SkillRequest.objects.filter(receiver=user).select_related('wanted_skill', 'offered_skill')
+        request_status = self.request.query_params.get('status', None)
+        if request_status:
+            valid_statuses = [StatusConstants.PENDING, StatusConstants.APPROVED, StatusConstants.REJECTED]
+            if request_status not in valid_statuses:
+                raise ValidationError({'status': f'Status must be one of: {valid_statuses}'})
+            queryset = queryset.filter(satatus=request_status)
+        return KeysetPagination(self.inbox_ordering).order(queryset)
+
+    def inbox_stamp(self, request, *args, **kwargs):
+        return skill_request_stamp(self.get_queryset())
+
+    def get_feed_queryset(self):
+        user = self.request.user
+        return SkillRequest.objects.filter(Q(sender=user) | Q(receiver=user)).select_related(
+            'sender', 'receiver', 'wanted_skill', 'offered_skill'
+        )
+
+    def feed_stamp(self, request, *args, **kwargs):
+        # Covers the counterpart users too, whose names the feed serializes
+        return skill_request_stamp(self.get_feed_queryset())
+
+    @action(detail=False, methods=['get'], url_path='feed')
+    @conditional_get(feed_stamp)
+    def feed(self, request, *args, **kwargs):
+        """
+        Sent and received requests interleaved newest first, one joined query per page
+        Expected format: ?limit=20&cursor=<next_cursor>
+        """
+        paginator = KeysetPagination(
+            self.inbox_ordering, int(request.query_params.get('limit', CustomPagination.default_limit))
+        )
+        page = paginator.paginate(self.get_feed_queryset(), request.query_params.get('cursor', None))
+        serializer = SkillRequestFeedSerializer(page['results'], many=True, context=self.get_serializer_context())
+        return Response({
+            'requests': serializer.data,
+            'pagination': paginator.page_info(page)
+        }, status=status.HTTP_200_OK)
+
+    @conditional_get(inbox_stamp)
     def list(self, request, *args, **kwargs):
         """
-        List skill requests for the current user
+        List skill requests for the current user, newest first
+        Expected format: ?status=pending&limit=20&cursor=<next_cursor>
         """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination(
+            self.inbox_ordering, int(request.query_params.get('limit', CustomPagination.default_limit))
+        )
+        page = paginator.paginate(self.get_queryset(), request.query_params.get('cursor', None))
+        return Response({
+            'requests': self.get_serializer(page['results'], many=True).data,
+            'pagination': paginator.page_info(page)
+        }, status=status.HTTP_200_OK)
 
     def create(self, request, *args, **kwargs):
         """
@@ -217,45 +339,87 @@ class SkillRequestViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         """
-        Update a skill request
+        Approve or reject a pending request you received
         Expected format: {
             "status": "approved" or "rejected"
         }
         """
-        request_id = kwargs.get('pk')
+        new_status = request.data.get('status')
+        if new_status not in TRANSITION_STATUSES:
+            return Response({
+                'error': f'Status must be one of: {StatusConstants.APPROVED}, {StatusConstants.REJECTED}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         try:
-            skill_request = SkillRequest.objects.get(id=request_id)
-        except SkillRequest.DoesNotExist:
+            request_id = int(kwargs.get('pk'))
+        except (TypeError, ValueError):
             return Response({'error': 'Skill request not found'}, status=status.HTTP_404_NOT_FOUND)
-        data = request.data.copy()
-        if data.get('status'):
-            # Validate status
-            if data['status'] not in [StatusConstants.APPROVED, StatusConstants.REJECTED]:
-                return Response({
-                    'error': f'Status must be one of: {StatusConstants.APPROVED}, {StatusConstants.REJECTED}'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            skill_request.satatus = data['status']
-            skill_request.save()
+
+        outcome, current_status = transition_skill_requests(request.user, [request_id], new_status)[request_id]
+        if outcome == 'not_found':
+            return Response({'error': 'Skill request not found'}, status=status.HTTP_404_NOT_FOUND)
+        if outcome == 'not_pending':
+            return Response({
+                'error': f'Skill request is already {current_status}'
+            }, status=status.HTTP_409_CONFLICT)
         return Response({
             'message': 'Skill request updated successfully',
             'data': {
-                'id': skill_request.id,
-                'status': skill_request.satatus
+                'id': request_id,
+                'status': current_status
             }
         }, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], url_path='transition')
+    def transition(self, request, *args, **kwargs):
+        """
+        Approve or reject many pending requests you received in one statement
+        Expected format: {
+            "ids": [1, 2, 3],
+            "status": "approved" or "rejected"
+        }
+        """
+        new_status = request.data.get('status')
+        if new_status not in TRANSITION_STATUSES:
+            return Response({
+                'error': f'Status must be one of: {StatusConstants.APPROVED}, {StatusConstants.REJECTED}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        ids = request.data.get('ids')
+        if (
+            not isinstance(ids, list) or not ids or len(ids) > MAX_TRANSITION_IDS
+            or not all(isinstance(request_id, int) and not isinstance(request_id, bool) for request_id in ids)
+        ):
+            return Response({
+                'error': f'ids must be a list of 1 to {MAX_TRANSITION_IDS} request ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        outcomes = transition_skill_requests(request.user, ids, new_status)
+        return Response({
+            'status': new_status,
+            'updated': sum(1 for outcome, _ in outcomes.values() if outcome == 'updated'),
+            'outcomes': [
+                {'id': request_id, 'outcome': outcome, 'status': current_status}
+                for request_id, (outcome, current_status) in outcomes.items()
+            ]
+        }, status=status.HTTP_200_OK)
+
 class SkillSenderView(APIView):
     """
     Custom view to get sender information for skill requests
     """
     permission_classes = [IsAuthenticated]
 
+    def sent_stamp(self, request, *args, **kwargs):
+        return skill_request_stamp(SkillRequest.objects.filter(sender=request.user))
+
+    @conditional_get(sent_stamp)
     def get(self, request, *args, **kwargs):
         """
         Get sender information for a skill request
         """
         try:
-            skill_requests = SkillRequest.objects.filter(sender=request.user)
+            skill_requests = SkillRequest.objects.filter(sender=request.user).select_related(
+                'receiver', 'wanted_skill', 'offered_skill'
+            )
             data = []
             for skill_request in skill_requests:
                 data.append({
@@ -269,4 +433,88 @@ class SkillSenderView(APIView):
                 
             return Response(data, status=status.HTTP_200_OK)
         except SkillRequest.DoesNotExist:
-            return Response({'error': 'Skill request not found'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({'error': 'Skill request not found'}, status=status.HTTP_404_NOT_FOUND)
+
+class MatchListView(APIView):
+    """
+    Users who offer a skill you want and also want a skill you offer
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        List reciprocal matches ranked by skill overlap, then by rating
+        """
+        limit = int(request.GET.get('limit', 10))
+        offset = int(request.GET.get('offset', 0))
+
+        want_skill_ids = set()
+        offer_skill_ids = set()
+        for skill_id, skill_type in UserSkills.objects.filter(user=request.user).values_list('skill_id', 'type'):
+            if skill_type == SkillTypeConstants.WANT:
+                want_skill_ids.add(skill_id)
+            elif skill_type == SkillTypeConstants.OFFER:
+                offer_skill_ids.add(skill_id)
+
+        matches = skill_index.find_matches(request.user.id, want_skill_ids, offer_skill_ids)
+        _, rating_stats = rating_leaderboard.get_ranking()
+
+        def average_rating(user_id):
+            rating_sum, total_ratings = rating_stats.get(user_id, (0, 0))
+            return rating_sum / total_ratings if total_ratings else 0.0
+
+        # Rank inside the index and read past hidden users until one row beyond the page is known
+        needed = offset + limit + 1
+        visible_ids = []
+        ranked = []
+        size = needed
+        while len(visible_ids) < needed and len(ranked) < len(matches):
+            ranked_before = len(ranked)
+            ranked = skill_index.top_matches(matches, size, tiebreak=average_rating)
+            batch = ranked[ranked_before:]
+            visible = set(Users.objects.filter(
+                id__in=batch,
+                is_banned=False,
+                is_privete=False,
+                is_active=True
+            ).values_list('id', flat=True))
+            visible_ids.extend(user_id for user_id in batch if user_id in visible)
+            size *= 2
+        page_ids = visible_ids[offset:offset + limit]
+        if len(ranked) == len(matches):
+            total_matches, count_is_exact = len(visible_ids), True
+        else:
+            # Hidden users past the ranked prefix are not known yet
+            total_matches, count_is_exact = len(matches) - (len(ranked) - len(visible_ids)), False
+
+        users = with_profile_data(Users.objects.filter(id__in=page_ids)).in_bulk()
+        results = []
+        for user_id in page_ids:
+            user = users.get(user_id)
+            if user is None:
+                # Deleted since the visibility check
+                continue
+            user_data = serialize_directory_user(user)
+            offers_you_want, wants_you_offer = matches[user_id]
+            user_data['match'] = {
+                'score': offers_you_want + wants_you_offer,
+                'offers_you_want': [
+                    skill['skill_name'] for skill in user_data['offer_skills'] if skill['skill_id'] in want_skill_ids
+                ],
+                'wants_you_offer': [
+                    skill['skill_name'] for skill in user_data['want_skills'] if skill['skill_id'] in offer_skill_ids
+                ],
+            }
+            results.append(user_data)
+
+        return Response({
+            'matches': results,
+            'pagination': {
+                'total_matches': total_matches,
+                'count_is_exact': count_is_exact,
+                'limit': limit,
+                'offset': offset,
+                'has_next': len(visible_ids) > offset + limit,
+                'has_previous': offset > 0
+            }
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from utils.lru import LRUCache
+from utils.metrics import metrics
+from utils.versioning import bump_version, get_version
+
+
+class ProfileCache:
+    """
+    Two-tier cache of rendered profile documents, keyed per user.
+
+    The first tier is an LRU inside each worker process, the second is the
+    Django cache backend. Every user has a version stamp in the cache
+    backend and documents in both tiers are stored under that version, so
+    bumping it on a write makes every older copy unreachable at once.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(getattr(settings, 'PROFILE_CACHE_LOCAL_ENTRIES', 1024))
+
+    @staticmethod
+    def version_key(user_id):
+        return f"profile:version:{user_id}"
+
+    def version(self, user_id):
+        """
+        Return the current version stamp of a user's cached documents
+        """
+        return get_version(self.version_key(user_id))
+
+    def peek_version(self, user_id):
+        """
+        Return the version stamp of a user's documents, or None if there is none yet
+        """
+        return cache.get(self.version_key(user_id))
+
+    def get_or_build(self, kind, user_id, builder):
+        """
+        Return the `kind` document for a user, calling `builder()` on a miss.
+        A None document (no such user) is returned without storing anything,
+        not even a version stamp, so probing unknown ids cannot fill the cache
+        and a later signup under that id is never answered from it.
+        """
+        version = self.peek_version(user_id)
+        if version is not None:
+            key = f"profile:{kind}:{user_id}:{version}"
+            entry = self.local.get(key)
+            if entry is not None:
+                metrics.incr('profile_cache.local_hits')
+                return entry['document']
+            entry = cache.get(key)
+            if entry is not None:
+                metrics.incr('profile_cache.shared_hits')
+                self.local.set(key, entry)
+                return entry['document']
+
+        metrics.incr('profile_cache.misses')
+        document = builder()
+        if document is None:
+            return None
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(self.version_key(user_id), version, None):
+                # A write created the stamp while this document was built, so it may predate the write
+                return document
+        key = f"profile:{kind}:{user_id}:{version}"
+        entry = {'document': document}
+        cache.set(key, entry, getattr(settings, 'PROFILE_CACHE_TIMEOUT', 300))
+        self.local.set(key, entry)
+        return document
+
+    def invalidate(self, user_id):
+        """
+        Drop every cached document of a user once the current transaction commits
+        """
+        def on_commit():
+            metrics.incr('profile_cache.invalidations')
+            bump_version(self.version_key(user_id))
+
+        transaction.on_commit(on_commit)
+
+    def invalidate_many(self, user_ids):
+        """
+        Drop the cached documents of many users in one round trip once the
+        transaction commits; a missing stamp is recreated with a fresh value
+        """
+        user_ids = list(user_ids)
+
+        def on_commit():
+            metrics.incr('profile_cache.invalidations', len(user_ids))
+            cache.delete_many([self.version_key(user_id) for user_id in user_ids])
+
+        transaction.on_commit(on_commit)
+
+
+profile_cache = ProfileCache()
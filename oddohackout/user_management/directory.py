@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, FloatField, IntegerField, Prefetch, Value, When
+from django.db.models.functions import Coalesce
+from ratings.stats import get_rating_summary
+from skills.models import UserSkills
+from skills.resolver import skill_resolver
+from skills.serializers import UserSkillsSerializer
+from user_management.serializers import UserSerializer
+from utils.constatnt import SkillTypeConstants
+from utils.paginator import KeysetPagination
+
+
+# (field, descending) pairs; the last field is unique so the order is stable for keyset paging
+DIRECTORY_ORDERINGS = {
+    'rating': [('avg_rating', False), ('id', False)],
+    '-rating': [('avg_rating', True), ('id', False)],
+    'availability': [('availability_overlap', True), ('id', False)],
+}
+DEFAULT_ORDERING = [('id', False)]
+
+
+def get_directory_ordering(ordering=None):
+    return DIRECTORY_ORDERINGS.get(ordering, DEFAULT_ORDERING)
+
+
+def availability_overlap(slots):
+    """
+    Count how many of `slots` each user is available for
+    """
+    if not slots:
+        return Value(0, output_field=IntegerField())
+    overlap = None
+    for slot in slots:
+        matched = Case(
+            When(availability__overlaps=[slot], then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField()
+        )
+        overlap = matched if overlap is None else overlap + matched
+    return overlap
+
+
+def get_directory_queryset(skills_list=None, skill_type='all', ordering=None, availability=None, rank_slots=None):
+    """
+    Return the active, public users matching the skills filter.
+    The skills filter is applied as a subquery so no DISTINCT is needed and
+    the availability filter is a single bitwise AND on the availability mask.
+
+    `ordering` may be 'rating', '-rating' or 'availability' (most slots in
+    common with `rank_slots` first); users are ordered by id otherwise.
+    Users without ratings sort with an average of 0.
+    """
+    active_users = get_user_model().objects.filter(
+        is_banned=False,
+        is_privete=False,
+        is_active=True
+    )
+
+    if skills_list:
+        skill_ids = [skill_id for skill_id, _ in skill_resolver.resolve_many(skills_list).values()]
+        matching_skills = UserSkills.objects.filter(skill_id__in=skill_ids)
+        if skill_type in [SkillTypeConstants.WANT, SkillTypeConstants.OFFER]:
+            matching_skills = matching_skills.filter(type=skill_type)
+        active_users = active_users.filter(id__in=matching_skills.values('user_id'))
+
+    if availability:
+        active_users = active_users.filter(availability__overlaps=availability)
+
+    if ordering == 'availability':
+        active_users = active_users.annotate(availability_overlap=availability_overlap(rank_slots))
+    elif ordering in DIRECTORY_ORDERINGS:
+        active_users = active_users.annotate(
+            avg_rating=Coalesce(F('rating_stats__average_rating'), Value(0.0), output_field=FloatField())
+        )
+    return KeysetPagination(get_directory_ordering(ordering)).order(active_users)
+
+
+def with_profile_data(queryset):
+    """
+    Join the rating summary and prefetch skills so a page of users
+    is loaded with one query plus one prefetch query.
+    """
+    return queryset.select_related('rating_stats').prefetch_related(
+        Prefetch(
+            'user_skills',
+            queryset=UserSkills.objects.select_related('skill').order_by('id'),
+            to_attr='prefetched_skills'
+        )
+    )
+
+
+def add_skills_and_ratings(user, user_data):
+    """
+    Add the want/offer skill lists and rating summary to a serialized user.
+    Uses the skills prefetched by `with_profile_data` when present.
+    """
+    user_skills = getattr(user, 'prefetched_skills', None)
+    if user_skills is None:
+        user_skills = UserSkills.objects.filter(user=user).select_related('skill').order_by('id')
+
+    want_skills = []
+    offer_skills = []
+    for user_skill in user_skills:
+        if user_skill.type == SkillTypeConstants.WANT:
+            want_skills.append(user_skill)
+        elif user_skill.type == SkillTypeConstants.OFFER:
+            offer_skills.append(user_skill)
+
+    user_data['want_skills'] = UserSkillsSerializer(want_skills, many=True).data
+    user_data['offer_skills'] = UserSkillsSerializer(offer_skills, many=True).data
+    user_data.update(get_rating_summary(user))
+    return user_data
+
+
+def serialize_directory_user(user):
+    """
+    Build the directory entry for a user loaded through `with_profile_data`.
+    """
+    return add_skills_and_ratings(user, UserSerializer(user).data)
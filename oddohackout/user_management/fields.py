@@ -0,0 +1,93 @@
+from django import forms
+from django.db import models
+from django.db.models import Lookup
+from utils.constatnt import AvailabilityConstants
+
+# Bit positions are stored in the database, so only ever append to this list
+AVAILABILITY_SLOTS = [
+    AvailabilityConstants.WEEKDAYS,
+    AvailabilityConstants.WEEKENDS,
+    AvailabilityConstants.EVEINGS,
+    AvailabilityConstants.MORNINGS,
+    AvailabilityConstants.AFTERNOONS,
+    AvailabilityConstants.NIGHTS,
+    AvailabilityConstants.MONDAYS,
+    AvailabilityConstants.TUESDAYS,
+    AvailabilityConstants.WEDNESDAYS,
+    AvailabilityConstants.THURSDAYS,
+    AvailabilityConstants.FRIDAYS,
+    AvailabilityConstants.SATURDAYS,
+    AvailabilityConstants.SUNDAYS,
+]
+AVAILABILITY_BITS = {slot: 1 << position for position, slot in enumerate(AVAILABILITY_SLOTS)}
+
+
+def availability_to_mask(slots):
+    """
+    Convert a list of availability slots to its bitmask
+    """
+    mask = 0
+    for slot in slots:
+        if slot not in AVAILABILITY_BITS:
+            raise ValueError(f"'{slot}' is not a valid availability choice")
+        mask |= AVAILABILITY_BITS[slot]
+    return mask
+
+
+def mask_to_availability(mask):
+    """
+    Convert a bitmask back to the list of availability slots it contains
+    """
+    return [slot for slot in AVAILABILITY_SLOTS if mask & AVAILABILITY_BITS[slot]]
+
+
+class AvailabilityField(models.PositiveIntegerField):
+    """
+    A list of availability slots stored as an integer bitmask.
+    Python code reads and writes lists; the database sees one integer, so
+    overlap filters are a single bitwise AND.
+    """
+
+    @property
+    def validators(self):
+        # The integer range validators do not apply to the list form
+        return list(self._validators)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return mask_to_availability(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, list):
+            return value
+        return mask_to_availability(int(value))
+
+    def get_prep_value(self, value):
+        if isinstance(value, (list, tuple, set)):
+            return availability_to_mask(value)
+        return super().get_prep_value(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return forms.MultipleChoiceField(
+            choices=[(slot, slot.title()) for slot in AVAILABILITY_SLOTS],
+            required=not self.blank,
+            label=kwargs.get('label', self.verbose_name.capitalize()),
+            help_text=self.help_text,
+        )
+
+
+@AvailabilityField.register_lookup
+class AvailabilityOverlap(Lookup):
+    """
+    `availability__overlaps=[...]` matches rows sharing at least one slot
+    """
+    lookup_name = 'overlaps'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"({lhs} & {rhs}) <> 0", (*lhs_params, *rhs_params)
@@ -0,0 +1,136 @@
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from skills.bulk import ensure_skills
+from skills.models import UserSkills, normalize_skill_name
+from skills.signals import user_skills_bulk_created
+from user_management.fields import availability_to_mask, mask_to_availability
+from user_management.signals import users_bulk_created
+from utils.constatnt import SkillTypeConstants
+
+User = get_user_model()
+
+SKILL_COLUMNS = {
+    'wants': SkillTypeConstants.WANT,
+    'offers': SkillTypeConstants.OFFER,
+}
+
+
+def read_members(path, file_format=None):
+    """
+    Yield member rows as dicts from a CSV or NDJSON file, one at a time.
+    List columns are ';'-separated in CSV and arrays in NDJSON.
+    """
+    file_format = file_format or ('csv' if path.endswith('.csv') else 'ndjson')
+    with open(path, newline='') as source:
+        if file_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+def split_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(';') if item.strip()]
+    return list(value)
+
+
+def prepare_member(row):
+    """
+    Validate a member row and return (user fields, {skill type: [names]}).
+    Raises ValueError with the reason when the row cannot be imported.
+    """
+    for field in ('email', 'username', 'password'):
+        if not row.get(field):
+            raise ValueError(f"{field} is required")
+    availability = mask_to_availability(availability_to_mask(split_list(row.get('availability'))))
+
+    user = {
+        'email': User.objects.normalize_email(row['email']),
+        'username': row['username'],
+        'password': row['password'],
+        'first_name': row.get('first_name') or None,
+        'last_name': row.get('last_name') or None,
+        'availability': availability,
+    }
+    skills = {
+        skill_type: [name for name in split_list(row.get(column)) if normalize_skill_name(name)]
+        for column, skill_type in SKILL_COLUMNS.items()
+    }
+    return user, skills
+
+
+def import_members(rows, hash_passwords):
+    """
+    Create one batch of members with set-based queries: a lookup of clashing
+    accounts, one bulk_create each for users, missing skills and user skills.
+    `hash_passwords(passwords)` returns the hashes in order, so the caller
+    decides where the hashing work runs.
+
+    Returns (created users, [(row, reason)] for rejected rows in file order).
+    Rows are rejected for invalid data or an email/username already taken.
+    """
+    rejects = []
+    members = []
+    emails, usernames = set(), set()
+    for position, row in enumerate(rows):
+        try:
+            user, skills = prepare_member(row)
+        except ValueError as error:
+            rejects.append((position, row, str(error)))
+            continue
+        if user['email'] in emails or user['username'] in usernames:
+            rejects.append((position, row, "duplicate email or username in the file"))
+            continue
+        emails.add(user['email'])
+        usernames.add(user['username'])
+        members.append((position, row, user, skills))
+
+    taken_emails, taken_usernames = set(), set()
+    for email, username in User.objects.filter(Q(email__in=emails) | Q(username__in=usernames)).values_list(
+        'email', 'username'
+    ):
+        taken_emails.add(email)
+        taken_usernames.add(username)
+    accepted = []
+    for position, row, user, skills in members:
+        if user['email'] in taken_emails or user['username'] in taken_usernames:
+            rejects.append((position, row, "email or username already registered"))
+        else:
+            accepted.append((user, skills))
+    rejects = [(row, reason) for _, row, reason in sorted(rejects, key=lambda reject: reject[0])]
+    if not accepted:
+        return [], rejects
+
+    hashes = hash_passwords([user['password'] for user, _ in accepted])
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(**{**user, 'password': password_hash}) for (user, _), password_hash in zip(accepted, hashes)
+        ])
+
+        names = {}
+        for _, skills in accepted:
+            for skill_names in skills.values():
+                for name in skill_names:
+                    names.setdefault(normalize_skill_name(name), name)
+        resolved = ensure_skills(names)[0] if names else {}
+
+        user_skills = []
+        for created_user, (_, skills) in zip(users, accepted):
+            for skill_type, skill_names in skills.items():
+                skill_ids = dict.fromkeys(resolved[normalize_skill_name(name)][0] for name in skill_names)
+                user_skills.extend(
+                    UserSkills(user=created_user, skill_id=skill_id, type=skill_type) for skill_id in skill_ids
+                )
+        if user_skills:
+            UserSkills.objects.bulk_create(user_skills)
+            user_skills_bulk_created.send(sender=UserSkills, user_skills=user_skills)
+        users_bulk_created.send(sender=User, users=users)
+    return users, rejects
@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput per core for hits, wrong passwords and unknown users; all writes are rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help="Logins per case")
+
+    def measure(self, label, identifier, password, logins):
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            started, cpu_started = time.perf_counter(), time.process_time()
+            for _ in range(logins):
+                authenticate(username=identifier, password=password)
+            elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+        self.stdout.write(
+            f"{label}: {logins / elapsed:.1f} logins/sec, {logins / cpu if cpu else 0:.1f} logins/sec per core, "
+            f"{len(context.captured_queries) / logins:.1f} queries/login"
+        )
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        hasher = get_hasher()
+        self.stdout.write(f"hasher={hasher.algorithm} iterations={getattr(hasher, 'iterations', '-')}")
+        with transaction.atomic():
+            get_user_model().objects.create_user(
+                email='Bench-Login@Example.com', username='bench-login', password='bench-password'
+            )
+            self.measure('email hit', 'bench-login@example.com', 'bench-password', logins)
+            self.measure('username hit', 'bench-login', 'bench-password', logins)
+            self.measure('wrong password', 'bench-login', 'wrong-password', logins)
+            self.measure('unknown user', 'nobody@example.com', 'bench-password', logins)
+            transaction.set_rollback(True)
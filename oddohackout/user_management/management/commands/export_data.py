@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from utils.export import EXPORT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS, export_rows, parse_watermark, render_rows
+
+
+class Command(BaseCommand):
+    help = "Stream a dataset as NDJSON or CSV, optionally only rows changed since a watermark"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_DATASETS))
+        parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--since', help="ISO 8601 watermark; only rows changed at or after it are exported")
+        parser.add_argument(
+            '--after-id', type=int, help="With --since, resume after the row with this id and watermark"
+        )
+        parser.add_argument('--output', help="File to write to instead of stdout")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        dataset = EXPORT_DATASETS[options['dataset']]
+        since = None
+        if options['since']:
+            try:
+                since = parse_watermark(options['since'])
+            except ValueError as error:
+                raise CommandError(str(error))
+        if options['after_id'] is not None and since is None:
+            raise CommandError("--after-id needs --since")
+
+        position = dataset.fields.index(dataset.watermark)
+        id_position = dataset.fields.index('id')
+        progress = {'rows': 0, 'last': None}
+
+        def tracked(rows):
+            for row in rows:
+                progress['rows'] += 1
+                progress['last'] = row
+                yield row
+
+        rows = tracked(export_rows(dataset, since, options['after_id'], options['chunk_size']))
+        lines = render_rows(dataset, rows, options['export_format'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+        last = progress['last']
+        if last is not None:
+            resume = f"--since {last[position].isoformat()} --after-id {last[id_position]}"
+        elif options['since']:
+            resume = f"--since {options['since']}"
+            if options['after_id'] is not None:
+                resume += f" --after-id {options['after_id']}"
+        else:
+            resume = "(no --since)"
+        self.stderr.write(f"Exported {progress['rows']} rows; resume with {resume}")
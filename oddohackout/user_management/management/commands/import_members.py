@@ -0,0 +1,84 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from user_management.imports import import_members, read_members
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-register members from a CSV or NDJSON file (email, username, password, first_name, "
+        "last_name, availability, wants, offers), hashing passwords on a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'ndjson'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Hashing processes; 0 hashes in-process")
+        parser.add_argument('--checkpoint', help="JSON file recording how far the import got; an existing one resumes it")
+        parser.add_argument('--rejects', help="NDJSON file that receives rejected rows, without their passwords")
+
+    def handle(self, *args, **options):
+        offset = 0
+        if options['checkpoint'] and os.path.exists(options['checkpoint']):
+            with open(options['checkpoint']) as checkpoint:
+                offset = json.load(checkpoint)['offset']
+            self.stdout.write(f"Resuming after row {offset}")
+
+        executor = None
+        hash_passwords = lambda passwords: list(map(make_password, passwords))
+        if options['workers'] > 0:
+            executor = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+            hash_passwords = lambda passwords: list(executor.map(
+                make_password, passwords, chunksize=max(1, len(passwords) // (options['workers'] * 4))
+            ))
+
+        rejects = open(options['rejects'], 'a') if options['rejects'] else None
+        rows = islice(read_members(options['path'], options['file_format']), offset, None)
+        totals = {'created': 0, 'rejected': 0}
+        started = time.perf_counter()
+        try:
+            while batch := list(islice(rows, options['batch_size'])):
+                try:
+                    created, rejected = import_members(batch, hash_passwords)
+                except DatabaseError as error:
+                    # e.g. an account registered concurrently; the checkpoint still points before this
+                    # batch, so a re-run retries it and rejects only the rows that really clash
+                    raise CommandError(
+                        f"Batch after row {offset} failed: {error}. "
+                        f"Imported {totals['created']} members before it; re-run to resume."
+                    ) from error
+                totals['created'] += len(created)
+                totals['rejected'] += len(rejected)
+                if rejects:
+                    for row, reason in rejected:
+                        row = {field: value for field, value in row.items() if field != 'password'}
+                        rejects.write(json.dumps({**row, 'error': reason}) + '\n')
+                    rejects.flush()
+
+                offset += len(batch)
+                if options['checkpoint']:
+                    with open(options['checkpoint'], 'w') as checkpoint:
+                        json.dump({'offset': offset}, checkpoint)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"row {offset}: created={totals['created']} rejected={totals['rejected']} "
+                    f"rate={totals['created'] / elapsed if elapsed else 0:.0f} rows/sec"
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+            if rejects:
+                rejects.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['created']} members, rejected {totals['rejected']} in {elapsed:.1f}s"
+        ))
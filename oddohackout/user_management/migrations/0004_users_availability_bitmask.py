@@ -0,0 +1,55 @@
+from django.db import migrations
+
+import user_management.fields
+
+
+def availability_to_bits(apps, schema_editor):
+    Users = apps.get_model('user_management', 'Users')
+    batch = []
+    for user in Users.objects.only('id', 'availability').iterator(chunk_size=1000):
+        # Unknown slots were never valid input; drop them rather than fail the migration
+        user.availability_bits = [
+            slot for slot in (user.availability or []) if slot in user_management.fields.AVAILABILITY_BITS
+        ]
+        batch.append(user)
+        if len(batch) >= 1000:
+            Users.objects.bulk_update(batch, ['availability_bits'])
+            batch = []
+    Users.objects.bulk_update(batch, ['availability_bits'])
+
+
+def bits_to_availability(apps, schema_editor):
+    Users = apps.get_model('user_management', 'Users')
+    batch = []
+    for user in Users.objects.only('id', 'availability_bits').iterator(chunk_size=1000):
+        user.availability = user.availability_bits
+        batch.append(user)
+        if len(batch) >= 1000:
+            Users.objects.bulk_update(batch, ['availability'])
+            batch = []
+    Users.objects.bulk_update(batch, ['availability'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0003_users_availability_users_is_banned_users_is_privete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='availability_bits',
+            field=user_management.fields.AvailabilityField(blank=True, default=list, help_text='Select multiple availability options'),
+        ),
+        migrations.RunPython(availability_to_bits, bits_to_availability),
+        migrations.RemoveField(
+            model_name='users',
+            name='availability',
+        ),
+        migrations.RenameField(
+            model_name='users',
+            old_name='availability_bits',
+            new_name='availability',
+        ),
+    ]
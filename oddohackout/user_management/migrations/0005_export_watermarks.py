@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0004_users_availability_bitmask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the user was last updated'),
+        ),
+    ]
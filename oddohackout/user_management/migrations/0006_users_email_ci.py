@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:46
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0005_export_watermarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='email_ci',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Lower('email'), output_field=models.CharField(max_length=254)),
+        ),
+    ]
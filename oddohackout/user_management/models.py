@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser,BaseUserManager,PermissionsMixin
 from django_utils import choices
 from utils.constatnt import AvailabilityConstants
+from user_management.fields import AvailabilityField
 
 
 class CustomUserManager(BaseUserManager):
@@ -54,6 +56,13 @@ class Users(AbstractUser,PermissionsMixin):
         Sunday = choices.Choice(AvailabilityConstants.SUNDAYS, 'Sunday')
 
     email = models.EmailField(unique=True, blank=False, null=False)
+    # Lower-cased email maintained by the database, so case-insensitive logins can use an index
+    email_ci = models.GeneratedField(
+        expression=Lower('email'),
+        output_field=models.CharField(max_length=254),
+        db_persist=True,
+        db_index=True,
+    )
     username = models.CharField(max_length=150, unique=True, blank=False, null=False)
     password = models.CharField(max_length=128, blank=False, null=False)
     is_active = models.BooleanField(default=True)
@@ -62,9 +71,10 @@ class Users(AbstractUser,PermissionsMixin):
     first_name = models.CharField(max_length=30, blank=True, null=True)
     last_name = models.CharField(max_length=30, blank=True, null=True)
     profile_image = models.ImageField(upload_to='user_profiles/', blank=True, null=True,default='user_profiles/default_profile.png')
-    availability = models.JSONField(default=list, blank=True, help_text="Select multiple availability options")
+    availability = AvailabilityField(default=list, blank=True, help_text="Select multiple availability options")
     is_banned = models.BooleanField(default=False, help_text="Indicates if the user is banned from the platform")
     is_privete =  models.BooleanField(default=False, help_text="Indicates if the user profile is private")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text="Timestamp when the user was last updated")
     objects = CustomUserManager()
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
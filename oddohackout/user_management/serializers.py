@@ -2,7 +2,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
-from utils.constatnt import AvailabilityConstants
+from user_management.fields import AVAILABILITY_BITS, availability_to_mask, mask_to_availability
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
      def validate(self,attrs):
@@ -18,9 +18,23 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
+class AvailabilityListField(serializers.ListField):
+    """
+    Availability as a list of slot names, validated and de-duplicated
+    """
+    child = serializers.CharField()
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        for item in value:
+            if item not in AVAILABILITY_BITS:
+                raise serializers.ValidationError(f"'{item}' is not a valid availability choice")
+        # Remove duplicates and use the stored slot order so reads match writes
+        return mask_to_availability(availability_to_mask(value))
+
+
 class UserSerializer(serializers.ModelSerializer):
-    availability = serializers.ListField(
-        child=serializers.CharField(),
+    availability = AvailabilityListField(
         required=False,
         allow_empty=True,
         help_text="Select multiple availability options"
@@ -31,42 +45,16 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id','email','username','first_name','last_name','profile_image','password', 'availability']
         extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
 
-    def validate_availability(self, value):
-        """Validate that availability contains only valid choices"""
-        if value:
-            valid_choices = [
-                AvailabilityConstants.WEEKDAYS,
-                AvailabilityConstants.WEEKENDS,
-                AvailabilityConstants.EVEINGS,
-                AvailabilityConstants.MORNINGS,
-                AvailabilityConstants.AFTERNOONS,
-                AvailabilityConstants.NIGHTS,
-                AvailabilityConstants.MONDAYS,
-                AvailabilityConstants.TUESDAYS,
-                AvailabilityConstants.WEDNESDAYS,
-                AvailabilityConstants.THURSDAYS,
-                AvailabilityConstants.FRIDAYS,
-                AvailabilityConstants.SATURDAYS,
-                AvailabilityConstants.SUNDAYS,
-            ]
-            
-            for item in value:
-                if item not in valid_choices:
-                    raise serializers.ValidationError(f"'{item}' is not a valid availability choice")
-                    
-            # Remove duplicates while preserving order
-            unique_values = []
-            for item in value:
-                if item not in unique_values:
-                    unique_values.append(item)
-            return unique_values
-        return value
-
     def create(self, validated_data):
         return get_user_model().objects.create_user(**validated_data)
     
 class UserDetailUpdateDeleteSerializer(serializers.ModelSerializer):
-    
+    availability = AvailabilityListField(
+        required=False,
+        allow_empty=True,
+        help_text="Select multiple availability options"
+    )
+
     class Meta:
         model = get_user_model()
         fields = ['id', 'email', 'username','first_name','last_name','profile_image', 'availability', 'is_banned', 'is_privete']
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from oddohackout.authentication import auth_user_cache
+from ratings.models import Rating
+from ratings.signals import ratings_bulk_created, ratings_upserted
+from skills.models import UserSkills
+from skills.signals import user_skills_bulk_created
+from user_management.cache import profile_cache
+from user_management.models import Users
+from utils.counting import count_cache
+
+
+count_cache.track(Users, ignore_fields=['last_login', 'password'])
+
+# bulk_create sends no post_save; bulk writers send this with the created rows instead. users=[Users]
+users_bulk_created = Signal()
+
+
+@receiver([post_save, post_delete], sender=Users)
+def invalidate_user_profile(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.id)
+
+
+@receiver(users_bulk_created, sender=Users)
+def invalidate_user_profiles_in_bulk(sender, users, **kwargs):
+    # Profiles of these ids may have been looked up before they existed
+    profile_cache.invalidate_many(user.id for user in users)
+    count_cache.invalidate(Users)
+
+
+@receiver([post_save, post_delete], sender=Users)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    # Logins only touch last_login; anything else (active, banned, password, profile) may be read from request.user
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    auth_user_cache.invalidate(instance.id)
+
+
+@receiver([post_save, post_delete], sender=UserSkills)
+def invalidate_profile_skills(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.user_id)
+
+
+@receiver(user_skills_bulk_created, sender=UserSkills)
+def invalidate_profiles_skills_in_bulk(sender, user_skills, **kwargs):
+    for user_id in {user_skill.user_id for user_skill in user_skills}:
+        profile_cache.invalidate(user_id)
+
+
+@receiver([post_save, post_delete], sender=Rating)
+def invalidate_profile_ratings(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.receiver_id)
+    previous = getattr(instance, '_previous_rating', None)
+    if previous and previous[0] != instance.receiver_id:
+        profile_cache.invalidate(previous[0])
+
+
+@receiver(ratings_upserted, sender=Rating)
+def invalidate_profiles_ratings_in_bulk(sender, rows, **kwargs):
+    for receiver_id in {receiver_id for receiver_id, _, _ in rows}:
+        profile_cache.invalidate(receiver_id)
+
+
+@receiver(ratings_bulk_created, sender=Rating)
+def invalidate_profiles_ratings_created_in_bulk(sender, ratings, **kwargs):
+    for receiver_id in {rating.receiver_id for rating in ratings}:
+        profile_cache.invalidate(receiver_id)
@@ -1,3 +1,670 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.utils import timezone
+from skills.models import Skills, UserSkills
+from ratings.models import Rating
+from user_management.cache import profile_cache
+from utils.metrics import metrics
 
-# Create your tests here.
+User = get_user_model()
+
+
+class GetUserListViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.rater = User.objects.create_user(
+            email='rater@test.com',
+            username='rater',
+            password='testpass123'
+        )
+        self.users = []
+        for index in range(12):
+            user = User.objects.create_user(
+                email=f'user{index}@test.com',
+                username=f'user{index}',
+                password='testpass123'
+            )
+            UserSkills.objects.create(user=user, skill=self.python, type='offer')
+            UserSkills.objects.create(user=user, skill=self.django, type='want')
+            Rating.objects.create(sender=self.rater, receiver=user, rating_count=4)
+            self.users.append(user)
+
+    def get_users(self, **params):
+        return self.client.get(reverse('apis:user_management:user_list'), params)
+
+    def count_queries(self, **params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_users(**params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_user_list_payload(self):
+        """Test each user carries skills and rating statistics"""
+        response = self.get_users(limit=5, skills='Python', skill_type='offer')
+        data = response.json()['data']
+        self.assertEqual(len(data['users']), 5)
+        self.assertEqual(data['pagination']['total_users'], 12)
+        self.assertEqual(data['pagination']['total_pages'], 3)
+        self.assertEqual(data['filters']['skills'], 'Python')
+        self.assertEqual(data['filters']['skill_type'], 'offer')
+
+        user_data = data['users'][0]
+        self.assertEqual(user_data['id'], self.users[0].id)
+        self.assertEqual([skill['skill_name'] for skill in user_data['offer_skills']], ['Python'])
+        self.assertEqual([skill['skill_name'] for skill in user_data['want_skills']], ['Django'])
+        self.assertEqual(user_data['average_rating'], 4)
+        self.assertEqual(user_data['total_ratings'], 1)
+
+    def test_rating_ordering(self):
+        """Test users can be sorted by their average rating"""
+        Rating.objects.filter(receiver=self.users[5]).update(rating_count=5)
+        Rating.objects.filter(receiver=self.users[7]).update(rating_count=1)
+        call_command('rebuild_rating_stats', stdout=StringIO())
+
+        users = self.get_users(limit=12, ordering='-rating').json()['data']['users']
+        self.assertEqual(users[0]['id'], self.users[5].id)
+        self.assertEqual(users[0]['average_rating'], 5)
+        self.assertEqual(users[-1]['id'], self.users[7].id)
+
+    def test_skill_type_filter(self):
+        """Test the skill type restricts which side of the skill matches"""
+        response = self.get_users(skills='Python', skill_type='want')
+        self.assertEqual(response.json()['data']['pagination']['total_users'], 0)
+
+    def test_query_count_is_constant(self):
+        """Test the number of queries does not grow with the page size"""
+        self.assertEqual(self.count_queries(limit=2), self.count_queries(limit=12))
+        self.assertEqual(
+            self.count_queries(limit=2, skills='Python'),
+            self.count_queries(limit=12, skills='Python')
+        )
+
+
+class UserListCountCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skills.objects.create(name='Python')
+        for index in range(3):
+            user = User.objects.create_user(
+                email=f'user{index}@test.com',
+                username=f'user{index}',
+                password='testpass123'
+            )
+            UserSkills.objects.create(user=user, skill=self.python, type='offer')
+
+    def get_pagination(self, **params):
+        response = self.client.get(reverse('apis:user_management:user_list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']['pagination']
+
+    def test_count_is_cached_per_filter_set(self):
+        """Test repeated listings with equivalent filters reuse the count"""
+        metrics.reset()
+        self.assertEqual(self.get_pagination(skills='Python')['total_users'], 3)
+        pagination = self.get_pagination(skills='Python,Python', ordering='-rating')
+        self.assertEqual(pagination['total_users'], 3)
+        self.assertTrue(pagination['count_is_exact'])
+        self.assertEqual(metrics.get('count_cache.misses'), 1)
+        self.assertEqual(metrics.get('count_cache.hits'), 1)
+
+    def test_writes_invalidate_count(self):
+        """Test new users and skills change the cached count"""
+        self.assertEqual(self.get_pagination()['total_users'], 3)
+        self.assertEqual(self.get_pagination(skills='Python')['total_users'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(email='new@test.com', username='new', password='testpass123')
+        self.assertEqual(self.get_pagination()['total_users'], 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkills.objects.create(user=user, skill=self.python, type='offer')
+        self.assertEqual(self.get_pagination(skills='Python')['total_users'], 4)
+
+    def test_last_login_does_not_invalidate_count(self):
+        """Test saves that only touch last_login keep the cached count"""
+        self.get_pagination()
+        metrics.reset()
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(username='user0')
+            user.save(update_fields=['last_login'])
+        self.get_pagination()
+        self.assertEqual(metrics.get('count_cache.hits'), 1)
+
+    def test_cursor_total_is_flagged(self):
+        """Test cursor pages report whether the optional total is exact"""
+        pagination = self.get_pagination(pagination='cursor', include_total='true')
+        self.assertEqual(pagination['total_users'], 3)
+        self.assertTrue(pagination['count_is_exact'])
+
+
+class UserListCursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.rater = User.objects.create_user(
+            email='rater@test.com',
+            username='rater',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                email=f'user{index}@test.com',
+                username=f'user{index}',
+                password='testpass123'
+            )
+            for index in range(7)
+        ]
+        for user, value in zip(self.users, [3, 5, 1, 5, 2, 4, 3]):
+            Rating.objects.create(sender=self.rater, receiver=user, rating_count=value)
+
+    def get_page(self, **params):
+        response = self.client.get(reverse('apis:user_management:user_list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def walk(self, **params):
+        """Follow next cursors to the end, then previous cursors back to the start"""
+        pages = [self.get_page(pagination='cursor', limit=3, **params)]
+        while pages[-1]['pagination']['next_cursor']:
+            pages.append(self.get_page(cursor=pages[-1]['pagination']['next_cursor'], limit=3, **params))
+        forward = [user['id'] for page in pages for user in page['users']]
+
+        backward = []
+        page = pages[-1]
+        while page['pagination']['previous_cursor']:
+            page = self.get_page(cursor=page['pagination']['previous_cursor'], limit=3, **params)
+            backward = [user['id'] for user in page['users']] + backward
+        return forward, backward
+
+    def test_cursor_walk_by_id(self):
+        """Test cursors visit every user once in id order, in both directions"""
+        forward, backward = self.walk()
+        expected = sorted(user.id for user in [self.rater] + self.users)
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected[:-2])
+
+    def test_cursor_walk_by_rating(self):
+        """Test cursors keyed on (average rating, id)"""
+        forward, _ = self.walk(ordering='-rating')
+        ratings = {user.id: value for user, value in zip(self.users, [3, 5, 1, 5, 2, 4, 3])}
+        ratings[self.rater.id] = 0
+        expected = sorted(ratings, key=lambda user_id: (-ratings[user_id], user_id))
+        self.assertEqual(forward, expected)
+
+    def test_total_is_optional(self):
+        """Test the total is only counted when requested"""
+        page = self.get_page(pagination='cursor', limit=3)
+        self.assertNotIn('total_users', page['pagination'])
+        self.assertFalse(page['pagination']['has_previous'])
+
+        page = self.get_page(pagination='cursor', limit=3, include_total='true')
+        self.assertEqual(page['pagination']['total_users'], 8)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(reverse('apis:user_management:user_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileCacheTestMixin:
+    def setUp(self):
+        cache.clear()
+        profile_cache.local.clear()
+        metrics.reset()
+        self.python = Skills.objects.create(name='Python')
+        self.django = Skills.objects.create(name='Django')
+        self.user = User.objects.create_user(
+            email='user@test.com',
+            username='user',
+            password='testpass123'
+        )
+        self.rater = User.objects.create_user(
+            email='rater@test.com',
+            username='rater',
+            password='testpass123'
+        )
+        UserSkills.objects.create(user=self.user, skill=self.python, type='offer')
+
+    def get_public_profile(self):
+        response = self.client.get(reverse('apis:user_management:user_detail_update', kwargs={'pk': self.user.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def get_own_profile(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('apis:user_management:profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def test_repeated_reads_are_served_from_cache(self):
+        """Test the second read of a profile runs no queries"""
+        first = self.get_public_profile()
+        with self.assertNumQueries(0):
+            second = self.get_public_profile()
+        self.assertEqual(first, second)
+        self.assertEqual(metrics.get('profile_cache.misses'), 1)
+        self.assertEqual(metrics.get('profile_cache.local_hits'), 1)
+
+    def test_shared_tier_is_used_by_other_workers(self):
+        """Test a cold process-local tier falls back to the cache backend"""
+        self.get_public_profile()
+        profile_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.get_public_profile()
+        self.assertEqual(metrics.get('profile_cache.shared_hits'), 1)
+
+    def test_writes_invalidate_profiles(self):
+        """Test user, skill and rating writes are visible on the next read"""
+        self.get_public_profile()
+        self.get_own_profile()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkills.objects.create(user=self.user, skill=self.django, type='want')
+        self.assertEqual([skill['skill_name'] for skill in self.get_public_profile()['want_skills']], ['Django'])
+        self.assertEqual([skill['skill_name'] for skill in self.get_own_profile()['want_skills']], ['Django'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(sender=self.rater, receiver=self.user, rating_count=5)
+        self.assertEqual(self.get_public_profile()['total_ratings'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Changed'
+            self.user.save()
+        self.assertEqual(self.get_own_profile()['first_name'], 'Changed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_privete = True
+            self.user.save()
+        response = self.client.get(reverse('apis:user_management:user_detail_update', kwargs={'pk': self.user.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'profile-cache-tests'}
+})
+class LocMemProfileCacheTest(ProfileCacheTestMixin, APITestCase):
+    pass
+
+
+class FileBasedProfileCacheTest(ProfileCacheTestMixin, APITestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class ProfileConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        profile_cache.local.clear()
+        self.user = User.objects.create_user(email='user@test.com', username='user', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def test_profile_revalidates_until_changed(self):
+        """Test the profile returns 304 for its ETag until the user is updated"""
+        url = reverse('apis:user_management:profile')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context.captured_queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Changed'
+            self.user.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_public_profile_etag(self):
+        """Test public profiles carry an ETag and missing users do not"""
+        url = reverse('apis:user_management:user_detail_update', kwargs={'pk': self.user.id})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        missing = self.client.get(reverse('apis:user_management:user_detail_update', kwargs={'pk': 0}))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(missing.has_header('ETag'))
+
+    def test_unknown_ids_are_not_cached(self):
+        """Test a 404 for an unknown id stores nothing and does not outlive a later signup"""
+        missing = self.user.id + 1000
+        url = reverse('apis:user_management:user_detail_update', kwargs={'pk': missing})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(profile_cache.peek_version(missing))
+        # bulk_create sends no signals, so nothing invalidates the id
+        User.objects.bulk_create([User(id=missing, email='late@test.com', username='late', password='x')])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+
+class AvailabilityTest(APITestCase):
+    def setUp(self):
+        self.weekends = self.create_user('weekends', ['weekends'])
+        self.evenings = self.create_user('evenings', ['evenings', 'weekends', 'nights'])
+        self.mornings = self.create_user('mornings', ['mornings'])
+
+    def create_user(self, username, availability):
+        return User.objects.create_user(
+            email=f'{username}@test.com',
+            username=username,
+            password='testpass123',
+            availability=availability
+        )
+
+    def get_users(self, **params):
+        response = self.client.get(reverse('apis:user_management:user_list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [user['id'] for user in response.json()['data']['users']]
+
+    def test_availability_is_stored_as_a_bitmask(self):
+        """Test availability reads back as a list in slot order"""
+        user = User.objects.get(pk=self.evenings.pk)
+        self.assertEqual(user.availability, ['weekends', 'evenings', 'nights'])
+        self.assertEqual(User.objects.filter(availability__overlaps=['nights']).get(), user)
+
+    def test_api_reads_and_writes_lists(self):
+        """Test the profile endpoint accepts and returns availability lists"""
+        self.client.force_authenticate(user=self.mornings)
+        response = self.client.put(
+            reverse('apis:user_management:profile'),
+            {'availability': ['monday', 'mornings', 'monday']},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['availability'], ['mornings', 'monday'])
+
+        response = self.client.put(
+            reverse('apis:user_management:profile'), {'availability': ['someday']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_availability(self):
+        """Test users sharing any requested slot are returned"""
+        self.assertEqual(self.get_users(availability='weekends,evenings'), [self.weekends.id, self.evenings.id])
+        self.assertEqual(self.get_users(availability='mornings'), [self.mornings.id])
+        response = self.client.get(reverse('apis:user_management:user_list'), {'availability': 'someday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rank_by_overlap_with_caller(self):
+        """Test users sharing more of the caller's slots come first"""
+        caller = self.create_user('caller', ['weekends', 'evenings', 'nights'])
+        self.client.force_authenticate(user=caller)
+        self.assertEqual(
+            self.get_users(ordering='availability', limit=3),
+            [self.evenings.id, caller.id, self.weekends.id]
+        )
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', username='admin', password='testpass123')
+        self.user = User.objects.create_user(
+            email='user@test.com', username='user', password='testpass123', availability=['weekends', 'evenings']
+        )
+        self.url = reverse('apis:export', kwargs={'dataset': 'users'})
+        # Exports hold back rows changed in the last few minutes
+        self.settled = timezone.now() - timedelta(hours=1)
+        User.objects.update(updated_at=self.settled)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_admin_only(self):
+        """Test non-admins cannot export"""
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_streams_ndjson_and_csv(self):
+        """Test the export streams one row per user in either format, without passwords"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['admin', 'user'])
+        self.assertEqual(rows[1]['availability'], ['weekends', 'evenings'])
+        self.assertNotIn('password', rows[0])
+
+        lines = self.read(self.client.get(self.url, {'output': 'csv'})).splitlines()
+        self.assertTrue(lines[0].startswith('id,email,username'))
+        self.assertIn('weekends;evenings', lines[2])
+
+    def test_since_watermark(self):
+        """Test only rows changed after the watermark are exported"""
+        self.client.force_authenticate(user=self.admin)
+        self.user.refresh_from_db()
+        User.objects.filter(pk=self.admin.pk).update(updated_at=self.user.updated_at - timedelta(days=1))
+        since = self.user.updated_at.isoformat()
+        rows = self.read(self.client.get(self.url, {'since': since})).splitlines()
+        self.assertEqual([json.loads(row)['username'] for row in rows], ['user'])
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(reverse('apis:export', kwargs={'dataset': 'passwords'})).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+    def test_resumes_after_tied_and_recent_rows(self):
+        """Test resuming after a row keeps the rows that share its watermark and those too recent to export yet"""
+        self.client.force_authenticate(user=self.admin)
+        tied = User.objects.create_user(email='tied@test.com', username='tied', password='testpass123')
+        User.objects.filter(pk=tied.pk).update(updated_at=self.settled)
+        recent = User.objects.create_user(email='recent@test.com', username='recent', password='testpass123')
+
+        rows = [json.loads(line) for line in self.read(self.client.get(self.url)).splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['admin', 'user', 'tied'])
+        first = rows[0]
+        rows = self.read(self.client.get(self.url, {'since': first['updated_at'], 'after_id': first['id']}))
+        self.assertEqual([json.loads(row)['username'] for row in rows.splitlines()], ['user', 'tied'])
+
+        # Once it settles, resuming from the last exported row picks it up
+        User.objects.filter(pk=recent.pk).update(updated_at=self.settled + timedelta(minutes=1))
+        rows = self.read(self.client.get(self.url, {'since': self.settled.isoformat(), 'after_id': tied.pk}))
+        self.assertEqual([json.loads(row)['username'] for row in rows.splitlines()], ['recent'])
+        self.assertEqual(self.client.get(self.url, {'after_id': tied.pk}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        """Test the command writes the dataset and reports where to resume"""
+        skill = Skills.objects.create(name='Python')
+        Skills.objects.update(updated_at=self.settled)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('export_data', 'skills', '--format', 'csv', stdout=stdout, stderr=stderr)
+        self.assertEqual(stdout.getvalue().splitlines()[1].split(',')[1], 'Python')
+        self.assertIn(
+            f'Exported 1 rows; resume with --since {self.settled.isoformat()} --after-id {skill.pk}', stderr.getvalue()
+        )
+
+
+class ImportMembersTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        User.objects.create_user(email='taken@test.com', username='taken', password='testpass123')
+        Skills.objects.create(name='Python')
+
+    def write(self, name, content):
+        path = f"{self.directory}/{name}"
+        with open(path, 'w') as target:
+            target.write(content)
+        return path
+
+    def test_imports_csv_and_rejects_bad_rows(self):
+        """Test members, their skills and availability are created and bad rows are written to the rejects file"""
+        path = self.write('members.csv', (
+            "email,username,password,first_name,availability,wants,offers\n"
+            "ada@test.com,ada,secret123,Ada,weekends;evenings,python;Rust,Go\n"
+            "bob@test.com,bob,secret123,,,Rust,\n"
+            "taken@test.com,other,secret123,,,,\n"
+            "ada@test.com,ada2,secret123,,,,\n"
+            "eve@test.com,eve,secret123,,sometimes,,\n"
+            "carl@test.com,carl,,,,,\n"
+            "fresh@test.com,taken@test.com,secret123,,,,\n"
+        ))
+        rejects = f"{self.directory}/rejects.ndjson"
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_members', path, '--workers', '0', '--rejects', rejects, stdout=StringIO())
+
+        ada = User.objects.get(username='ada')
+        self.assertTrue(ada.check_password('secret123'))
+        self.assertEqual(ada.availability, ['weekends', 'evenings'])
+        self.assertEqual(
+            sorted(UserSkills.objects.filter(user=ada).values_list('skill__name', 'type')),
+            [('Go', 'offer'), ('Python', 'want'), ('Rust', 'want')]
+        )
+        self.assertEqual(Skills.objects.filter(name__iexact='rust').count(), 1)
+        self.assertEqual(UserSkills.objects.filter(user__username='bob').count(), 1)
+        # A username equal to another member's email is not a clash
+        self.assertTrue(User.objects.filter(username='taken@test.com').exists())
+
+        with open(rejects) as source:
+            rejected = [json.loads(line) for line in source]
+        self.assertEqual([row['username'] for row in rejected], ['other', 'ada2', 'eve', 'carl'])
+        self.assertEqual(rejected[-1]['error'], 'password is required')
+        self.assertFalse(any('password' in row for row in rejected))
+
+    def test_created_members_invalidate_profiles(self):
+        """Test a bulk import drops cached profile documents of the created ids"""
+        path = self.write('members.csv', "email,username,password\nada@test.com,ada,secret123\n")
+        metrics.reset()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_members', path, '--workers', '0', stdout=StringIO())
+        self.assertEqual(metrics.get('profile_cache.invalidations'), 1)
+
+    def test_failed_batch_is_retried_on_resume(self):
+        """Test a failed batch stops the import with the checkpoint still before it"""
+        rows = [{'email': f'member{index}@test.com', 'username': f'member{index}', 'password': 'secret123'}
+                for index in range(3)]
+        rows[1]['username'] = 'x' * 200
+        path = self.write('members.ndjson', "".join(json.dumps(row) + "\n" for row in rows))
+        checkpoint = f"{self.directory}/checkpoint.json"
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_members', path, '--workers', '0', '--batch-size', '1', '--checkpoint', checkpoint,
+                stdout=StringIO()
+            )
+        with open(checkpoint) as source:
+            self.assertEqual(json.load(source), {'offset': 1})
+        self.assertEqual(
+            list(User.objects.filter(username__startswith='member').values_list('username', flat=True)), ['member0']
+        )
+
+    def test_checkpoint_resumes(self):
+        """Test a checkpoint makes a re-run skip the rows already imported"""
+        path = self.write('members.ndjson', "".join(
+            json.dumps({'email': f'member{index}@test.com', 'username': f'member{index}', 'password': 'secret123'}) + "\n"
+            for index in range(5)
+        ))
+        checkpoint = self.write('checkpoint.json', json.dumps({'offset': 3}))
+        stdout = StringIO()
+        call_command(
+            'import_members', path, '--workers', '0', '--batch-size', '1', '--checkpoint', checkpoint, stdout=stdout
+        )
+        self.assertEqual(
+            sorted(User.objects.filter(username__startswith='member').values_list('username', flat=True)),
+            ['member3', 'member4']
+        )
+        with open(checkpoint) as source:
+            self.assertEqual(json.load(source), {'offset': 5})
+        self.assertIn('rows/sec', stdout.getvalue())
+
+
+class LoginTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='Mixed.Case@Test.com', username='mixed', password='testpass123')
+        self.url = reverse('apis:user_management:login')
+
+    def test_email_any_case_or_username(self):
+        """Test login accepts the email in any case or the username, with one lookup query"""
+        for identifier in ['mixed.case@test.com', 'MIXED.CASE@TEST.COM', 'mixed']:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, {'email': identifier, 'password': 'testpass123'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, identifier)
+            self.assertEqual(sum('FROM "user_management_users"' in query['sql'] for query in context.captured_queries), 1)
+
+        for identifier, password in [('mixed', 'wrong'), ('nobody@test.com', 'testpass123')]:
+            response = self.client.post(self.url, {'email': identifier, 'password': password}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ambiguous_email_fails_closed(self):
+        """Test an email shared, up to case, by two accounts logs into neither"""
+        User.objects.create_user(email='mixed.case@test.com', username='other', password='testpass123')
+        for identifier in ['mixed.case@test.com', 'Mixed.Case@Test.com']:
+            response = self.client.post(self.url, {'email': identifier, 'password': 'testpass123'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, identifier)
+        response = self.client.post(self.url, {'email': 'other', 'password': 'testpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            'oddohackout.hashers.ConfigurablePBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher'
+        ],
+        PASSWORD_PBKDF2_ITERATIONS=1000
+    )
+    def test_rehash_on_login(self):
+        """Test a stored hash from another hasher or work factor is replaced on the next login"""
+        # Stored as if hashed before the current hasher was configured, whatever the test settings use
+        User.objects.filter(pk=self.user.pk).update(password=make_password('testpass123', hasher='md5'))
+        self.client.post(self.url, {'email': 'mixed', 'password': 'testpass123'}, format='json')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            response = self.client.post(self.url, {'email': 'mixed', 'password': 'testpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user(email='jwt@test.com', username='jwt', password='testpass123')
+        token = self.client.post(
+            reverse('apis:user_management:login'), {'email': 'jwt@test.com', 'password': 'testpass123'}, format='json'
+        ).json()['data']['access_token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.url = reverse('apis:user_management:profile')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sum('FROM "user_management_users"' in query['sql'] for query in context.captured_queries)
+
+    def test_second_request_skips_user_query(self):
+        """Test the token's user is read from the database once and then served from the cache"""
+        self.user_queries()
+        self.assertEqual(self.user_queries(), 0)
+        self.assertEqual((metrics.get('auth_user_cache.misses'), metrics.get('auth_user_cache.hits')), (1, 1))
+        self.assertGreater(metrics.get('auth_user_cache.miss_seconds'), 0)
+
+    def test_user_writes_invalidate(self):
+        """Test deactivating a user takes effect on the next request despite the cached row"""
+        self.user_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_last_login_keeps_entry(self):
+        """Test saves that only touch last_login keep the cached row"""
+        self.user_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.user_queries(), 0)
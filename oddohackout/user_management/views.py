@@ -1,16 +1,21 @@
+import time
+from functools import partial
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated
 from user_management.serializers import CustomTokenObtainPairSerializer,UserSerializer,UserDetailUpdateDeleteSerializer
+from user_management.directory import get_directory_queryset, get_directory_ordering, with_profile_data, serialize_directory_user, add_skills_and_ratings
+from user_management.cache import profile_cache
+from user_management.fields import AVAILABILITY_BITS
+from skills.models import Skills, UserSkills, normalize_skill_name
 from rest_framework_simplejwt.views import TokenObtainPairView
-from skills.serializers import UserSkillsSerializer
-from skills.models import UserSkills
-from ratings.models import Rating
 from django.contrib.auth import get_user_model
+from utils.conditional import conditional_get
+from utils.counting import count_cache
+from utils.paginator import KeysetPagination
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Avg, Count
 
 
 # Create your views here.
@@ -37,29 +42,24 @@ class UserDetailUpdateView(RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return self.request.user
 
+    def profile_stamp(self, request, *args, **kwargs):
+        return request.get_host(), request.user.id, profile_cache.version(request.user.id)
+
+    @conditional_get(profile_stamp)
     def get(self, request, *args, **kwargs):
         user = self.get_object()
-        serializer = self.get_serializer(user)
-        data = serializer.data
-        want_skills_queryset = UserSkills.objects.filter(user=user, type='want')
-        offer_skills_queryset = UserSkills.objects.filter(user=user, type='offer')
-        want_skills_serializer = UserSkillsSerializer(want_skills_queryset, many=True)
-        offer_skills_serializer = UserSkillsSerializer(offer_skills_queryset, many=True)
-        data['want_skills'] = want_skills_serializer.data
-        data['offer_skills'] = offer_skills_serializer.data
-        
-        # Get user's rating statistics
-        ratings_stats = Rating.objects.filter(receiver=user).aggregate(
-            average_rating=Avg('rating_count'),
-            total_ratings=Count('id')
+        data = profile_cache.get_or_build(
+            f"detail:{request.get_host()}", user.id, lambda: self.build_profile(user)
         )
-
-        
-        data['average_rating'] = round(ratings_stats['average_rating'], 2) if ratings_stats['average_rating'] else 0
-        data['total_ratings'] = ratings_stats['total_ratings']
-        
         return Response(data, status=status.HTTP_200_OK)
 
+    def build_profile(self, user):
+        """
+        Serialize the profile with skills and rating statistics
+        """
+        serializer = self.get_serializer(user)
+        return add_skills_and_ratings(user, serializer.data)
+
     def put(self, request, *args, **kwargs):
         user = self.get_object()
         serializer = self.get_serializer(user, data=request.data)
@@ -78,113 +78,147 @@ class GetUserListView(APIView):
         # Get pagination parameters
         limit = int(request.GET.get('limit', 10))
         current_page = int(request.GET.get('current_page', 1))
+        cursor = request.GET.get('cursor', None)
+        cursor_mode = cursor is not None or request.GET.get('pagination') == 'cursor'
+        include_total = request.GET.get('include_total', 'false').lower() == 'true'
         
         # Get filter parameters
         skills_filter = request.GET.get('skills', None)  # Skills to filter by
         skill_type = request.GET.get('skill_type', 'all')  # 'want', 'offer', or 'all'
+        ordering = request.GET.get('ordering', None)  # 'rating', '-rating', 'availability' or id order
+        availability_filter = request.GET.get('availability', None)  # e.g. 'weekends,evenings'
         
-        # Calculate offset
-        offset = (current_page - 1) * limit
-        
-        User = get_user_model()
-        
-        # Filter active users
-        active_users = User.objects.filter(
-            is_banned=False,
-            is_privete=False,
-            is_active=True
-        )
-        
-        # Apply skills filter if provided
+        # Filter active users by the requested skills
+        skills_list = None
         if skills_filter:
             skills_list = [skill.strip() for skill in skills_filter.split(',')]
-            
-            if skill_type == 'want':
-                # Filter users who have any of the specified want skills
-                active_users = active_users.filter(
-                    user_skills__skill__name__in=skills_list,
-                    user_skills__type='want'
-                ).distinct()
-            elif skill_type == 'offer':
-                # Filter users who have any of the specified offer skills
-                active_users = active_users.filter(
-                    user_skills__skill__name__in=skills_list,
-                    user_skills__type='offer'
-                ).distinct()
-            else:  # skill_type == 'all' or any other value
-                # Filter users who have any of the specified skills (either want or offer)
-                active_users = active_users.filter(
-                    user_skills__skill__name__in=skills_list
-                ).distinct()
-        
-        # Get total count for pagination info
-        total_users = active_users.count()
-        
-        # Apply pagination
-        paginated_users = active_users[offset:offset + limit]
-        
-        user_list = []
-        for user in paginated_users:
-            user_data = UserSerializer(user).data
-            want_skills = UserSkills.objects.filter(user=user, type='want')
-            offer_skills = UserSkills.objects.filter(user=user, type='offer')
-            user_data['want_skills'] = UserSkillsSerializer(want_skills, many=True).data
-            user_data['offer_skills'] = UserSkillsSerializer(offer_skills, many=True).data
-
-            # Get user's rating statistics
-            ratings_stats = Rating.objects.filter(receiver=user).aggregate(
-                average_rating=Avg('rating_count'),
-                total_ratings=Count('id')
-            )
-            
-            user_data['average_rating'] = round(ratings_stats['average_rating'], 2) if ratings_stats['average_rating'] else 0
-            user_data['total_ratings'] = ratings_stats['total_ratings']
-            
-            user_list.append(user_data)
 
-        # Calculate pagination metadata
-        total_pages = (total_users + limit - 1) // limit
-        has_next = current_page < total_pages
-        has_previous = current_page > 1
+        availability_list = None
+        if availability_filter:
+            availability_list = [slot.strip().lower() for slot in availability_filter.split(',') if slot.strip()]
+            invalid_slots = [slot for slot in availability_list if slot not in AVAILABILITY_BITS]
+            if invalid_slots:
+                return Response({
+                    'error': f"'{invalid_slots[0]}' is not a valid availability choice"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Rank by the caller's own availability, or by the requested slots for anonymous callers
+        rank_slots = availability_list
+        if request.user.is_authenticated and request.user.availability:
+            rank_slots = request.user.availability
+
+        active_users = get_directory_queryset(skills_list, skill_type, ordering, availability_list, rank_slots)
+        count_users = partial(self.count_users, skills_list, skill_type, availability_list)
+
+        if cursor_mode:
+            user_list, pagination = self.get_cursor_page(active_users, ordering, limit, cursor, include_total, count_users)
+        else:
+            user_list, pagination = self.get_numbered_page(active_users, limit, current_page, count_users)
 
         response_data = {
             'users': user_list,
-            'pagination': {
-                'current_page': current_page,
-                'total_pages': total_pages,
-                'total_users': total_users,
-                'limit': limit,
-                'has_next': has_next,
-                'has_previous': has_previous
-            },
+            'pagination': pagination,
             'filters': {
                 'skills': skills_filter,
-                'skill_type': skill_type
+                'skill_type': skill_type,
+                'availability': availability_filter,
+                'ordering': ordering
             }
         }
 
         return Response(response_data, status=status.HTTP_200_OK)
+
+    def count_users(self, skills_list, skill_type, availability_list):
+        """
+        Count the matching users through the count cache, keyed by the
+        normalized filters; ordering never changes the count
+        """
+        filters = {
+            'skills': sorted({normalize_skill_name(name) for name in skills_list}) if skills_list else None,
+            'skill_type': skill_type if skills_list else 'all',
+            'availability': sorted(set(availability_list)) if availability_list else None,
+        }
+        queryset = get_directory_queryset(skills_list, skill_type, availability=availability_list)
+        return count_cache.count(queryset, filters, depends_on=[UserSkills, Skills])
+
+    def get_numbered_page(self, active_users, limit, current_page, count_users):
+        """
+        Page by `current_page` number, as older clients expect
+        """
+        # Calculate offset
+        offset = (current_page - 1) * limit
+
+        # Get total count for pagination info
+        total_users, count_is_exact = count_users()
+
+        # Apply pagination, loading ratings and skills for the whole page at once
+        paginated_users = with_profile_data(active_users)[offset:offset + limit]
+        user_list = [serialize_directory_user(user) for user in paginated_users]
+
+        # Calculate pagination metadata
+        total_pages = (total_users + limit - 1) // limit
+        has_next = current_page < total_pages
+        has_previous = current_page > 1
+
+        return user_list, {
+            'current_page': current_page,
+            'total_pages': total_pages,
+            'total_users': total_users,
+            'count_is_exact': count_is_exact,
+            'limit': limit,
+            'has_next': has_next,
+            'has_previous': has_previous
+        }
+
+    def get_cursor_page(self, active_users, ordering, limit, cursor, include_total, count_users):
+        """
+        Page with opaque keyset cursors; the total is only counted on request
+        """
+        paginator = KeysetPagination(get_directory_ordering(ordering), limit)
+        page = paginator.paginate(with_profile_data(active_users), cursor)
+        user_list = [serialize_directory_user(user) for user in page['results']]
+
+        pagination = {
+            'mode': 'cursor',
+            'limit': limit,
+            'next_cursor': page['next_cursor'],
+            'previous_cursor': page['previous_cursor'],
+            'has_next': page['has_next'],
+            'has_previous': page['has_previous']
+        }
+        if include_total:
+            pagination['total_users'], pagination['count_is_exact'] = count_users()
+        return user_list, pagination
+
+
 class GetUserByIdView(APIView):
+    def profile_stamp(self, request, pk, *args, **kwargs):
+        version = profile_cache.peek_version(pk)
+        if version is None:
+            # Only create stamps for real users, or probing unknown ids would fill the cache;
+            # a missing user gets a unique stamp, so nothing can revalidate against it
+            if not get_user_model().objects.filter(pk=pk).exists():
+                return pk, time.time_ns()
+            version = profile_cache.version(pk)
+        return pk, version
+
+    @conditional_get(profile_stamp)
     def get(self, request, pk, *args, **kwargs):
+        document = profile_cache.get_or_build('public', pk, lambda: self.build_profile(pk))
+        if document is None:
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        status_code, user_data = document
+        return Response(user_data, status=status_code)
+
+    def build_profile(self, pk):
+        """
+        Return the status code and payload for a public profile, or None
+        when there is no such user (which must not be cached)
+        """
         try:
-            user = get_user_model().objects.get(id=pk)
-            if not user or user.is_banned or user.is_privete or not user.is_active:
-                return Response({"error": "User not found or is inactive"}, status=status.HTTP_404_NOT_FOUND)
-            user_data = UserSerializer(user).data
-            want_skills = UserSkills.objects.filter(user=user, type='want')
-            offer_skills = UserSkills.objects.filter(user=user, type='offer')
-            user_data['want_skills'] = UserSkillsSerializer(want_skills, many=True).data
-            user_data['offer_skills'] = UserSkillsSerializer(offer_skills, many=True).data
-            
-            # Get user's rating statistics
-            ratings_stats = Rating.objects.filter(receiver=user).aggregate(
-                average_rating=Avg('rating_count'),
-                total_ratings=Count('id')
-            )
-            
-            user_data['average_rating'] = round(ratings_stats['average_rating'], 2) if ratings_stats['average_rating'] else 0
-            user_data['total_ratings'] = ratings_stats['total_ratings']
-            
-            return Response(user_data, status=status.HTTP_200_OK)
+            user = get_user_model().objects.select_related('rating_stats').get(id=pk)
         except get_user_model().DoesNotExist:
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return None
+        if not user or user.is_banned or user.is_privete or not user.is_active:
+            return status.HTTP_404_NOT_FOUND, {"error": "User not found or is inactive"}
+        return status.HTTP_200_OK, add_skills_and_ratings(user, UserSerializer(user).data)
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from version stamp parts
+    """
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def etag_matches(etag, if_none_match):
+    """
+    Weak comparison, as If-None-Match requires, against the header's tags
+    """
+    if not if_none_match:
+        return False
+    tags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match)]
+    return '*' in tags or etag in tags
+
+
+def conditional_get(stamp):
+    """
+    Give a GET handler an ETag built from `stamp(view, request, *args, **kwargs)`.
+
+    The stamp must be cheap (version counters, max(updated_at), row counts)
+    and change whenever the response would. It is computed after DRF has
+    authenticated the request, and a matching If-None-Match returns 304
+    before the handler, and therefore any serializer, runs.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            parts = stamp(view, request, *args, **kwargs)
+            etag = make_etag(
+                type(view).__name__,
+                handler.__name__,
+                request.accepted_renderer.format,
+                sorted(request.GET.lists()),
+                parts,
+            )
+            if etag_matches(etag, request.headers.get('If-None-Match')):
+                response = HttpResponseNotModified()
+            else:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            # Responses are per user; let browsers keep them but always revalidate
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
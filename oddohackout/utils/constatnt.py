@@ -37,3 +37,12 @@ class AvailabilityConstants:
     FRIDAYS = "friday"
     SATURDAYS = "saturday"
     SUNDAYS = "sunday"
+
+class CacheKeyConstants:
+    """
+    Class to hold shared cache keys.
+    """
+
+    SKILL_CATALOG_VERSION = "skills:catalog:version"
+    USER_SKILL_INDEX_VERSION = "skills:user-skill-index:version"
+    RATING_LEADERBOARD_VERSION = "ratings:leaderboard:version"
@@ -0,0 +1,141 @@
+import hashlib
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.db.models.sql import Query
+from utils.metrics import metrics
+from utils.versioning import bump_version, get_version
+
+
+class CountCache:
+    """
+    Shared cache of COUNT(*) results for paginated listings.
+
+    Counts are keyed by the model, a normalized description of the filters
+    and the write generation of every model the filters depend on. A write
+    to any tracked model bumps its generation once the transaction commits,
+    so cached counts stay exact; the TTL only bounds how long entries for
+    abandoned generations linger. Large unfiltered tables can instead be
+    sized from the planner's `reltuples` estimate, which costs nothing but
+    is only as fresh as the last ANALYZE.
+    """
+
+    @staticmethod
+    def generation_key(model):
+        return f"count:generation:{model._meta.label_lower}"
+
+    def track(self, *models, ignore_fields=()):
+        """
+        Bump the generation of `models` on every save and delete.
+        Saves that only touch `ignore_fields` (e.g. last_login) are skipped.
+        """
+        ignore_fields = frozenset(ignore_fields)
+
+        def changed(sender, **kwargs):
+            update_fields = kwargs.get('update_fields')
+            if update_fields and ignore_fields.issuperset(update_fields):
+                return
+            self.invalidate(sender)
+
+        for model in models:
+            uid = f"count_cache:{model._meta.label_lower}"
+            post_save.connect(changed, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(changed, sender=model, weak=False, dispatch_uid=uid)
+
+    def invalidate(self, model):
+        """
+        Drop every cached count that depends on `model` once the transaction commits.
+        Call this after bulk writes, which do not send model signals.
+        """
+        transaction.on_commit(lambda: bump_version(self.generation_key(model)))
+
+    @classmethod
+    def query_tables(cls, query):
+        """
+        Return the tables `query` reads: its joins and, recursively, the
+        subqueries in its WHERE clause
+        """
+        tables = {join.table_name for join in query.alias_map.values()}
+        nodes = [query.where]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(getattr(node, 'children', ()))
+            rhs = getattr(node, 'rhs', None)
+            rhs = getattr(rhs, 'query', rhs)
+            if isinstance(rhs, Query):
+                tables |= cls.query_tables(rhs)
+        return tables
+
+    def joined_models(self, queryset):
+        """
+        Return the models other than its own whose tables `queryset` reads
+        """
+        tables = self.query_tables(queryset.query)
+        return [
+            model for model in apps.get_models()
+            if model._meta.db_table in tables and model is not queryset.model
+        ]
+
+    def make_key(self, queryset, filters, depends_on):
+        if filters is None:
+            # The compiled WHERE clause is as normal a form as an arbitrary queryset has
+            filters = str(queryset.order_by().query)
+        models = sorted({queryset.model, *depends_on}, key=lambda model: model._meta.label_lower)
+        generations = [get_version(self.generation_key(model)) for model in models]
+        digest = hashlib.md5(
+            json.dumps([filters, generations], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"count:{queryset.model._meta.label_lower}:{digest}"
+
+    def estimate(self, model, using='default'):
+        """
+        Return the planner's row estimate for the table of `model`, or None
+        when the database is not Postgres or the table was never analyzed.
+        """
+        connection = connections[using]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(model._meta.db_table)]
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    def count(self, queryset, filters=None, depends_on=(), allow_estimate=False):
+        """
+        Return (count, is_exact) for `queryset`.
+
+        `filters` is a JSON-serializable description of the filters that
+        produced the queryset; the compiled SQL is used when it is omitted.
+        `depends_on` lists other models whose writes change the result; the
+        models of tables the query joins or filters through are added to it.
+        With `allow_estimate`, tables of at least COUNT_ESTIMATE_THRESHOLD
+        rows are sized from `reltuples`; only pass it for unfiltered querysets.
+        """
+        if allow_estimate:
+            estimate = self.estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate >= getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 100000):
+                metrics.incr('count_cache.estimates')
+                return estimate, False
+
+        key = self.make_key(queryset, filters, [*depends_on, *self.joined_models(queryset)])
+        count = cache.get(key)
+        if count is not None:
+            metrics.incr('count_cache.hits')
+            return count, True
+
+        metrics.incr('count_cache.misses')
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'COUNT_CACHE_TIMEOUT', 60))
+        return count, True
+
+
+count_cache = CountCache()
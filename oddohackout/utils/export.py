@@ -0,0 +1,157 @@
+import csv
+import json
+from collections import namedtuple
+from datetime import timedelta
+
+from django.apps import apps
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils.paginator import CursorJSONEncoder, KeysetPagination
+
+ExportDataset = namedtuple('ExportDataset', ['model', 'fields', 'watermark'])
+
+# Columns are read with values_list, so rows never become model instances
+EXPORT_DATASETS = {
+    'users': ExportDataset(
+        'user_management.Users',
+        ['id', 'email', 'username', 'first_name', 'last_name', 'availability',
+         'is_active', 'is_banned', 'is_privete', 'date_joined', 'updated_at'],
+        'updated_at'
+    ),
+    'skills': ExportDataset('skills.Skills', ['id', 'name', 'normalized_name', 'created_at', 'updated_at'], 'updated_at'),
+    # User skills are only ever inserted or deleted, so creation is their watermark
+    'user_skills': ExportDataset('skills.UserSkills', ['id', 'user_id', 'skill_id', 'type', 'created_at'], 'created_at'),
+    'skill_requests': ExportDataset(
+        'skills.SkillRequest',
+        ['id', 'sender_id', 'receiver_id', 'wanted_skill_id', 'offered_skill_id', 'satatus', 'created_at', 'updated_at'],
+        'updated_at'
+    ),
+    'ratings': ExportDataset(
+        'ratings.Rating',
+        ['id', 'sender_id', 'receiver_id', 'rating_count', 'feedback', 'created_at', 'updated_at'],
+        'updated_at'
+    ),
+}
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_CHUNK_SIZE = 2000
+# Watermarks are stamped before commit, so a row younger than this may still
+# be joined by a slower transaction's row with an earlier stamp; such rows
+# wait for the next export instead of being skipped by its cursor
+EXPORT_SETTLE = timedelta(minutes=5)
+
+
+def parse_watermark(value):
+    """
+    Parse an ISO 8601 watermark, raising ValueError when it is not one
+    """
+    watermark = parse_datetime(value)
+    if watermark is None:
+        raise ValueError(f"'{value}' is not an ISO 8601 datetime")
+    return watermark
+
+
+def export_rows(dataset, since=None, after_id=None, chunk_size=EXPORT_CHUNK_SIZE, settle=EXPORT_SETTLE):
+    """
+    Yield the dataset's rows as tuples in (watermark, id) order. `since`
+    alone exports rows whose watermark is at or after it; with `after_id`
+    the pair is a keyset cursor and only rows after (since, after_id) are
+    exported, so rows sharing the last watermark are neither skipped nor
+    repeated. Rows changed within `settle` of now are held back. Rows
+    stream from a server-side cursor `chunk_size` at a time, so memory
+    stays flat whatever the table size.
+    """
+    keyset = KeysetPagination([(dataset.watermark, False), ('id', False)])
+    queryset = apps.get_model(dataset.model).objects.filter(
+        **{f'{dataset.watermark}__lte': timezone.now() - settle}
+    )
+    if since is not None and after_id is not None:
+        queryset = queryset.filter(keyset.seek([since, after_id]))
+    elif since is not None:
+        queryset = queryset.filter(**{f'{dataset.watermark}__gte': since})
+    return keyset.order(queryset).values_list(*dataset.fields).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line back to the caller
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ';'.join(map(str, value))
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def render_rows(dataset, rows, export_format):
+    """
+    Turn row tuples into NDJSON or CSV lines as they are read
+    """
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(dataset.fields)
+        for row in rows:
+            yield writer.writerow([csv_value(value) for value in row])
+        return
+
+    # Full microsecond precision, so a row's watermark can be fed back as a cursor
+    for row in rows:
+        yield json.dumps(dict(zip(dataset.fields, row)), cls=CursorJSONEncoder) + '\n'
+
+
+class ExportView(APIView):
+    """
+    Stream a whole dataset to admins as NDJSON (default) or CSV.
+
+    ?since=<ISO datetime> limits the export to rows changed at or after
+    that watermark. To continue an export, pass the last row's watermark
+    column as ?since= and its id as ?after_id=. Rows changed in the last
+    few minutes are left for the next export.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset, *args, **kwargs):
+        if dataset not in EXPORT_DATASETS:
+            return Response({'error': f"Unknown dataset '{dataset}'"}, status=status.HTTP_404_NOT_FOUND)
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_watermark(since)
+            except ValueError as error:
+                return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        after_id = request.query_params.get('after_id')
+        if after_id:
+            if not since:
+                return Response({'error': 'after_id needs since'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                after_id = int(after_id)
+            except ValueError:
+                return Response({'error': 'after_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        spec = EXPORT_DATASETS[dataset]
+        response = StreamingHttpResponse(
+            render_rows(spec, export_rows(spec, since or None, after_id or None), export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+        response['Cache-Control'] = 'no-store'
+        return response
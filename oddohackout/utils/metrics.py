@@ -0,0 +1,31 @@
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    Process-local counters for caches and other hot paths.
+    Each worker keeps its own numbers; scrape every worker for totals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, name):
+        return self._counters.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
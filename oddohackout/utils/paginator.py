@@ -1,12 +1,168 @@
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
 from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
+from utils.counting import count_cache
 
 
 class CustomPagination(pagination.LimitOffsetPagination):
     default_limit = 10
+    count_is_exact = True
 
     def paginate_queryset(self, queryset, request, view=None):
         if request.query_params.get(self.limit_query_param) == "all":
             return None
 
-        return super(CustomPagination, self).paginate_queryset(queryset=queryset, request=request, view=view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        # An estimate can fall short of the real count, so only an exact one may skip the page query
+        if self.count_is_exact and (self.count == 0 or self.offset > self.count):
+            return []
+        return list(queryset[self.offset:self.offset + self.limit])
+
+    def get_count(self, queryset):
+        """
+        Serve the count from the count cache, which follows writes to every
+        model the queryset joins as well as its own; unfiltered querysets
+        over large tables use the planner estimate instead of counting
+        """
+        count, self.count_is_exact = count_cache.count(
+            queryset, allow_estimate=not queryset.query.has_filters()
+        )
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_exact'] = self.count_is_exact
+        return response
+
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision so cursor values match stored timestamps"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over an ordered queryset.
+
+    `ordering` is a list of (field, descending) pairs whose last field is
+    unique, e.g. [('created_at', True), ('id', True)]. Pages are fetched
+    with a seek predicate on the last row seen instead of an OFFSET, so
+    deep pages cost the same as the first one. Cursors are opaque,
+    url-safe tokens holding the ordering values of the boundary row.
+    """
+
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, ordering, limit=10):
+        self.ordering = ordering
+        self.limit = limit
+
+    @staticmethod
+    def encode_cursor(values, direction):
+        payload = json.dumps({"v": values, "d": direction}, cls=CursorJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, direction = payload["v"], payload["d"]
+        except (ValueError, TypeError, KeyError, UnicodeDecodeError):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        if direction not in (KeysetPagination.NEXT, KeysetPagination.PREVIOUS) or not isinstance(values, list):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        return values, direction
+
+    def order(self, queryset, reverse=False):
+        """Apply the pagination ordering, optionally reversed"""
+        expressions = []
+        for field, descending in self.ordering:
+            if descending != reverse:
+                expressions.append(F(field).desc())
+            else:
+                expressions.append(F(field).asc())
+        return queryset.order_by(*expressions)
+
+    def seek(self, values, reverse=False):
+        """Build the predicate selecting rows after (or before) `values`"""
+        if len(values) != len(self.ordering):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        predicate = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = "lt" if descending != reverse else "gt"
+            predicate |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return predicate
+
+    def row_values(self, row):
+        values = []
+        for field, _ in self.ordering:
+            value = row
+            for attribute in field.split("__"):
+                value = getattr(value, attribute)
+            values.append(value)
+        return json.loads(json.dumps(values, cls=CursorJSONEncoder))
+
+    def paginate(self, queryset, cursor=None):
+        """
+        Return the page of rows for `cursor` along with the cursors of
+        the neighbouring pages.
+        """
+        direction = self.NEXT
+        if cursor:
+            values, direction = self.decode_cursor(cursor)
+            reverse = direction == self.PREVIOUS
+            queryset = queryset.filter(self.seek(values, reverse=reverse))
+        reverse = direction == self.PREVIOUS
+
+        rows = list(self.order(queryset, reverse=reverse)[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        return {
+            "results": rows,
+            "next_cursor": self.encode_cursor(self.row_values(rows[-1]), self.NEXT) if rows and has_next else None,
+            "previous_cursor": self.encode_cursor(self.row_values(rows[0]), self.PREVIOUS) if rows and has_previous else None,
+            "has_next": has_next,
+            "has_previous": has_previous,
+        }
 
+    def page_info(self, page):
+        """The pagination block that cursor-paged endpoints return next to their rows"""
+        return {
+            "mode": "cursor",
+            "limit": self.limit,
+            "next_cursor": page["next_cursor"],
+            "previous_cursor": page["previous_cursor"],
+            "has_next": page["has_next"],
+            "has_previous": page["has_previous"],
+        }
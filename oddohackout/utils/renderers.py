@@ -11,6 +11,7 @@ RESPONSE_MESSAGE = {
     status.HTTP_401_UNAUTHORIZED: "Unauthorized",
     status.HTTP_403_FORBIDDEN: "Forbidden",
     status.HTTP_404_NOT_FOUND: "Not Found",
+    status.HTTP_409_CONFLICT: "Conflict",
 }
 
 
@@ -38,6 +39,8 @@ class CustomJSONRenderer(renderers.JSONRenderer):
                             "data": data["results"],
                         }
                     )
+                    if "count_is_exact" in data:
+                        response["count_is_exact"] = data["count_is_exact"]
                 else:
                     response.update({"data": data})
         else:
@@ -54,4 +57,4 @@ class CustomJSONRenderer(renderers.JSONRenderer):
             else:
                 response["error"] = data
 
-        return JsonResponse(response)
+        return JsonResponse(response).content
@@ -0,0 +1,28 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """
+    Return the shared version stamp stored under `key`, creating it if missing.
+    Process-local caches compare this stamp to know when to reload.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """
+    Move the version stamp under `key` forward and return the new value
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The stamp was evicted; start from a fresh value that cannot repeat an old one
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
@@ -0,0 +1,15 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils.metrics import metrics
+
+
+class MetricsView(APIView):
+    """
+    Expose this worker's counters to admins
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(metrics.snapshot(), status=status.HTTP_200_OK)